@@ -16,10 +16,41 @@ import warnings
 from typing import Tuple, Dict
 from collections import Counter
 import urllib.parse
+import io
+from core.instrument_loader import InstrumentRegistry, RateLimiter, fetch_batches, split_batches, MAX_BATCH_SIZE, MARKETFEED_INTERVAL
+from core.candle_data import heikin_ashi_arrays
+from core.renko import renko_frame
 
 warnings.filterwarnings("ignore", category=FutureWarning)
 print("Codebase Version 3")
 
+INSTRUMENT_MASTER_URL = "https://images.dhan.co/api-data/api-scrip-master.csv"
+
+
+def instrument_master_url():
+	"""
+	Where the scrip master is downloaded from: DHAN_INSTRUMENT_URL when set,
+	else the stand-in server's copy when DHAN_API_BASE_URL points at one
+	(mock_dhan_server.py serves it), else Dhan's published file.
+	"""
+	if os.environ.get("DHAN_INSTRUMENT_URL"):
+		return os.environ["DHAN_INSTRUMENT_URL"]
+	if os.environ.get("DHAN_API_BASE_URL"):
+		return os.environ["DHAN_API_BASE_URL"].rstrip('/') + "/instruments/scrip-master.csv"
+	return INSTRUMENT_MASTER_URL
+
+
+def download_instrument_master():
+	"""
+	Fetches the scrip master with `requests`, so an active cassette
+	(core/cassette.py) records it and serves it back on replay.
+	"""
+	response = requests.get(instrument_master_url(), timeout=120)
+	response.raise_for_status()
+	master = pd.read_csv(io.StringIO(response.text), low_memory=False)
+	master['SEM_CUSTOM_SYMBOL'] = master['SEM_CUSTOM_SYMBOL'].str.strip().str.replace(r'\s+', ' ', regex=True)
+	return master
+
 class Tradehull:    
 	clientCode                                      : str
 	interval_parameters                             : dict
@@ -72,6 +103,9 @@ class Tradehull:
 			self.token_id										= token_id
 			print("-----Logged into Dhan-----")
 			self.Dhan = dhanhq(self.ClientCode, self.token_id)
+			# DHAN_API_BASE_URL points the client at a stand-in server (see mock_dhan_server.py)
+			if os.environ.get("DHAN_API_BASE_URL"):
+				self.Dhan.base_url = os.environ["DHAN_API_BASE_URL"].rstrip('/')
 			self.instrument_df 									= self.get_instrument_file()
 			print('Got the instrument file')
 		except Exception as e:
@@ -91,21 +125,20 @@ class Tradehull:
 				if os.path.isfile("Dependencies\\" + path):
 					os.remove("Dependencies\\" + path)
 
-		if expected_file in os.listdir("Dependencies"):
+		# Under a cassette the master is always fetched, so it is recorded with the day and replayed on any date
+		if expected_file in os.listdir("Dependencies") and not os.getenv("DHAN_CASSETTE"):
 			try:
 				print(f"reading existing file {expected_file}")
 				instrument_df = pd.read_csv("Dependencies\\" + expected_file, low_memory=False)
 			except Exception as e:
 				print(
 					"This BOT Is Instrument file is not generated completely, Picking New File from Dhan Again")
-				instrument_df = pd.read_csv("https://images.dhan.co/api-data/api-scrip-master.csv", low_memory=False)
-				instrument_df['SEM_CUSTOM_SYMBOL'] = instrument_df['SEM_CUSTOM_SYMBOL'].str.strip().str.replace(r'\s+', ' ', regex=True)
+				instrument_df = download_instrument_master()
 				instrument_df.to_csv("Dependencies\\" + expected_file)
 		else:
 			# this will fetch instrument_df file from Dhan
 			print("This BOT Is Picking New File From Dhan")
-			instrument_df = pd.read_csv("https://images.dhan.co/api-data/api-scrip-master.csv", low_memory=False)
-			instrument_df['SEM_CUSTOM_SYMBOL'] = instrument_df['SEM_CUSTOM_SYMBOL'].str.strip().str.replace(r'\s+', ' ', regex=True)
+			instrument_df = download_instrument_master()
 			instrument_df.to_csv("Dependencies\\" + expected_file)
 		return instrument_df
 
@@ -660,7 +693,7 @@ class Tradehull:
 	
 	def ltp_call(self,instruments):
 		try:
-			url = "https://api.dhan.co/v2/marketfeed/ltp"
+			url = self.Dhan.base_url + "/marketfeed/ltp"
 			headers = {
 				'Accept': 'application/json',
 				'Content-Type': 'application/json',
@@ -1769,6 +1802,113 @@ class Tradehull:
 			return dict()
 
 
+	def get_instrument_registry(self):
+		"""
+		Returns the cached InstrumentRegistry for the loaded instrument master,
+		building it on first use (or after instrument_df is replaced).
+		"""
+		registry = getattr(self, '_instrument_registry', None)
+		if registry is None or getattr(self, '_registry_source', None) is not self.instrument_df:
+			registry = InstrumentRegistry(self.instrument_df, self.commodity_step_dict.keys())
+			self._instrument_registry = registry
+			self._registry_source = self.instrument_df
+		return registry
+
+
+	def get_market_snapshot(self, names, mode="quote", batch_size=MAX_BATCH_SIZE, max_workers=4, debug="NO",
+							min_interval=MARKETFEED_INTERVAL, retries=2):
+		"""
+		Batched market snapshot for many instruments in one round.
+
+		Names are resolved through the cached instrument registry, split into
+		batches of at most `batch_size` ids per exchange segment, and the
+		batches are requested concurrently, paced to one request start per
+		`min_interval` seconds (Dhan rate-limits marketfeed). A failed batch
+		is retried `retries` times; batches that still fail are left out.
+
+		Args:
+			names: trading symbol or list of trading symbols.
+			mode: "ltp", "ohlc" or "quote" (quote carries depth, volume and OI).
+			batch_size: max instruments per request (Dhan allows up to 1000).
+			max_workers: concurrent requests in flight.
+			min_interval: seconds between request starts, shared by all workers.
+			retries: extra attempts per failed batch.
+
+		Returns:
+			pd.DataFrame with one row per instrument of the successful batches
+			and the columns name, exchange_segment, security_id, ltp, open,
+			high, low, close, volume, oi, avg_price, bid_price, bid_qty,
+			ask_price, ask_qty, total_buy_qty, total_sell_qty, last_trade_time.
+			Fields not carried by the selected mode are NaN. Failed batches are
+			listed in df.attrs["errors"] as {"names", "error"} dicts.
+		"""
+		columns = ['name', 'exchange_segment', 'security_id', 'ltp', 'open', 'high', 'low', 'close',
+				   'volume', 'oi', 'avg_price', 'bid_price', 'bid_qty', 'ask_price', 'ask_qty',
+				   'total_buy_qty', 'total_sell_qty', 'last_trade_time']
+		try:
+			fetchers = {"ltp": self.Dhan.ticker_data, "ohlc": self.Dhan.ohlc_data, "quote": self.Dhan.quote_data}
+			mode = mode.lower()
+			if mode not in fetchers:
+				raise ValueError(f"mode must be one of {list(fetchers)}, got {mode}")
+			if not isinstance(names, list):
+				names = [names]
+
+			by_segment, names_by_key, missing = self.get_instrument_registry().resolve_many(names)
+			for name in missing:
+				print(f"Exception for instrument name {name} as Check the Tradingsymbol")
+			batches = split_batches(by_segment, batch_size)
+			responses, failed = fetch_batches(fetchers[mode], batches, max_workers, RateLimiter(min_interval), retries)
+			errors = []
+			for batch, error in failed:
+				batch_names = [names_by_key[(segment, sid)] for segment, ids in batch.items() for sid in ids]
+				print(f"Exception at calling market snapshot for {len(batch_names)} instruments as {error}")
+				self.logger.error(f"Market snapshot batch failed after {retries + 1} attempts: {error}")
+				errors.append({'names': batch_names, 'error': error})
+
+			snapshot = {col: [] for col in columns}
+			nan = float('nan')
+			for response in responses:
+				if response is None:
+					continue
+				if debug.upper()=="YES":
+					print(response)
+				for segment, values in response['data']['data'].items():
+					for key, quote in values.items():
+						name = names_by_key.get((segment, int(key)))
+						if name is None:
+							continue
+						ohlc = quote.get('ohlc') or {}
+						depth = quote.get('depth') or {}
+						best_bid = (depth.get('buy') or [{}])[0]
+						best_ask = (depth.get('sell') or [{}])[0]
+						snapshot['name'].append(name)
+						snapshot['exchange_segment'].append(segment)
+						snapshot['security_id'].append(int(key))
+						snapshot['ltp'].append(quote.get('last_price', nan))
+						snapshot['open'].append(ohlc.get('open', nan))
+						snapshot['high'].append(ohlc.get('high', nan))
+						snapshot['low'].append(ohlc.get('low', nan))
+						snapshot['close'].append(ohlc.get('close', nan))
+						snapshot['volume'].append(quote.get('volume', nan))
+						snapshot['oi'].append(quote.get('oi', nan))
+						snapshot['avg_price'].append(quote.get('average_price', nan))
+						snapshot['bid_price'].append(best_bid.get('price', nan))
+						snapshot['bid_qty'].append(best_bid.get('quantity', nan))
+						snapshot['ask_price'].append(best_ask.get('price', nan))
+						snapshot['ask_qty'].append(best_ask.get('quantity', nan))
+						snapshot['total_buy_qty'].append(quote.get('buy_quantity', nan))
+						snapshot['total_sell_qty'].append(quote.get('sell_quantity', nan))
+						snapshot['last_trade_time'].append(quote.get('last_trade_time'))
+
+			df = pd.DataFrame(snapshot, columns=columns)
+			df.attrs['errors'] = errors
+			return df
+		except Exception as e:
+			print(f"Exception at calling market snapshot as {e}")
+			self.logger.exception(f"Exception at calling market snapshot as {e}")
+			return pd.DataFrame(columns=columns)
+
+
 	def heikin_ashi(self, df):
 		try:
 			if df.empty:
@@ -1779,21 +1919,8 @@ class Tradehull:
 			if not all(col in df.columns for col in required_columns):
 				raise ValueError(f"Input DataFrame must contain these columns: {required_columns}")
 
-			# Prepare Heikin-Ashi columns
-			ha_close = (df['open'] + df['high'] + df['low'] + df['close']) / 4
-			ha_open = [df['open'].iloc[0]]  # Initialize the first open value
-			ha_high = []
-			ha_low = []
-
-			# Compute Heikin-Ashi values
-			for i in range(1, len(df)):
-				ha_open.append((ha_open[-1] + ha_close.iloc[i - 1]) / 2)
-				ha_high.append(max(df['high'].iloc[i], ha_open[-1], ha_close.iloc[i]))
-				ha_low.append(min(df['low'].iloc[i], ha_open[-1], ha_close.iloc[i]))
-
-			# Append first values for high and low
-			ha_high.insert(0, df['high'].iloc[0])
-			ha_low.insert(0, df['low'].iloc[0])
+			# Vectorized Heikin-Ashi (identical to the former per-row loop)
+			ha_open, ha_high, ha_low, ha_close = heikin_ashi_arrays(df['open'], df['high'], df['low'], df['close'])
 
 			# Create a new DataFrame for Heikin-Ashi values
 			ha_df = pd.DataFrame({
@@ -1802,7 +1929,7 @@ class Tradehull:
 				'high': ha_high,
 				'low': ha_low,
 				'close': ha_close
-			})
+			}, index=df.index)
 
 			return ha_df
 		except Exception as e:
@@ -1812,48 +1939,5 @@ class Tradehull:
 
 
 	def renko_bricks(self,data, box_size=7):
-		renko_data = []
-		current_brick_color = None
-		prev_close = None
-
-		for _, row in data.iterrows():
-			open_price, close_price = row['open'], row['close']
-
-			if prev_close is None:
-				prev_close = (open_price//box_size)*box_size
-
-			while abs(close_price - prev_close) >= box_size:
-				price_diff = close_price - prev_close
-				
-				if price_diff > 0:
-					if current_brick_color == 'red':
-						# Switching from red to green requires at least 2 * box_size move
-						if price_diff < 2 * box_size:
-							break
-						prev_close += 2 * box_size  # Ensures correct switch
-					else:
-						prev_close += box_size
-					
-					current_brick_color = 'green'
-
-				elif price_diff < 0:
-					if current_brick_color == 'green':
-						# Switching from green to red requires at least 2 * box_size move
-						if -price_diff < 2 * box_size:
-							break
-						prev_close -= 2 * box_size  # Ensures correct switch
-					else:
-						prev_close -= box_size
-					
-					current_brick_color = 'red'
-				
-				renko_data.append({
-					'timestamp': row['timestamp'],
-					'open': prev_close - box_size if current_brick_color == 'green' else prev_close + box_size,
-					'high': prev_close if current_brick_color == 'green' else prev_close + box_size,
-					'low': prev_close - box_size if current_brick_color == 'red' else prev_close,
-					'close': prev_close,
-					'brick_color': current_brick_color,
-				})
-
-		return pd.DataFrame(renko_data)
\ No newline at end of file
+		# Array engine in core.renko; same bricks as the former iterrows loop
+		return renko_frame(data, box_size)
\ No newline at end of file
@@ -0,0 +1,62 @@
+# bench_indicators.py
+#Trader Baddu:D
+"""
+Microbenchmark: strategy_v25 pandas indicators vs the core.indicators array kernels.
+
+    python bench_indicators.py [--data path.csv] [--repeat 20]
+
+Prints best-of-N timings per indicator and checks the outputs are identical.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from core import indicators as ci
+from strategy_v25 import ATR, EMA, MACD
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".vscode", "data", "nifty_5min_last_year.csv")
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    close, high, low = df["close"], df["high"], df["low"]
+    h, l, c = high.to_numpy(), low.to_numpy(), close.to_numpy()
+
+    # warm up (triggers JIT compilation when numba is present)
+    ci.v25_indicator_arrays(h[:64], l[:64], c[:64])
+
+    cases = [
+        ("EMA21", lambda: EMA(close, 21), lambda: ci.ema_array(c, 21)),
+        ("MACD", lambda: MACD(close), lambda: ci.macd_arrays(c)),
+        ("ATR14", lambda: ATR(df), lambda: ci.atr_array(h, l, c)),
+    ]
+    print(f"[INFO] {len(df)} bars, numba={'yes' if ci.HAVE_NUMBA else 'no'}, best of {args.repeat}")
+    print(f"{'indicator':<10}{'pandas ms':>12}{'kernel ms':>12}{'speedup':>10}  identical")
+    for name, ref_fn, new_fn in cases:
+        ref, new = ref_fn(), new_fn()
+        refs = ref if isinstance(ref, tuple) else (ref,)
+        news = new if isinstance(new, tuple) else (new,)
+        same = all(np.array_equal(r.to_numpy(), n, equal_nan=True) for r, n in zip(refs, news))
+        t_ref, t_new = best_of(ref_fn, args.repeat), best_of(new_fn, args.repeat)
+        print(f"{name:<10}{t_ref * 1e3:>12.3f}{t_new * 1e3:>12.3f}{t_ref / t_new:>9.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# bench_renko.py
+#Trader Baddu:D
+"""
+Benchmark: legacy iterrows Renko builder vs the core.renko array engine.
+
+    python bench_renko.py [--years 3] [--box 7] [--legacy-bars 50000]
+
+Generates multi-year 1-minute NIFTY-like bars (375 per session, 250 sessions
+a year), times the array engine on all of them in one shot and in daily
+incremental updates, and times the legacy loop on a prefix (it is far too
+slow for the full series) to check both produce identical bricks.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.renko import HAVE_NUMBA, RenkoBuilder, renko_frame
+
+BARS_PER_DAY = 375
+
+
+def legacy_renko_bricks(data, box_size=7):
+    """The former Tradehull.renko_bricks, kept verbatim as the baseline."""
+    renko_data = []
+    current_brick_color = None
+    prev_close = None
+    for _, row in data.iterrows():
+        open_price, close_price = row['open'], row['close']
+        if prev_close is None:
+            prev_close = (open_price // box_size) * box_size
+        while abs(close_price - prev_close) >= box_size:
+            price_diff = close_price - prev_close
+            if price_diff > 0:
+                if current_brick_color == 'red':
+                    if price_diff < 2 * box_size:
+                        break
+                    prev_close += 2 * box_size
+                else:
+                    prev_close += box_size
+                current_brick_color = 'green'
+            elif price_diff < 0:
+                if current_brick_color == 'green':
+                    if -price_diff < 2 * box_size:
+                        break
+                    prev_close -= 2 * box_size
+                else:
+                    prev_close -= box_size
+                current_brick_color = 'red'
+            renko_data.append({
+                'timestamp': row['timestamp'],
+                'open': prev_close - box_size if current_brick_color == 'green' else prev_close + box_size,
+                'high': prev_close if current_brick_color == 'green' else prev_close + box_size,
+                'low': prev_close - box_size if current_brick_color == 'red' else prev_close,
+                'close': prev_close,
+                'brick_color': current_brick_color,
+            })
+    return pd.DataFrame(renko_data)
+
+
+def synthetic_minutes(years, seed=42):
+    rng = np.random.default_rng(seed)
+    n = int(years * 250 * BARS_PER_DAY)
+    close = np.round(24000 * np.exp(np.cumsum(rng.normal(0, 0.0006, n))), 2)
+    open_ = np.round(np.r_[close[0], close[:-1]] + rng.normal(0, 1.0, n), 2)
+    stamps = pd.Timestamp("2022-01-03 09:15", tz="Asia/Kolkata") + pd.to_timedelta(np.arange(n), unit="min")
+    return pd.DataFrame({"timestamp": stamps, "open": open_, "close": close})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--years", type=float, default=3)
+    parser.add_argument("--box", type=float, default=7)
+    parser.add_argument("--legacy-bars", type=int, default=50000)
+    args = parser.parse_args()
+
+    df = synthetic_minutes(args.years)
+    renko_frame(df.iloc[:1000], args.box)  # warm up (JIT compile when numba is present)
+    print(f"[INFO] {len(df)} 1m bars, box={args.box}, numba={'yes' if HAVE_NUMBA else 'no'}")
+
+    start = time.perf_counter()
+    full = renko_frame(df, args.box)
+    t_full = time.perf_counter() - start
+    print(f"array engine, one shot : {t_full * 1e3:9.1f} ms  ({len(full)} bricks)")
+
+    builder = RenkoBuilder(args.box)
+    o, c = df["open"].to_numpy(), df["close"].to_numpy()
+    start = time.perf_counter()
+    for lo in range(0, len(df), BARS_PER_DAY):
+        builder.update(o[lo:lo + BARS_PER_DAY], c[lo:lo + BARS_PER_DAY])
+    t_inc = time.perf_counter() - start
+    same_inc = np.array_equal(builder.bricks()["close"], full["close"].to_numpy())
+    print(f"array engine, per day  : {t_inc * 1e3:9.1f} ms  identical={same_inc}")
+
+    prefix = df.iloc[:args.legacy_bars]
+    start = time.perf_counter()
+    legacy = legacy_renko_bricks(prefix, args.box)
+    t_legacy = time.perf_counter() - start
+    same = legacy.equals(renko_frame(prefix, args.box))
+    est = t_legacy * len(df) / max(len(prefix), 1)
+    print(f"legacy iterrows        : {t_legacy * 1e3:9.1f} ms on {len(prefix)} bars (~{est:.1f} s for all)  identical={same}")
+    print(f"speedup                : ~{est / t_full:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Array-based backtest engine for Strategy V25.
+
+Runs the same rules as the original row-by-row strategy_v25 loop (entry via
+the check_entry conditions, initial SL at 1.0*ATR, TP1 at +/-15 locking the
+stop at +/-13, ATR trail after TP1, EMA/MACD fail-safe, EOD exit at 15:25)
+but over plain float arrays. The open position is a handful of local
+scalars instead of a dict, entry signals are precomputed for every bar,
+and bar timestamps are only materialised for the bars that trade.
+
+The exit state machine is path dependent, so it is one sequential kernel,
+compiled with numba when installed and otherwise run as plain Python over
+lists. It writes trades (and, when tracing, the original event lines as
+coded events) into flat buffers that come back as structured arrays.
+
+Trades come back in the original tuple layout:
+    (entry_time, side, entry_price, exit_time, exit_price, reason, sl)
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.events import DEBUG, INFO
+
+try:  # optional JIT; the same kernel runs as plain Python without it
+    from numba import njit as _njit
+    HAVE_NUMBA = True
+except ImportError:
+    _njit = None
+    HAVE_NUMBA = False
+
+EOD_SECONDS = 15 * 3600 + 25 * 60
+REASONS = ("Initial SL Hit", "SL Hit", "MACD/EMA Exit", "EOD Exit")
+INITIAL_SL, SL_HIT, MACD_EMA_EXIT, EOD_EXIT = range(len(REASONS))
+SIDES = {1: "BUY_CE", -1: "SELL_PE"}
+EVENT_ENTRY, EVENT_TP1, EVENT_TRAIL, EVENT_EXIT = range(4)
+EVENT_KINDS = ("entry_signal", "tp1", "trail", "exit")
+EVENT_LEVELS = np.array([INFO, DEBUG, DEBUG, INFO], dtype=np.int64)
+
+TRADE_DTYPE = np.dtype([
+    ("entry_idx", np.int64), ("exit_idx", np.int64), ("side", np.int8),
+    ("entry", np.float64), ("exit", np.float64), ("reason", np.int8), ("sl", np.float64),
+])
+# a = side-specific value (tp1 / new sl / exit price), b = locked sl or exit reason
+EVENT_DTYPE = np.dtype([("bar", np.int64), ("kind", np.int8), ("side", np.int8), ("a", np.float64), ("b", np.float64)])
+
+# Original V25 constants: check_entry thresholds and the exit rules
+V25_ENTRIES = {"macd_gap": 0.20, "min_atr_ratio": 0.00065}
+V25_EXITS = {"sl_atr": 1.0, "tp_points": 15.0, "lock_points": 13.0, "trail_min": 10.0, "trail_atr": 0.3}
+V25_PARAMS = {**V25_ENTRIES, **V25_EXITS}
+
+
+def v25_signals(arrays: Dict[str, np.ndarray], **entries) -> np.ndarray:
+    """Entry codes for the v25_inputs() arrays, with optional V25_ENTRIES overrides."""
+    from strategy_v25 import entry_signal_codes
+
+    unknown = set(entries) - set(V25_ENTRIES)
+    if unknown:
+        raise ValueError(f"Unknown entry parameters {sorted(unknown)}. Known: {sorted(V25_ENTRIES)}")
+    p = {**V25_ENTRIES, **entries}
+    return entry_signal_codes(arrays["seconds"], arrays["close"], arrays["ema21"], arrays["atr"],
+                              arrays["macd"], arrays["macd_signal"], arrays["macd_hist"],
+                              macd_gap=p["macd_gap"], min_atr_ratio=p["min_atr_ratio"])
+
+
+def v25_inputs(df, **entries) -> Dict[str, np.ndarray]:
+    """Float arrays (plus int8 entry codes) the engine runs on, from an indicator frame."""
+    from strategy_v25 import session_seconds
+
+    arrays = {
+        col: np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+        for col in ("close", "high", "low", "ema21", "atr", "macd", "macd_signal", "macd_hist")
+    }
+    arrays["seconds"] = session_seconds(df["datetime"])
+    arrays["signal"] = v25_signals(arrays, **entries)
+    return arrays
+
+
+def day_bounds(datetimes) -> np.ndarray:
+    """Bar index where each trading day starts, plus the total bar count at the end."""
+    import pandas as pd
+
+    day = pd.to_datetime(datetimes).dt.normalize().to_numpy()
+    if len(day) == 0:
+        return np.zeros(1, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    return np.r_[starts, len(day)].astype(np.int64)
+
+
+def flat_cuts(seconds: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """
+    Day starts (from day_bounds) where the engine is provably flat: the
+    previous day has a bar at or after 15:25, which closes any open position,
+    and entries stop at 15:15. Splitting a run at these bars gives exactly
+    the trades of one continuous run.
+    """
+    starts = bounds[1:-1]
+    return starts[np.asarray(seconds)[starts - 1] >= EOD_SECONDS]
+
+
+def _v25_kernel(seconds, close, high, low, ema, atr, hist, signal, start,
+                sl_atr, tp_points, lock_points, trail_min, trail_atr,
+                trade_i, trade_f, trace, event_i, event_f):
+    """
+    V25 position state machine from bar `start` on.
+
+    trade_i gets (entry_idx, exit_idx, side, reason) and trade_f
+    (entry, exit, sl) per trade, flattened. With trace set, event_i / event_f
+    get (bar, kind, side) / (a, b) per event. Prices are rounded like the
+    original loop rounds numpy scalars: rint(x * 100) / 100, which differs
+    from Python's round() on a few hundred bars a year.
+    Returns (trades written, events written).
+    """
+    nt = 0
+    ne = 0
+    side = 0
+    entry_i = 0
+    entry = 0.0
+    sl = 0.0
+    initial_sl = 0.0
+    extreme = 0.0
+    tp1_hit = False
+    for i in range(start, len(close)):
+        c = close[i]
+        if side == 0:
+            code = signal[i]
+            if code == 0:
+                continue
+            side = code
+            entry_i = i
+            entry = c
+            tp1_hit = False
+            if side == 1:
+                sl = np.rint((c - sl_atr * atr[i]) * 100.0) / 100.0
+                extreme = c
+            else:
+                sl = np.rint((c + sl_atr * atr[i]) * 100.0) / 100.0
+                extreme = low[i]
+            initial_sl = sl
+            if trace:
+                event_i[3 * ne] = i
+                event_i[3 * ne + 1] = EVENT_ENTRY
+                event_i[3 * ne + 2] = side
+                event_f[2 * ne] = c
+                event_f[2 * ne + 1] = sl
+                ne += 1
+
+        if side == 1:
+            if high[i] > extreme:
+                extreme = high[i]
+        elif low[i] < extreme:
+            extreme = low[i]
+
+        reason = -1
+        exit_price = 0.0
+        if not tp1_hit and ((side == 1 and c <= initial_sl) or (side == -1 and c >= initial_sl)):
+            reason = INITIAL_SL
+            exit_price = initial_sl
+        else:
+            tp1 = entry + side * tp_points
+            if not tp1_hit and ((side == 1 and high[i] >= tp1) or (side == -1 and low[i] <= tp1)):
+                tp1_hit = True
+                sl = np.rint((entry + side * lock_points) * 100.0) / 100.0
+                if trace:
+                    event_i[3 * ne] = i
+                    event_i[3 * ne + 1] = EVENT_TP1
+                    event_i[3 * ne + 2] = side
+                    event_f[2 * ne] = tp1
+                    event_f[2 * ne + 1] = sl
+                    ne += 1
+            if (side == 1 and c <= sl) or (side == -1 and c >= sl):
+                reason = SL_HIT
+                exit_price = sl
+            elif tp1_hit:
+                step = trail_atr * atr[i]
+                trail = step if step > trail_min else trail_min
+                if side == 1:
+                    level = extreme - trail
+                    new_sl = np.rint((level if level > sl else sl) * 100.0) / 100.0
+                    moved = new_sl > sl
+                    fail_safe = c < ema[i] or hist[i] < 0
+                else:
+                    level = extreme + trail
+                    new_sl = np.rint((level if level < sl else sl) * 100.0) / 100.0
+                    moved = new_sl < sl
+                    fail_safe = c > ema[i] or hist[i] > 0
+                if moved:
+                    sl = new_sl
+                    if trace:
+                        event_i[3 * ne] = i
+                        event_i[3 * ne + 1] = EVENT_TRAIL
+                        event_i[3 * ne + 2] = side
+                        event_f[2 * ne] = new_sl
+                        event_f[2 * ne + 1] = 0.0
+                        ne += 1
+                if fail_safe:
+                    reason = MACD_EMA_EXIT
+                    exit_price = c
+            if reason < 0 and seconds[i] >= EOD_SECONDS:
+                reason = EOD_EXIT
+                exit_price = c
+
+        if reason >= 0:
+            trade_i[4 * nt] = entry_i
+            trade_i[4 * nt + 1] = i
+            trade_i[4 * nt + 2] = side
+            trade_i[4 * nt + 3] = reason
+            trade_f[3 * nt] = entry
+            trade_f[3 * nt + 1] = exit_price
+            trade_f[3 * nt + 2] = sl
+            nt += 1
+            if trace:
+                event_i[3 * ne] = i
+                event_i[3 * ne + 1] = EVENT_EXIT
+                event_i[3 * ne + 2] = side
+                event_f[2 * ne] = exit_price
+                event_f[2 * ne + 1] = reason
+                ne += 1
+            side = 0
+    return nt, ne
+
+
+if HAVE_NUMBA:
+    _v25_kernel = _njit(cache=True, nogil=True)(_v25_kernel)
+
+
+def trade_array(trade_i, trade_f, nt: int) -> np.ndarray:
+    """TRADE_DTYPE array from a kernel's flat trade buffers (4 ints / 3 floats per trade)."""
+    ti = np.asarray(trade_i[:4 * nt], dtype=np.int64).reshape(nt, 4)
+    tf = np.asarray(trade_f[:3 * nt], dtype=np.float64).reshape(nt, 3)
+    trades = np.empty(nt, dtype=TRADE_DTYPE)
+    for k, name in enumerate(("entry_idx", "exit_idx", "side", "reason")):
+        trades[name] = ti[:, k]
+    for k, name in enumerate(("entry", "exit", "sl")):
+        trades[name] = tf[:, k]
+    return trades
+
+
+def simulate_v25(arrays: Dict[str, np.ndarray], start: int = 35, trace: bool = False,
+                 **exits) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Runs the exit state machine over v25_inputs() arrays.
+
+    Returns (trades, events): a TRADE_DTYPE structured array and, with
+    trace=True, an EVENT_DTYPE array of the original loop's event lines
+    (None otherwise). Keyword overrides for V25_EXITS tune the exits.
+    """
+    unknown = set(exits) - set(V25_EXITS)
+    if unknown:
+        raise ValueError(f"Unknown exit parameters {sorted(unknown)}. Known: {sorted(V25_EXITS)}")
+    p = {**V25_EXITS, **exits}
+    n = len(arrays["close"])
+    cap = max(n - start, 0)  # a trade closes at most once per bar
+    cols = [arrays[k] for k in ("seconds", "close", "high", "low", "ema21", "atr", "macd_hist", "signal")]
+    ev_cap = 4 * cap if trace else 0  # entry, TP1, trail and exit can share a bar
+    if HAVE_NUMBA:
+        cols = [np.ascontiguousarray(c) for c in cols]
+        trade_i, trade_f = np.empty(4 * cap, np.int64), np.empty(3 * cap)
+        event_i, event_f = np.empty(3 * ev_cap, np.int64), np.empty(2 * ev_cap)
+    else:
+        cols = [c.tolist() for c in cols]
+        trade_i, trade_f = [0] * (4 * cap), [0.0] * (3 * cap)
+        event_i, event_f = [0] * (3 * ev_cap), [0.0] * (2 * ev_cap)
+    nt, ne = _v25_kernel(*cols, start, float(p["sl_atr"]), float(p["tp_points"]), float(p["lock_points"]),
+                         float(p["trail_min"]), float(p["trail_atr"]), trade_i, trade_f, trace, event_i, event_f)
+
+    trades = trade_array(trade_i, trade_f, nt)
+    if not trace:
+        return trades, None
+    ei = np.asarray(event_i[:3 * ne], dtype=np.int64).reshape(ne, 3)
+    ef = np.asarray(event_f[:2 * ne], dtype=np.float64).reshape(ne, 2)
+    events = np.empty(ne, dtype=EVENT_DTYPE)
+    for k, name in enumerate(("bar", "kind", "side")):
+        events[name] = ei[:, k]
+    events["a"], events["b"] = ef[:, 0], ef[:, 1]
+    return trades, events
+
+
+def event_lines(events: np.ndarray, arrays: Dict[str, np.ndarray], times) -> List[str]:
+    """The original backtest's printed lines for simulate_v25 trace events."""
+    if len(events) == 0:
+        return []
+    stamps = times.iloc[events["bar"]].tolist()
+    lines = []
+    for ev, dt in zip(events.tolist(), stamps):
+        i, kind, side, a, b = ev
+        name = SIDES[side]
+        if kind == EVENT_ENTRY:
+            lines.append(f"[ENTRY SIGNAL] {name} {dt} | macd={arrays['macd'][i]:.3f} signal={arrays['macd_signal'][i]:.3f} "
+                         f"hist={arrays['macd_hist'][i]:.3f} atr={arrays['atr'][i]:.2f}")
+        elif kind == EVENT_TP1:
+            lines.append(f"[TP1] {name} {dt} tp1={a} locked_sl={b}")
+        elif kind == EVENT_TRAIL:
+            lines.append(f"[TRAIL] {name} {dt} new_sl={a}")
+        else:
+            lines.append(f"[EXIT] {name} {dt} {REASONS[int(b)]} @ {a}")
+    return lines
+
+
+def to_trade_tuples(trades: np.ndarray, times) -> List[tuple]:
+    """Structured trades -> the original (entry_time, side, entry, exit_time, exit, reason, sl) tuples."""
+    if len(trades) == 0:
+        return []
+    stamps = times.iloc[np.column_stack([trades["entry_idx"], trades["exit_idx"]]).ravel()].tolist()
+    return [
+        (stamps[2 * k], SIDES[side], entry, stamps[2 * k + 1], exit_price, REASONS[reason], sl)
+        for k, (side, entry, exit_price, reason, sl) in enumerate(zip(
+            trades["side"].tolist(), trades["entry"].tolist(), trades["exit"].tolist(),
+            trades["reason"].tolist(), trades["sl"].tolist()))
+    ]
+
+
+def record_events(recorder, events: np.ndarray, arrays: Dict[str, np.ndarray], times) -> None:
+    """
+    Adds simulate_v25 trace events to an EventRecorder as one columnar block:
+    entries and exits at INFO, TP1 and trail updates at DEBUG. The text lines
+    are only formatted if the recorder (or a later lines() call) needs them.
+    """
+    if len(events) == 0:
+        return
+    kind, a, b = events["kind"], events["a"], events["b"]
+    is_exit = kind == EVENT_EXIT
+    columns = {
+        "time": times.iloc[events["bar"]].to_numpy(),
+        "level": EVENT_LEVELS[kind],
+        "kind": np.asarray(EVENT_KINDS, dtype=object)[kind],
+        "bar": events["bar"],
+        "side": np.where(events["side"] == 1, SIDES[1], SIDES[-1]).astype(object),
+        "price": np.where(kind == EVENT_TRAIL, np.nan, a),
+        "sl": np.where(kind == EVENT_TRAIL, a, np.where(is_exit, np.nan, b)),
+        "reason": np.where(is_exit, np.asarray(REASONS, dtype=object)[np.where(is_exit, b, 0).astype(np.int64)], None),
+    }
+    recorder.extend(columns, lambda: event_lines(events, arrays, times))
+
+
+def run_v25_backtest(df, start: int = 35, recorder=None) -> List[tuple]:
+    """
+    V25 backtest over an indicator frame (datetime, OHLC, ema21, macd*, atr).
+    Same trade list as the original loop. With an EventRecorder at INFO or
+    below, the original loop's event lines are recorded as well; otherwise
+    the kernel runs without tracing.
+    """
+    times = df["datetime"]
+    arrays = v25_inputs(df)
+    trace = recorder is not None and recorder.enabled(INFO)
+    trades, events = simulate_v25(arrays, start, trace=trace)
+    if trace:
+        record_events(recorder, events, arrays, times)
+    return to_trade_tuples(trades, times)
@@ -0,0 +1,364 @@
+"""
+Streaming candle construction for Trader-Baddu.
+
+BarAggregator turns a tick stream into session-aligned OHLCV bars
+(1m/5m/... buckets anchored at 09:15 IST, the same origin
+Tradehull.resample_timeframe uses) with O(1) work per tick, and emits a
+bar-close event the moment a bucket is complete instead of waiting for
+the next REST poll.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+SESSION_OPEN_SECONDS = 9 * 3600 + 15 * 60  # 09:15 IST, seconds after midnight
+DAY_SECONDS = 86400
+
+
+class Bar(NamedTuple):
+    """A closed OHLCV bar; `start` is the epoch second the bucket opens at."""
+    security_id: int
+    timeframe: int
+    start: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+def bucket_start(ts: float, timeframe: int, session_open: int = SESSION_OPEN_SECONDS) -> int:
+    """Epoch second of the session-aligned bucket containing `ts`."""
+    ist = int(ts) + IST_OFFSET_SECONDS
+    day = ist - ist % DAY_SECONDS
+    since_open = ist - day - session_open
+    return day + session_open + (since_open // timeframe) * timeframe - IST_OFFSET_SECONDS
+
+
+def bucket_starts(ts, timeframe: int, session_open: int = SESSION_OPEN_SECONDS):
+    """bucket_start for a whole array of epoch seconds (int64 result)."""
+    import numpy as np
+
+    ist = np.asarray(ts, dtype=np.int64) + IST_OFFSET_SECONDS
+    day = ist - ist % DAY_SECONDS
+    since_open = ist - day - session_open
+    return day + session_open + (since_open // timeframe) * timeframe - IST_OFFSET_SECONDS
+
+
+def aggregate_ohlcv(ts, open, high, low, close, volume, timeframe: int, session_open: int = SESSION_OPEN_SECONDS):
+    """
+    Groups time-sorted minute (or tick) arrays into session-aligned bars with
+    NumPy reductions. Returns (starts, open, high, low, close, volume) arrays.
+    """
+    import numpy as np
+
+    starts = bucket_starts(ts, timeframe, session_open)
+    cols = [np.asarray(x, dtype=np.float64) for x in (open, high, low, close, volume)]
+    if len(starts) == 0:
+        return (starts, *cols)
+    first = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last = np.r_[first[1:], len(starts)] - 1
+    o, h, l, c, v = cols
+    return (starts[first], o[first], np.maximum.reduceat(h, first), np.minimum.reduceat(l, first),
+            c[last], np.add.reduceat(v, first))
+
+
+def epoch_seconds(times):
+    """Epoch seconds (int64 array) of a datetime column, tz-aware or naive (naive is read as UTC)."""
+    import pandas as pd
+
+    dt = pd.to_datetime(times)
+    epoch = pd.Timestamp("1970-01-01", tz="UTC") if dt.dt.tz is not None else pd.Timestamp("1970-01-01")
+    return ((dt - epoch) // pd.Timedelta(seconds=1)).to_numpy(dtype="int64")
+
+
+class BarAggregator:
+    """
+    Tick -> bar aggregator for many instruments and timeframes at once.
+
+    Args:
+        timeframes: bar sizes in seconds (60 = 1m, 300 = 5m).
+        on_bar_close: callback invoked with each closed Bar.
+        session_open: bucket origin in seconds after IST midnight.
+    """
+
+    def __init__(
+        self,
+        timeframes: Iterable[int] = (60, 300),
+        on_bar_close: Optional[Callable[[Bar], None]] = None,
+        session_open: int = SESSION_OPEN_SECONDS,
+    ):
+        self.timeframes = tuple(int(tf) for tf in timeframes)
+        if not self.timeframes or any(tf <= 0 for tf in self.timeframes):
+            raise ValueError(f"timeframes must be positive seconds, got {timeframes}")
+        self.on_bar_close = on_bar_close
+        self.session_open = session_open
+        # (security_id, timeframe) -> [start, open, high, low, close, volume]
+        self._open: Dict[Tuple[int, int], list] = {}
+        self._last_closed: Dict[Tuple[int, int], int] = {}
+        self._lock = threading.Lock()
+
+    def _emit(self, key: Tuple[int, int], state: list, closed: List[Bar]) -> None:
+        self._last_closed[key] = state[0]
+        closed.append(Bar(key[0], key[1], state[0], state[1], state[2], state[3], state[4], state[5]))
+
+    def on_tick(self, security_id: int, price: float, ts: float, volume: float = 0.0) -> List[Bar]:
+        """Folds one trade into every timeframe; returns (and dispatches) bars it closed."""
+        closed: List[Bar] = []
+        with self._lock:
+            for tf in self.timeframes:
+                key = (security_id, tf)
+                start = bucket_start(ts, tf, self.session_open)
+                state = self._open.get(key)
+                if state is None and start <= self._last_closed.get(key, -1):
+                    continue
+                if state is None or start > state[0]:
+                    if state is not None:
+                        self._emit(key, state, closed)
+                    self._open[key] = [start, price, price, price, price, volume]
+                elif start == state[0]:
+                    if price > state[2]:
+                        state[2] = price
+                    if price < state[3]:
+                        state[3] = price
+                    state[4] = price
+                    state[5] += volume
+                # ticks for an already closed bucket (late/out-of-order) are dropped
+        self._dispatch(closed)
+        return closed
+
+    def flush(self, now: Optional[float] = None) -> List[Bar]:
+        """Closes every bar whose bucket has ended by `now` (all open bars when now is None)."""
+        closed: List[Bar] = []
+        with self._lock:
+            for key, state in list(self._open.items()):
+                if now is None or state[0] + key[1] <= now:
+                    self._emit(key, state, closed)
+                    del self._open[key]
+        self._dispatch(closed)
+        return closed
+
+    def _dispatch(self, closed: List[Bar]) -> None:
+        if self.on_bar_close is not None:
+            for bar in closed:
+                self.on_bar_close(bar)
+
+    def current(self, security_id: int, timeframe: int) -> Optional[Bar]:
+        """The still-forming bar for an instrument/timeframe, if any."""
+        state = self._open.get((security_id, timeframe))
+        if state is None:
+            return None
+        return Bar(security_id, timeframe, *state)
+
+
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class RingBarStore:
+    """
+    Fixed-capacity bar history for one instrument.
+
+    Every column lives in a preallocated float64 array of 2 * capacity slots and
+    each value is written twice (at i and i + capacity). The most recent n bars
+    are therefore always one contiguous slice, so window() hands out zero-copy
+    NumPy views, append() is O(1), and memory stays flat however long the
+    session runs.
+
+    Args:
+        capacity: bars kept (older bars are overwritten).
+        extra_fields: additional per-bar columns, e.g. ("ema21", "macd", "atr").
+    """
+
+    def __init__(self, capacity: int = 500, extra_fields: Iterable[str] = ()):
+        import numpy as np
+
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.fields = BAR_FIELDS + tuple(f for f in extra_fields if f not in BAR_FIELDS)
+        self._start = np.zeros(2 * capacity, dtype=np.int64)
+        self._cols = {f: np.full(2 * capacity, np.nan) for f in self.fields}
+        self._count = 0
+        self._pos = -1  # slot of the newest bar in [0, capacity)
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Bars ever appended, including those already overwritten."""
+        return self._count
+
+    def append(self, start: int, open: float, high: float, low: float, close: float, volume: float = 0.0, **extra) -> None:
+        pos = self._count % self.capacity
+        mirror = pos + self.capacity
+        self._start[pos] = self._start[mirror] = start
+        values = (open, high, low, close, volume)
+        for name, value in zip(BAR_FIELDS, values):
+            col = self._cols[name]
+            col[pos] = col[mirror] = value
+        for name in self.fields[len(BAR_FIELDS):]:
+            col = self._cols[name]
+            col[pos] = col[mirror] = extra.get(name, float("nan"))
+        self._pos = pos
+        self._count += 1
+
+    def append_bar(self, bar: Bar, **extra) -> None:
+        self.append(bar.start, bar.open, bar.high, bar.low, bar.close, bar.volume, **extra)
+
+    def set_last(self, **values) -> None:
+        """Writes columns (typically indicators) for the newest bar."""
+        if self._count == 0:
+            raise IndexError("set_last on an empty RingBarStore")
+        for name, value in values.items():
+            col = self._cols[name]
+            col[self._pos] = col[self._pos + self.capacity] = value
+
+    def _bounds(self, n: Optional[int]) -> Tuple[int, int]:
+        size = len(self)
+        n = size if n is None else min(n, size)
+        end = self._pos + self.capacity + 1
+        return end - n, end
+
+    def window(self, field: str, n: Optional[int] = None):
+        """Zero-copy, oldest-first view of the last n values of a column (read-only)."""
+        lo, hi = self._bounds(n)
+        view = self._cols[field][lo:hi]
+        view.flags.writeable = False
+        return view
+
+    def starts(self, n: Optional[int] = None):
+        lo, hi = self._bounds(n)
+        view = self._start[lo:hi]
+        view.flags.writeable = False
+        return view
+
+    def last(self, field: str, back: int = 0) -> float:
+        """Value `back` bars before the newest one (0 = newest)."""
+        if back >= len(self):
+            raise IndexError(f"only {len(self)} bars stored")
+        return float(self._cols[field][self._pos + self.capacity - back])
+
+    def extend_from_frame(self, df) -> None:
+        """Seeds the store from an OHLCV frame (e.g. the REST warm-up history)."""
+        tail = df.iloc[-self.capacity:]
+        if "datetime" in tail.columns:
+            starts = epoch_seconds(tail["datetime"])
+        else:
+            starts = tail["timestamp"].to_numpy()
+        cols = {f: tail[f].to_numpy(dtype=float) for f in self.fields if f in tail.columns}
+        for i in range(len(tail)):
+            self.append(int(starts[i]), **{f: cols[f][i] for f in cols})
+
+    def to_frame(self, n: Optional[int] = None):
+        """Copies the last n bars into a DataFrame (for inspection; allocates)."""
+        import pandas as pd
+
+        data = {f: self.window(f, n) for f in self.fields}
+        data["datetime"] = pd.to_datetime(self.starts(n), unit="s", utc=True).tz_convert("Asia/Kolkata")
+        return pd.DataFrame(data, columns=["datetime", *self.fields])
+
+
+class BarStoreSet:
+    """One RingBarStore per (security_id, timeframe); plugs straight into BarAggregator.on_bar_close."""
+
+    def __init__(self, capacity: int = 500, extra_fields: Iterable[str] = ()):
+        self.capacity = capacity
+        self.extra_fields = tuple(extra_fields)
+        self._stores: Dict[Tuple[int, int], RingBarStore] = {}
+
+    def get(self, security_id: int, timeframe: int) -> RingBarStore:
+        key = (security_id, timeframe)
+        store = self._stores.get(key)
+        if store is None:
+            store = self._stores[key] = RingBarStore(self.capacity, self.extra_fields)
+        return store
+
+    def on_bar_close(self, bar: Bar) -> None:
+        self.get(bar.security_id, bar.timeframe).append_bar(bar)
+
+
+# ---------------------------
+# Heikin-Ashi
+# ---------------------------
+def heikin_ashi_arrays(open_, high, low, close):
+    """
+    Heikin-Ashi (open, high, low, close) arrays for OHLC arrays.
+
+    ha_close = (O + H + L + C) / 4 and ha_open[i] = (ha_open[i-1] + ha_close[i-1]) / 2
+    seeded with the first open; the first bar keeps its raw high/low. The
+    halving recursion is an EMA with alpha = 0.5, and 0.5*a + 0.5*b rounds
+    exactly like (a + b) / 2, so pandas' compiled ewm loop reproduces the
+    per-row Python recursion bit for bit. As in that loop, a NaN poisons every
+    later ha_open; ha_high / ha_low skip NaN operands (np.fmax / np.fmin), so
+    they stay NaN only when every operand is.
+    """
+    import numpy as np
+    import pandas as pd
+
+    o, h, l, c = (np.ascontiguousarray(a, dtype=np.float64) for a in (open_, high, low, close))
+    n = len(o)
+    ha_close = (o + h + l + c) / 4
+    if n == 0:
+        return o.copy(), h.copy(), l.copy(), ha_close
+    seeds = np.empty(n)
+    seeds[0] = o[0]
+    seeds[1:] = ha_close[:-1]
+    ha_open = pd.Series(seeds, copy=False).ewm(alpha=0.5, adjust=False).mean().to_numpy(copy=True)
+    poisoned = np.isnan(seeds)
+    if poisoned.any():
+        ha_open[int(np.argmax(poisoned)):] = np.nan
+    ha_high = np.fmax(h, np.fmax(ha_open, ha_close))
+    ha_low = np.fmin(l, np.fmin(ha_open, ha_close))
+    ha_high[0], ha_low[0] = h[0], l[0]
+    return ha_open, ha_high, ha_low, ha_close
+
+
+def _fmax(*values: float) -> float:
+    """max() ignoring NaN, NaN if all are; np.fmax for scalars without the ufunc overhead."""
+    present = [v for v in values if v == v]
+    return max(present) if present else float("nan")
+
+
+def _fmin(*values: float) -> float:
+    present = [v for v in values if v == v]
+    return min(present) if present else float("nan")
+
+
+class StreamingHeikinAshi:
+    """Bar-by-bar Heikin-Ashi; each update() returns the same values heikin_ashi_arrays gives for that bar."""
+
+    def __init__(self):
+        self.ha_open = float("nan")
+        self.ha_close = float("nan")
+        self.bars = 0
+
+    def _next(self, open_: float, high: float, low: float, close: float) -> Tuple[float, float, float, float]:
+        ha_close = (open_ + high + low + close) / 4
+        if self.bars == 0:
+            return open_, high, low, ha_close
+        ha_open = (self.ha_open + self.ha_close) / 2
+        return ha_open, _fmax(high, ha_open, ha_close), _fmin(low, ha_open, ha_close), ha_close
+
+    def update(self, open_: float, high: float, low: float, close: float) -> Tuple[float, float, float, float]:
+        bar = self._next(open_, high, low, close)
+        self.ha_open, self.ha_close = bar[0], bar[3]
+        self.bars += 1
+        return bar
+
+    def peek(self, open_: float, high: float, low: float, close: float) -> Tuple[float, float, float, float]:
+        """HA values for a still-forming bar, without committing it."""
+        return self._next(open_, high, low, close)
+
+    def to_state(self) -> Dict:
+        return {"ha_open": self.ha_open, "ha_close": self.ha_close, "bars": self.bars}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "StreamingHeikinAshi":
+        obj = cls()
+        obj.ha_open = float(state["ha_open"])
+        obj.ha_close = float(state["ha_close"])
+        obj.bars = int(state["bars"])
+        return obj
@@ -0,0 +1,243 @@
+"""
+Record/replay cassette for Dhan API traffic.
+
+Hooks `requests.Session.send`, so it sees the HTTP calls made with
+`requests`: the `dhanhq` client session, Tradehull.ltp_call, Tradehull's
+scrip-master download (which skips its daily file cache while DHAN_CASSETTE
+is set, so the master is always on the cassette) and the raw `requests.post`
+calls in data_collector. Anything fetched another way (urllib, pd.read_csv on
+a URL) bypasses it and still hits the network. In record mode each
+request/response pair is appended, with its timing, to a gzipped JSON-lines
+log. In replay mode the log is served back without touching the network,
+either instantly, at the recorded latency, or accelerated by `speed`.
+
+Usage:
+    from core.cassette import Cassette
+    with Cassette("cassettes/2025-09-12.jsonl.gz", mode="record"):
+        main()
+    with Cassette("cassettes/2025-09-12.jsonl.gz", mode="replay", speed=None):
+        main()   # no sleeps, no network
+
+Or without code changes, from the environment (see install_from_env):
+    DHAN_CASSETTE=cassettes/day.jsonl.gz DHAN_CASSETTE_MODE=replay python paper_trader.py
+"""
+from __future__ import annotations
+
+import atexit
+import base64
+import gzip
+import http.client
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_VERSION = 1
+# Response headers worth keeping; everything else is noise for replay
+_KEPT_HEADERS = ("content-type", "retry-after")
+
+
+class CassetteMiss(requests.ConnectionError):
+    """Raised in replay mode when no recorded response matches a request."""
+
+
+def _canonical_body(body) -> Optional[str]:
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "replace")
+    try:
+        return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return str(body)
+
+
+class Cassette:
+    """
+    Context manager that records or replays HTTP traffic made through `requests`.
+
+    Args:
+        path: cassette file (.jsonl.gz); created on record, read on replay.
+        mode: "record" or "replay".
+        speed: replay pacing. None serves responses instantly, 1.0 sleeps the
+            recorded latency, 10.0 sleeps a tenth of it.
+        strict: replay only on an exact (method, url, body) match. When False a
+            miss falls back to the next unused recording for the same method and
+            path, which tolerates date-stamped payloads (e.g. today's fromDate).
+    """
+
+    def __init__(self, path: str, mode: str = "replay", speed: Optional[float] = None, strict: bool = False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode must be 'record' or 'replay', got {mode}")
+        if speed is not None and speed <= 0:
+            raise ValueError(f"speed must be positive or None, got {speed}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._original_send = None
+        self._fh = None
+        self._t0 = 0.0
+        self._exact: Dict[Tuple, Deque[dict]] = defaultdict(deque)
+        self._by_path: Dict[Tuple, Deque[dict]] = defaultdict(deque)
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+
+    # --- keys ---
+    @staticmethod
+    def _key(method: str, url: str, body: Optional[str]) -> Tuple:
+        return method.upper(), url, body
+
+    @staticmethod
+    def _path_key(method: str, url: str) -> Tuple:
+        return method.upper(), urlsplit(url).path
+
+    # --- lifecycle ---
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.uninstall()
+        return False
+
+    def install(self) -> None:
+        if self._original_send is not None:
+            return
+        if self.mode == "record":
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._fh = gzip.open(self.path, "wt", encoding="utf-8")
+            self._fh.write(json.dumps({"version": CASSETTE_VERSION, "recorded_at": datetime.now().isoformat()}) + "\n")
+        else:
+            self._load()
+        self._t0 = time.perf_counter()
+        self._original_send = requests.Session.send
+        cassette = self
+
+        def send(session, request, **kwargs):
+            if cassette.mode == "record":
+                return cassette._record(session, request, **kwargs)
+            return cassette._replay(request)
+
+        requests.Session.send = send
+
+    def uninstall(self) -> None:
+        if self._original_send is None:
+            return
+        requests.Session.send = self._original_send
+        self._original_send = None
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    # --- record ---
+    def _record(self, session, request, **kwargs):
+        start = time.perf_counter()
+        response = self._original_send(session, request, **kwargs)
+        elapsed = time.perf_counter() - start
+        content = response.content
+        try:
+            text, encoded = content.decode("utf-8"), None
+        except UnicodeDecodeError:
+            text, encoded = None, base64.b64encode(content).decode("ascii")
+        entry = {
+            "t": round(start - self._t0, 6),
+            "ms": round(elapsed * 1000.0, 3),
+            "m": request.method,
+            "u": request.url,
+            "b": _canonical_body(request.body),
+            "s": response.status_code,
+            "h": {k: response.headers[k] for k in _KEPT_HEADERS if k in response.headers},
+        }
+        if encoded is None:
+            entry["c"] = text
+        else:
+            entry["c64"] = encoded
+        line = json.dumps(entry, separators=(",", ":"))
+        with self._lock:
+            self._fh.write(line + "\n")
+            self.recorded += 1
+        return response
+
+    # --- replay ---
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as fh:
+            header = json.loads(fh.readline() or "{}")
+            if header.get("version") != CASSETTE_VERSION:
+                raise ValueError(f"Unsupported cassette version in {self.path}: {header.get('version')}")
+            for line in fh:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                self._exact[self._key(entry["m"], entry["u"], entry["b"])].append(entry)
+                self._by_path[self._path_key(entry["m"], entry["u"])].append(entry)
+
+    def _take(self, request) -> Optional[dict]:
+        key = self._key(request.method, request.url, _canonical_body(request.body))
+        path_key = self._path_key(request.method, request.url)
+        with self._lock:
+            queue = self._exact.get(key)
+            while queue:
+                entry = queue.popleft()
+                if not entry.get("_used"):
+                    entry["_used"] = True
+                    return entry
+            if self.strict:
+                return None
+            queue = self._by_path.get(path_key)
+            while queue:
+                entry = queue.popleft()
+                if not entry.get("_used"):
+                    entry["_used"] = True
+                    return entry
+        return None
+
+    def _replay(self, request):
+        entry = self._take(request)
+        if entry is None:
+            self.misses += 1
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url}", request=request)
+        self.hits += 1
+        if self.speed is not None:
+            time.sleep(entry["ms"] / 1000.0 / self.speed)
+
+        response = requests.Response()
+        response.status_code = entry["s"]
+        response.reason = http.client.responses.get(entry["s"], "")
+        response.headers = CaseInsensitiveDict(entry.get("h", {}))
+        response._content = entry["c"].encode("utf-8") if "c" in entry else base64.b64decode(entry["c64"])
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.elapsed = timedelta(milliseconds=entry["ms"])
+        return response
+
+
+def install_from_env() -> Optional[Cassette]:
+    """
+    Installs a process-wide cassette when DHAN_CASSETTE is set.
+
+    DHAN_CASSETTE        path to the cassette file
+    DHAN_CASSETTE_MODE   record | replay (default replay)
+    DHAN_CASSETTE_SPEED  replay speed multiplier; unset or 0 means instant
+    """
+    path = os.getenv("DHAN_CASSETTE")
+    if not path:
+        return None
+    speed = float(os.getenv("DHAN_CASSETTE_SPEED", "0") or 0) or None
+    cassette = Cassette(path, mode=os.getenv("DHAN_CASSETTE_MODE", "replay"), speed=speed)
+    cassette.install()
+    atexit.register(cassette.uninstall)
+    print(f"[CASSETTE] {cassette.mode} -> {path}")
+    return cassette
@@ -0,0 +1,215 @@
+"""
+Levelled, buffered event recorder for strategy and backtest events.
+
+Replaces per-event print() in the strategy hot paths. Events are kept in
+memory as columns (time, level, kind plus whatever fields the emitter
+attaches) and their text lines are only produced when something needs them:
+echo to stdout, an append-only log file, or lines() on demand. Output is
+written in one go per `buffer_size` events (and on flush()), not once per
+event.
+
+Levels follow the logging module (TRACE < DEBUG < INFO < WARN); OFF drops
+everything. Emitters check enabled(level) first, so a disabled recorder
+costs one comparison per call site; the array backtest engine skips event
+tracing altogether.
+
+    rec = EventRecorder(level=DEBUG, path="trade_logs/backtest_events.log")
+    backtest(df, recorder=rec)
+    rec.frame("exit")           # DataFrame of exit events
+    rec.lines(INFO)             # entry/exit lines only
+
+The module-level default (get_recorder()) echoes DEBUG and above to stdout,
+which reproduces the strategy's former print output; whatever it still
+buffers is written at interpreter exit.
+"""
+from __future__ import annotations
+
+import atexit
+import sys
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+TRACE, DEBUG, INFO, WARN, OFF = 5, 10, 20, 30, 100
+LEVEL_NAMES = {"TRACE": TRACE, "DEBUG": DEBUG, "INFO": INFO, "WARN": WARN, "OFF": OFF}
+
+Messages = Union[List[str], Callable[[], List[str]]]
+
+
+def parse_level(level: Union[int, str]) -> int:
+    if isinstance(level, str):
+        try:
+            return LEVEL_NAMES[level.upper()]
+        except KeyError:
+            raise ValueError(f"Unknown level '{level}'. Known: {list(LEVEL_NAMES)}") from None
+    return int(level)
+
+
+class _Chunk:
+    """A run of events stored column-wise; messages may be a deferred formatter."""
+
+    __slots__ = ("columns", "n", "messages", "row_wise")
+
+    def __init__(self, columns: Dict[str, object], n: int, messages: Messages, row_wise: bool):
+        self.columns = columns
+        self.n = n
+        self.messages = messages
+        self.row_wise = row_wise
+
+    def text(self) -> List[str]:
+        if callable(self.messages):
+            self.messages = self.messages()
+        return self.messages
+
+
+class EventRecorder:
+    """
+    Args:
+        level: minimum level kept (int or name).
+        echo: write event lines to stdout (resolved at flush time).
+        path: append event lines to this file.
+        buffer_size: pending events that trigger an automatic flush.
+        keep: keep events in memory after they are flushed (frame()/lines()).
+    """
+
+    def __init__(self, level: Union[int, str] = INFO, echo: bool = False, path: Optional[str] = None,
+                 buffer_size: int = 4096, keep: bool = True):
+        self.level = parse_level(level)
+        self.echo = echo
+        self.path = path
+        self.buffer_size = max(1, buffer_size)
+        self.keep = keep
+        self._chunks: List[_Chunk] = []
+        self._flushed = 0   # chunks already written out
+        self._pending = 0   # events not yet written out
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    @property
+    def _has_sink(self) -> bool:
+        return self.echo or bool(self.path)
+
+    # --- recording ---
+    def emit(self, level: int, kind: str, message: str, time=None, **fields) -> None:
+        """One event. Consecutive events of the same kind share a chunk."""
+        if level < self.level:
+            return
+        tail = self._chunks[-1] if len(self._chunks) > self._flushed else None
+        row = {"time": time, "level": level, "kind": kind, **fields}
+        if tail is not None and tail.row_wise and tail.columns.keys() == row.keys() and tail.columns["kind"][0] == kind:
+            for name, value in row.items():
+                tail.columns[name].append(value)
+            tail.messages.append(message)
+            tail.n += 1
+        else:
+            self._chunks.append(_Chunk({name: [value] for name, value in row.items()}, 1, [message], True))
+        self._added(1)
+
+    def extend(self, columns: Dict[str, Sequence], messages: Messages) -> None:
+        """
+        A block of events as columns (must include time, level and kind).
+        `messages` may be a callable, evaluated only when the lines are needed.
+        Rows below the recorder level are dropped.
+        """
+        level = np.asarray(columns["level"])
+        keep = level >= self.level
+        n = int(keep.sum())
+        if n == 0:
+            return
+        if not keep.all():
+            columns = {name: np.asarray(values)[keep] for name, values in columns.items()}
+            source = messages
+            messages = (lambda: [m for m, k in zip(source() if callable(source) else source, keep) if k])
+        self._chunks.append(_Chunk(dict(columns), n, messages, False))
+        self._added(n)
+
+    def _added(self, n: int) -> None:
+        self._pending += n
+        if self._pending >= self.buffer_size:
+            self.flush()
+
+    # --- output ---
+    def flush(self) -> None:
+        """Writes pending event lines to the sinks in one write each."""
+        new = self._chunks[self._flushed:]
+        if new and self._has_sink:
+            text = "".join(line + "\n" for chunk in new for line in chunk.text())
+            if self.echo:
+                sys.stdout.write(text)
+                sys.stdout.flush()
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    fh.write(text)
+        if not self.keep:
+            del self._chunks[:]
+        self._flushed = len(self._chunks)
+        self._pending = 0
+
+    close = flush
+
+    def clear(self) -> None:
+        self._chunks = []
+        self._flushed = 0
+        self._pending = 0
+
+    def __len__(self) -> int:
+        return sum(chunk.n for chunk in self._chunks)
+
+    def lines(self, level: Optional[int] = None) -> List[str]:
+        """Text of every kept event at or above `level` (default: all kept)."""
+        out = []
+        for chunk in self._chunks:
+            text = chunk.text()
+            if level is None:
+                out.extend(text)
+            else:
+                out.extend(line for line, lv in zip(text, chunk.columns["level"]) if lv >= level)
+        return out
+
+    def frame(self, kind: Optional[str] = None):
+        """Kept events as a DataFrame (union of fields), optionally for one kind."""
+        import pandas as pd
+
+        parts = [pd.DataFrame({name: list(values) if chunk.row_wise else values for name, values in chunk.columns.items()})
+                 for chunk in self._chunks]
+        if not parts:
+            return pd.DataFrame(columns=["time", "level", "kind"])
+        df = pd.concat(parts, ignore_index=True)
+        if kind is not None:
+            df = df[df["kind"] == kind].dropna(axis=1, how="all").reset_index(drop=True)
+        return df
+
+
+# Echo only: nothing is kept once written, so long sessions do not grow
+_DEFAULT = EventRecorder(level=DEBUG, echo=True, keep=False)
+
+
+def get_recorder() -> EventRecorder:
+    return _DEFAULT
+
+
+def set_recorder(recorder: EventRecorder) -> EventRecorder:
+    """Installs the process-wide default recorder; returns the previous one."""
+    global _DEFAULT
+    previous, _DEFAULT = _DEFAULT, recorder
+    return previous
+
+
+def _flush_default() -> None:
+    _DEFAULT.flush()
+
+
+atexit.register(_flush_default)
+
+
+@contextmanager
+def recording(recorder: EventRecorder) -> Iterator[EventRecorder]:
+    """Routes default-recorder events to `recorder` inside the block, flushing it on exit."""
+    previous = set_recorder(recorder)
+    try:
+        yield recorder
+    finally:
+        set_recorder(previous)
+        recorder.flush()
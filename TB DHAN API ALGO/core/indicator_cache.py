@@ -0,0 +1,308 @@
+"""
+Persistent, content-addressed cache for indicator columns.
+
+Entries are keyed by (dataset fingerprint, indicator name, params). The
+fingerprint hashes the bar timestamps and OHLC values, so the same candles
+always hit the same entry however the file was named or loaded. Each entry
+also stores the streaming indicator state at its last bar: when the candle
+archive later grows, the cached prefix is recognised and only the appended
+bars are folded in, giving the same values a full recompute would.
+
+A miss costs one vectorized compute: the EMA and MACD states fall out of the
+EMA passes that produce the columns, and the ATR state out of the compiled
+ATR kernel. Without numba the ATR entry is saved stateless and its state is
+replayed from the cached prefix only when the archive first grows past it.
+
+The cache lives next to the candle archive:
+    .vscode/data/nifty_5min_last_year.csv
+    .vscode/data/.indicator_cache/nifty_5min_last_year/<key>.npy + index.json
+
+index.json is read, updated and replaced under an OS file lock (index.lock),
+so several processes can share one cache root.
+
+Usage:
+    cache = IndicatorCache.for_archive(path)
+    cache.apply_v25(df)      # adds ema21/macd/macd_signal/macd_hist/atr
+"""
+from __future__ import annotations
+
+import errno
+import hashlib
+import json
+import os
+import threading
+from contextlib import ExitStack, contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from core.indicators import (
+    StreamingATR,
+    StreamingEMA,
+    StreamingMACD,
+    atr_array_with_state,
+    ema_array,
+)
+
+CACHE_VERSION = 1
+CACHE_DIRNAME = ".indicator_cache"
+# Entries kept per (name, params), e.g. for a few differently sized archives
+MAX_ENTRIES_PER_KEY = 4
+# Past this many appended bars a full vectorized recompute beats the streaming extension
+MAX_EXTEND_BARS = 2048
+
+
+def _bar_arrays(df) -> Dict[str, np.ndarray]:
+    import pandas as pd
+
+    arrays = {}
+    if "datetime" in df.columns:
+        dt = df["datetime"]
+        if not pd.api.types.is_datetime64_any_dtype(dt):
+            dt = pd.to_datetime(dt)
+        epoch = pd.Timestamp("1970-01-01", tz="UTC") if dt.dt.tz is not None else pd.Timestamp("1970-01-01")
+        arrays["datetime"] = np.ascontiguousarray(((dt - epoch) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64))
+    for col in ("high", "low", "close"):
+        arrays[col] = np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+    return arrays
+
+
+def fingerprint(bars: Dict[str, np.ndarray], n: Optional[int] = None) -> str:
+    """Hash of the first n bars (all bars when n is None)."""
+    h = hashlib.blake2b(digest_size=16)
+    for name in sorted(bars):
+        values = bars[name] if n is None else bars[name][:n]
+        h.update(name.encode())
+        h.update(values.tobytes())
+    return h.hexdigest()
+
+
+# name -> (parameter names, output columns, compute -> (columns, state or None),
+#          streaming state builder, streaming updater, state class)
+def _ema_compute(bars, span):
+    ema = ema_array(bars["close"], span)
+    return [ema], StreamingEMA.from_history(bars["close"], span, ema)
+
+
+def _ema_state(bars, span):
+    return StreamingEMA.from_history(bars["close"], span)
+
+
+def _ema_extend(state, bars, start):
+    return [[state.update(c) for c in bars["close"][start:]]]
+
+
+def _macd_compute(bars, fast, slow, signal):
+    # the same EMA passes as macd_arrays, kept apart so the state needs no second pass
+    x = bars["close"]
+    fast_ema, slow_ema = ema_array(x, fast), ema_array(x, slow)
+    macd = fast_ema - slow_ema
+    sig = ema_array(macd, signal)
+    state = StreamingMACD.from_history(x, fast, slow, signal, fast_ema, slow_ema, sig)
+    return [macd, sig, macd - sig], state
+
+
+def _macd_state(bars, fast, slow, signal):
+    return StreamingMACD.from_history(bars["close"], fast, slow, signal)
+
+
+def _macd_extend(state, bars, start):
+    rows = [state.update(c) for c in bars["close"][start:]]
+    return [list(col) for col in zip(*rows)] if rows else [[], [], []]
+
+
+def _atr_compute(bars, period):
+    atr, state = atr_array_with_state(bars["high"], bars["low"], bars["close"], period)
+    return [atr], state
+
+
+def _atr_state(bars, period):
+    return StreamingATR.from_history(bars["high"], bars["low"], bars["close"], period)
+
+
+def _atr_extend(state, bars, start):
+    h, l, c = bars["high"][start:], bars["low"][start:], bars["close"][start:]
+    return [[state.update(h[i], l[i], c[i]) for i in range(len(c))]]
+
+
+INDICATORS = {
+    "ema": (("span",), ("ema",), _ema_compute, _ema_state, _ema_extend, StreamingEMA),
+    "macd": (("fast", "slow", "signal"), ("macd", "macd_signal", "macd_hist"), _macd_compute, _macd_state, _macd_extend, StreamingMACD),
+    "atr": (("period",), ("atr",), _atr_compute, _atr_state, _atr_extend, StreamingATR),
+}
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    """Exclusive inter-process lock on `path` (created if missing), released on exit."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a+b") as fh:
+        if os.name == "nt":
+            import msvcrt
+
+            fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)  # retries for ~10 s, then raises
+                    break
+                except OSError as e:
+                    if e.errno != errno.EDEADLK:  # EDEADLK: still held after msvcrt's retries
+                        raise
+            try:
+                yield
+            finally:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+class IndicatorCache:
+    """
+    On-disk indicator cache rooted at `root`.
+
+    get() returns {output column: array} for one indicator, computing it in
+    full on a miss, extending it when the data is a strict extension of a
+    cached dataset, and loading it as-is on an exact hit.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.extensions = 0
+        self.misses = 0
+
+    @classmethod
+    def for_archive(cls, archive_path: str) -> "IndicatorCache":
+        folder, name = os.path.split(os.path.abspath(archive_path))
+        return cls(os.path.join(folder, CACHE_DIRNAME, os.path.splitext(name)[0]))
+
+    # --- index ---
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.root, "index.json")
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Thread lock plus the cross-process file lock guarding the index."""
+        with self._lock, ExitStack() as stack:
+            try:
+                stack.enter_context(_file_lock(os.path.join(self.root, "index.lock")))
+            except OSError as e:  # read-only location: run unlocked, the write below warns too
+                print(f"[WARN] Indicator cache lock unavailable at {self.root}: {e}")
+            yield
+
+    def _read_index(self) -> Dict[str, List[dict]]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as fh:
+                index = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return index.get("entries", {}) if index.get("version") == CACHE_VERSION else {}
+
+    def _write_index(self, entries: Dict[str, List[dict]]) -> None:
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": CACHE_VERSION, "entries": entries}, fh, indent=1)
+        os.replace(tmp, self._index_path)
+
+    @staticmethod
+    def _param_key(name: str, params: Tuple) -> str:
+        return name + ":" + ",".join(str(p) for p in params)
+
+    @staticmethod
+    def _entry_file(fp: str, param_key: str) -> str:
+        return hashlib.blake2b(f"{fp}|{param_key}".encode(), digest_size=16).hexdigest() + ".npy"
+
+    def _load(self, entry: dict) -> Optional[np.ndarray]:
+        """(n_columns, n_bars) matrix of a cached entry, or None if it is unreadable."""
+        try:
+            values = np.load(os.path.join(self.root, entry["file"]))
+        except (OSError, ValueError):
+            return None
+        return values if values.ndim == 2 and values.shape[1] == entry["bars"] else None
+
+    def _save(self, fp: str, n: int, param_key: str, values, state) -> dict:
+        os.makedirs(self.root, exist_ok=True)
+        fname = self._entry_file(fp, param_key)
+        tmp = os.path.join(self.root, fname + ".tmp")
+        with open(tmp, "wb") as fh:
+            np.save(fh, np.vstack(values))
+        os.replace(tmp, os.path.join(self.root, fname))
+        return {"fingerprint": fp, "bars": n, "file": fname, "state": None if state is None else state.to_state()}
+
+    # --- lookup ---
+    def get(self, df, name: str, **params) -> Dict[str, np.ndarray]:
+        """{column: values} for indicator `name` (ema | macd | atr) over the frame's bars."""
+        bars = _bar_arrays(df)
+        return self._get(bars, fingerprint(bars), name, params)
+
+    def _get(self, bars: Dict[str, np.ndarray], fp: str, name: str, params: Dict) -> Dict[str, np.ndarray]:
+        if name not in INDICATORS:
+            raise ValueError(f"Unknown indicator '{name}'. Known: {sorted(INDICATORS)}")
+        param_names, columns, compute, build_state, extend, state_cls = INDICATORS[name]
+        missing = [p for p in param_names if p not in params]
+        if missing:
+            raise ValueError(f"Indicator '{name}' needs parameters {missing}")
+        args = tuple(int(params[p]) for p in param_names)
+        param_key = self._param_key(name, args)
+        n = len(bars["close"])
+
+        with self._locked():
+            entries = self._read_index()
+            known = entries.get(param_key, [])
+            for entry in known:
+                if entry["fingerprint"] == fp and entry["bars"] == n:
+                    loaded = self._load(entry)
+                    if loaded is not None:
+                        self.hits += 1
+                        return dict(zip(columns, loaded))
+
+            values = state = None
+            for entry in sorted(known, key=lambda e: -e["bars"]):
+                if 0 < n - entry["bars"] <= MAX_EXTEND_BARS and fingerprint(bars, entry["bars"]) == entry["fingerprint"]:
+                    cached = self._load(entry)
+                    if cached is None:
+                        continue
+                    if entry.get("state") is not None:
+                        state = state_cls.from_state(entry["state"])
+                    else:  # saved by a miss that had no cheap state
+                        state = build_state({k: v[:entry["bars"]] for k, v in bars.items()}, *args)
+                    tail = extend(state, bars, entry["bars"])
+                    values = [np.concatenate([old, np.asarray(new, dtype=np.float64)]) for old, new in zip(cached, tail)]
+                    self.extensions += 1
+                    break
+            if values is None:
+                values, state = compute(bars, *args)
+                self.misses += 1
+
+            try:
+                entry = self._save(fp, n, param_key, values, state)
+                known = [entry] + [e for e in known if e["file"] != entry["file"]]
+                for stale in known[MAX_ENTRIES_PER_KEY:]:
+                    try:
+                        os.remove(os.path.join(self.root, stale["file"]))
+                    except OSError:
+                        pass
+                entries[param_key] = known[:MAX_ENTRIES_PER_KEY]
+                self._write_index(entries)
+            except OSError as e:
+                print(f"[WARN] Indicator cache not updated at {self.root}: {e}")
+        return dict(zip(columns, values))
+
+    def apply_v25(self, df):
+        """Writes the V25 columns (EMA21, MACD 12/26/9, ATR 14) onto df in place, via the cache."""
+        bars = _bar_arrays(df)
+        fp = fingerprint(bars)
+        df["ema21"] = self._get(bars, fp, "ema", {"span": 21})["ema"]
+        for col, values in self._get(bars, fp, "macd", {"fast": 12, "slow": 26, "signal": 9}).items():
+            df[col] = values
+        df["atr"] = self._get(bars, fp, "atr", {"period": 14})["atr"]
+        return df
@@ -0,0 +1,866 @@
+"""
+Indicators for Strategy V25 (EMA21, MACD 12/26/9, ATR 14).
+
+Streaming objects keep just enough state to fold in one bar at a time in
+O(1), and reproduce the pandas formulas used by strategy_v25 bit for bit:
+- EMA:  series.ewm(span=n, adjust=False).mean()
+- ATR:  max(H-L, |H-Cprev|, |L-Cprev|).rolling(n).mean()
+- MACD: EMA(fast) - EMA(slow), its EMA(signal), and the histogram
+
+The update order and the compensated (Kahan) running sum mirror pandas'
+own ewma/roll_mean kernels, which is what makes the outputs identical
+rather than merely close. Every object round-trips through to_state() /
+from_state() (plain JSON-able dicts) so a live session can be resumed.
+
+For whole series, ema_array / macd_arrays / atr_array work on contiguous
+float64 arrays. With numba installed they are single fused passes;
+otherwise the true range is vectorized in NumPy and the recurrences use
+pandas' compiled loops, without the Series/concat temporaries.
+"""
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+try:  # optional JIT; without it the array functions fall back to NumPy and pandas ewm/rolling
+    from numba import njit as _njit
+    HAVE_NUMBA = True
+except ImportError:
+    _njit = None
+    HAVE_NUMBA = False
+
+NAN = float("nan")
+
+
+def ema_alpha(span: float) -> float:
+    """Smoothing factor exactly as pandas derives it from `span`."""
+    if span < 1:
+        raise ValueError(f"span must satisfy span >= 1, got {span}")
+    com = (span - 1) / 2.0
+    return 1.0 / (1.0 + com)
+
+
+class StreamingEMA:
+    """Incremental EMA equal to series.ewm(span=span, adjust=False).mean()."""
+
+    def __init__(self, span: int):
+        self.span = span
+        self.alpha = ema_alpha(span)
+        self._old_wt_factor = 1.0 - self.alpha
+        self.value = NAN
+        self._old_wt = 1.0  # decays across NaN gaps, as in pandas with ignore_na=False
+
+    def _next(self, x: float) -> Tuple[float, float]:
+        w, old_wt = self.value, self._old_wt
+        if w != w:  # no observation yet
+            return x, old_wt
+        old_wt *= self._old_wt_factor
+        if x == x:
+            if w != x:
+                w = (old_wt * w + self.alpha * x) / (old_wt + self.alpha)
+            old_wt = 1.0
+        return w, old_wt
+
+    def update(self, x: float) -> float:
+        self.value, self._old_wt = self._next(x)
+        return self.value
+
+    def peek(self, x: float) -> float:
+        """Value the EMA would take on `x`, without committing it."""
+        return self._next(x)[0]
+
+    def to_state(self) -> Dict:
+        return {"span": self.span, "value": self.value, "old_wt": self._old_wt}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "StreamingEMA":
+        obj = cls(state["span"])
+        obj.value = float(state["value"])
+        obj._old_wt = float(state.get("old_wt", 1.0))
+        return obj
+
+    @classmethod
+    def from_history(cls, values, span: int, ema=None) -> "StreamingEMA":
+        """State after folding in `values`; pass the precomputed ema_array output to skip a pass."""
+        x = _f64(values)
+        obj = cls(span)
+        if len(x) == 0:
+            return obj
+        ema = ema_array(x, span) if ema is None else ema
+        obj.value = float(ema[-1])
+        if obj.value == obj.value:
+            observed = np.flatnonzero(~np.isnan(x))
+            for _ in range(len(x) - 1 - int(observed[-1])):
+                obj._old_wt *= obj._old_wt_factor
+        return obj
+
+
+class StreamingMACD:
+    """Incremental MACD line, signal line and histogram (12/26/9 by default)."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        macd = self.fast.update(close) - self.slow.update(close)
+        sig = self.signal.update(macd)
+        return macd, sig, macd - sig
+
+    def peek(self, close: float) -> Tuple[float, float, float]:
+        macd = self.fast.peek(close) - self.slow.peek(close)
+        sig = self.signal.peek(macd)
+        return macd, sig, macd - sig
+
+    def to_state(self) -> Dict:
+        return {"fast": self.fast.to_state(), "slow": self.slow.to_state(), "signal": self.signal.to_state()}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "StreamingMACD":
+        obj = cls.__new__(cls)
+        obj.fast = StreamingEMA.from_state(state["fast"])
+        obj.slow = StreamingEMA.from_state(state["slow"])
+        obj.signal = StreamingEMA.from_state(state["signal"])
+        return obj
+
+    @classmethod
+    def from_history(cls, values, fast: int = 12, slow: int = 26, signal: int = 9,
+                     fast_ema=None, slow_ema=None, signal_ema=None) -> "StreamingMACD":
+        """State after folding in `values`; pass precomputed fast/slow/signal EMAs to skip their passes."""
+        x = _f64(values)
+        obj = cls.__new__(cls)
+        fast_ema = ema_array(x, fast) if fast_ema is None else fast_ema
+        slow_ema = ema_array(x, slow) if slow_ema is None else slow_ema
+        obj.fast = StreamingEMA.from_history(x, fast, fast_ema)
+        obj.slow = StreamingEMA.from_history(x, slow, slow_ema)
+        obj.signal = StreamingEMA.from_history(fast_ema - slow_ema, signal, signal_ema)
+        return obj
+
+
+class StreamingATR:
+    """
+    Incremental ATR equal to true_range.rolling(period).mean() as built in
+    strategy_v25.ATR (first bar's true range is just high - low).
+    """
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close = NAN
+        self._window: deque = deque()
+        self._nobs = 0
+        self._neg_ct = 0
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_run = 0
+        self._prev_value = NAN
+
+    def true_range(self, high: float, low: float) -> float:
+        # DataFrame.max(axis=1) skips NaN, so the first bar reduces to high - low
+        candidates = [high - low]
+        if self.prev_close == self.prev_close:
+            candidates += [abs(high - self.prev_close), abs(low - self.prev_close)]
+        valid = [c for c in candidates if c == c]
+        return max(valid) if valid else NAN
+
+    def _fold(self, tr: float):
+        """Returns the state after adding `tr` (and evicting the oldest value) plus the mean."""
+        nobs, neg_ct, total = self._nobs, self._neg_ct, self._sum
+        comp_add, comp_remove = self._comp_add, self._comp_remove
+        same_run, prev_value = self._same_run, self._prev_value
+
+        if len(self._window) == self.period:
+            old = self._window[0]
+            if old == old:
+                nobs -= 1
+                y = -old - comp_remove
+                t = total + y
+                comp_remove = t - total - y
+                total = t
+                if math.copysign(1.0, old) < 0:
+                    neg_ct -= 1
+        if tr == tr:
+            nobs += 1
+            y = tr - comp_add
+            t = total + y
+            comp_add = t - total - y
+            total = t
+            if math.copysign(1.0, tr) < 0:
+                neg_ct += 1
+            same_run = same_run + 1 if tr == prev_value else 1
+            prev_value = tr
+
+        if nobs >= self.period and nobs > 0:
+            mean = total / nobs
+            if same_run >= nobs:
+                mean = prev_value
+            elif neg_ct == 0 and mean < 0:
+                mean = 0.0
+            elif neg_ct == nobs and mean > 0:
+                mean = 0.0
+        else:
+            mean = NAN
+        return (nobs, neg_ct, total, comp_add, comp_remove, same_run, prev_value), mean
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = self.true_range(high, low)
+        state, mean = self._fold(tr)
+        (self._nobs, self._neg_ct, self._sum, self._comp_add,
+         self._comp_remove, self._same_run, self._prev_value) = state
+        if len(self._window) == self.period:
+            self._window.popleft()
+        self._window.append(tr)
+        self.prev_close = close
+        return mean
+
+    def peek(self, high: float, low: float, close: float) -> float:
+        return self._fold(self.true_range(high, low))[1]
+
+    def to_state(self) -> Dict:
+        return {
+            "period": self.period, "prev_close": self.prev_close, "window": list(self._window),
+            "nobs": self._nobs, "neg_ct": self._neg_ct, "sum": self._sum,
+            "comp_add": self._comp_add, "comp_remove": self._comp_remove,
+            "same_run": self._same_run, "prev_value": self._prev_value,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "StreamingATR":
+        obj = cls(state["period"])
+        obj.prev_close = float(state["prev_close"])
+        obj._window = deque(float(v) for v in state["window"])
+        obj._nobs = int(state["nobs"])
+        obj._neg_ct = int(state["neg_ct"])
+        obj._sum = float(state["sum"])
+        obj._comp_add = float(state["comp_add"])
+        obj._comp_remove = float(state["comp_remove"])
+        obj._same_run = int(state["same_run"])
+        obj._prev_value = float(state["prev_value"])
+        return obj
+
+    @classmethod
+    def from_history(cls, high, low, close, period: int = 14) -> "StreamingATR":
+        """State after folding in the given bars (runs the ATR loop once to recover the running sums)."""
+        h, l, c = _f64(high), _f64(low), _f64(close)
+        obj = cls(period)
+        if len(c) == 0:
+            return obj
+        tr, out = np.empty_like(c), np.empty_like(c)
+        if HAVE_NUMBA:
+            state = _atr_kernel(h, l, c, period, tr, out)
+        else:
+            tr, out = [NAN] * len(c), [NAN] * len(c)
+            state = _atr_kernel(h.tolist(), l.tolist(), c.tolist(), period, tr, out)
+        return cls._from_kernel(period, state, tr, c)
+
+    @classmethod
+    def _from_kernel(cls, period: int, state, tr, close) -> "StreamingATR":
+        """State from _atr_kernel's returned running sums, its true ranges and the closes."""
+        obj = cls(period)
+        (obj._nobs, obj._neg_ct, obj._sum, obj._comp_add,
+         obj._comp_remove, obj._same_run, obj._prev_value) = (
+            int(state[0]), int(state[1]), float(state[2]), float(state[3]),
+            float(state[4]), int(state[5]), float(state[6]))
+        obj._window = deque(float(v) for v in tr[-period:])
+        obj.prev_close = float(close[-1])
+        return obj
+
+
+V25_COLUMNS = ("ema21", "macd", "macd_signal", "macd_hist", "atr")
+
+
+class V25Indicators:
+    """
+    The full V25 indicator set (EMA21, MACD 12/26/9, ATR 14) as one streaming object.
+
+    update() commits a closed bar; peek() evaluates a still-forming bar without
+    changing state. Both return a dict keyed like the strategy DataFrame columns.
+    """
+
+    def __init__(self, ema_period: int = 21, fast: int = 12, slow: int = 26, signal: int = 9, atr_period: int = 14):
+        self.ema = StreamingEMA(ema_period)
+        self.macd = StreamingMACD(fast, slow, signal)
+        self.atr = StreamingATR(atr_period)
+        self.bars = 0
+
+    @staticmethod
+    def _pack(ema, macd, atr) -> Dict[str, float]:
+        return {"ema21": ema, "macd": macd[0], "macd_signal": macd[1], "macd_hist": macd[2], "atr": atr}
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        self.bars += 1
+        return self._pack(self.ema.update(close), self.macd.update(close), self.atr.update(high, low, close))
+
+    def peek(self, high: float, low: float, close: float) -> Dict[str, float]:
+        return self._pack(self.ema.peek(close), self.macd.peek(close), self.atr.peek(high, low, close))
+
+    def warm_up(self, df) -> None:
+        """Folds every bar of an OHLC frame into the state."""
+        for h, l, c in zip(df["high"].to_numpy(dtype=float), df["low"].to_numpy(dtype=float), df["close"].to_numpy(dtype=float)):
+            self.update(h, l, c)
+
+    def to_state(self) -> Dict:
+        return {"ema": self.ema.to_state(), "macd": self.macd.to_state(), "atr": self.atr.to_state(), "bars": self.bars}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "V25Indicators":
+        obj = cls.__new__(cls)
+        obj.ema = StreamingEMA.from_state(state["ema"])
+        obj.macd = StreamingMACD.from_state(state["macd"])
+        obj.atr = StreamingATR.from_state(state["atr"])
+        obj.bars = int(state.get("bars", 0))
+        return obj
+
+
+class IndicatorStream:
+    """
+    Keeps V25 indicator values in step with live bars, matched by bar start time.
+
+    Bars and their indicator values live in a fixed-capacity RingBarStore, so
+    memory stays flat over a session and consumers can read store.window()
+    directly. The newest bar is treated as still forming: it is peeked, not
+    committed, and is folded into the indicator state only once a bar with a
+    later start arrives. Re-delivering it with revised prices is O(1).
+
+    push() takes one bar at a time (tick aggregator, raw REST arrays);
+    sync(df) takes a polled frame, which may be a sliding window whose oldest
+    rows have scrolled off - only rows at or after the newest stored bar are
+    folded in.
+    """
+
+    def __init__(self, engine: V25Indicators = None, capacity: int = 500, time_col: str = "datetime"):
+        from core.candle_data import RingBarStore
+
+        self.engine = engine or V25Indicators()
+        self.time_col = time_col
+        self.store = RingBarStore(capacity, extra_fields=V25_COLUMNS)
+
+    @property
+    def last_start(self):
+        """Start (epoch seconds) of the newest stored bar, or None when empty."""
+        return int(self.store.starts(1)[0]) if len(self.store) else None
+
+    def push(self, start: int, open: float, high: float, low: float, close: float, volume: float = 0.0) -> bool:
+        """
+        Folds in one bar. A later start commits the previous newest bar; the
+        same start revises the forming bar. Returns False (and ignores the
+        bar) when it is older than the newest stored bar.
+        """
+        store = self.store
+        last = self.last_start
+        if last is not None and start < last:
+            return False
+        if start == last:
+            store.set_last(open=open, high=high, low=low, close=close, volume=volume)
+        else:
+            if last is not None:
+                store.set_last(**self.engine.update(store.last("high"), store.last("low"), store.last("close")))
+            store.append(start, open, high, low, close, volume)
+        store.set_last(**self.engine.peek(high, low, close))
+        return True
+
+    def sync(self, df):
+        """
+        Pushes the rows of `df` that are new or still forming, then writes the
+        indicator columns onto `df` in place (and returns it). Rows older than
+        the retained history get NaN.
+        """
+        from core.candle_data import epoch_seconds
+
+        starts = epoch_seconds(df[self.time_col])
+        last = self.last_start
+        first = 0 if last is None else int(np.searchsorted(starts, last, side="left"))
+        if first < len(df):
+            cols = [df[f].to_numpy(dtype=float) for f in ("open", "high", "low", "close")]
+            volume = df["volume"].to_numpy(dtype=float) if "volume" in df.columns else np.zeros(len(df))
+            for i in range(first, len(df)):
+                self.push(int(starts[i]), cols[0][i], cols[1][i], cols[2][i], cols[3][i], volume[i])
+
+        stored = self.store.starts()
+        pos = np.searchsorted(stored, starts)
+        hit = pos < len(stored)
+        hit[hit] = stored[pos[hit]] == starts[hit]
+        for name in V25_COLUMNS:
+            col = np.full(len(df), NAN)
+            col[hit] = self.store.window(name)[pos[hit]]
+            df[name] = col
+        return df
+
+
+# ---------------------------
+# Array kernels
+# ---------------------------
+# Written in the subset of Python numba compiles and used when it is
+# installed. Without numba the public functions below fall back to NumPy for
+# the elementwise work and pandas' compiled ewm/rolling loops for the
+# recurrences; both paths produce identical values.
+
+def _ema_kernel(x, alpha, out):
+    factor = 1.0 - alpha
+    n = len(x)
+    if n == 0:
+        return
+    w = x[0]
+    old_wt = 1.0
+    out[0] = w
+    for i in range(1, n):
+        cur = x[i]
+        if w == w:
+            old_wt *= factor
+            if cur == cur:
+                if w != cur:
+                    w = (old_wt * w + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif cur == cur:
+            w = cur
+        out[i] = w
+
+
+def _macd_kernel(x, a_fast, a_slow, a_signal, macd, signal, hist):
+    f_fast = 1.0 - a_fast
+    f_slow = 1.0 - a_slow
+    f_signal = 1.0 - a_signal
+    n = len(x)
+    if n == 0:
+        return
+    fast = x[0]
+    slow = x[0]
+    wt_fast = 1.0
+    wt_slow = 1.0
+    wt_signal = 1.0
+    m = fast - slow
+    sig = m
+    macd[0] = m
+    signal[0] = sig
+    hist[0] = m - sig
+    for i in range(1, n):
+        cur = x[i]
+        if fast == fast:
+            wt_fast *= f_fast
+            if cur == cur:
+                if fast != cur:
+                    fast = (wt_fast * fast + a_fast * cur) / (wt_fast + a_fast)
+                wt_fast = 1.0
+        elif cur == cur:
+            fast = cur
+        if slow == slow:
+            wt_slow *= f_slow
+            if cur == cur:
+                if slow != cur:
+                    slow = (wt_slow * slow + a_slow * cur) / (wt_slow + a_slow)
+                wt_slow = 1.0
+        elif cur == cur:
+            slow = cur
+        m = fast - slow
+        if sig == sig:
+            wt_signal *= f_signal
+            if m == m:
+                if sig != m:
+                    sig = (wt_signal * sig + a_signal * m) / (wt_signal + a_signal)
+                wt_signal = 1.0
+        elif m == m:
+            sig = m
+        macd[i] = m
+        signal[i] = sig
+        hist[i] = m - sig
+
+
+def _atr_kernel(high, low, close, period, tr, out):
+    n = len(close)
+    nobs = 0
+    neg_ct = 0
+    total = 0.0
+    comp_add = 0.0
+    comp_remove = 0.0
+    same_run = 0
+    prev_value = np.nan
+    prev_close = np.nan
+    for i in range(n):
+        # true range; NaN terms are skipped like DataFrame.max(axis=1)
+        t = high[i] - low[i]
+        if prev_close == prev_close:
+            hc = abs(high[i] - prev_close)
+            lc = abs(low[i] - prev_close)
+            if t != t or hc > t:
+                t = hc
+            if t != t or lc > t:
+                t = lc
+        tr[i] = t
+        prev_close = close[i]
+        # rolling mean with pandas' compensated add/remove
+        if i >= period:
+            old = tr[i - period]
+            if old == old:
+                nobs -= 1
+                y = -old - comp_remove
+                s = total + y
+                comp_remove = s - total - y
+                total = s
+                if old < 0:
+                    neg_ct -= 1
+        if t == t:
+            nobs += 1
+            y = t - comp_add
+            s = total + y
+            comp_add = s - total - y
+            total = s
+            if t < 0:
+                neg_ct += 1
+            if t == prev_value:
+                same_run += 1
+            else:
+                same_run = 1
+            prev_value = t
+        if nobs >= period and nobs > 0:
+            mean = total / nobs
+            if same_run >= nobs:
+                mean = prev_value
+            elif neg_ct == 0 and mean < 0:
+                mean = 0.0
+            elif neg_ct == nobs and mean > 0:
+                mean = 0.0
+            out[i] = mean
+        else:
+            out[i] = np.nan
+    return nobs, neg_ct, total, comp_add, comp_remove, same_run, prev_value
+
+
+def _v25_rows_kernel(high, low, close, a_ema, a_fast, a_slow, a_signal, period,
+                     ema, macd, signal, hist, tr, atr):
+    for r in range(close.shape[0]):
+        _ema_kernel(close[r], a_ema, ema[r])
+        _macd_kernel(close[r], a_fast, a_slow, a_signal, macd[r], signal[r], hist[r])
+        _atr_kernel(high[r], low[r], close[r], period, tr[r], atr[r])
+
+
+def _ema_spans_kernel(x, alphas, out):
+    # one pass over x, advancing every span's EMA at each bar
+    k = len(alphas)
+    n = len(x)
+    if n == 0:
+        return
+    w = np.empty(k)
+    old_wt = np.ones(k)
+    for j in range(k):
+        w[j] = x[0]
+        out[j, 0] = x[0]
+    for i in range(1, n):
+        cur = x[i]
+        for j in range(k):
+            wj = w[j]
+            if wj == wj:
+                old_wt[j] *= 1.0 - alphas[j]
+                if cur == cur:
+                    if wj != cur:
+                        w[j] = (old_wt[j] * wj + alphas[j] * cur) / (old_wt[j] + alphas[j])
+                    old_wt[j] = 1.0
+            elif cur == cur:
+                w[j] = cur
+            out[j, i] = w[j]
+
+
+def _ema_each_row_kernel(x, alphas, out):
+    for r in range(x.shape[0]):
+        _ema_kernel(x[r], alphas[r], out[r])
+
+
+if HAVE_NUMBA:
+    _ema_kernel = _njit(cache=True, nogil=True)(_ema_kernel)
+    _ema_spans_kernel = _njit(cache=True, nogil=True)(_ema_spans_kernel)
+    _macd_kernel = _njit(cache=True, nogil=True)(_macd_kernel)
+    _atr_kernel = _njit(cache=True, nogil=True)(_atr_kernel)
+    _v25_rows_kernel = _njit(cache=True, nogil=True)(_v25_rows_kernel)
+    _ema_each_row_kernel = _njit(cache=True, nogil=True)(_ema_each_row_kernel)
+
+
+def _f64(values) -> np.ndarray:
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def _prev_close(c: np.ndarray) -> np.ndarray:
+    prev = np.empty_like(c)
+    prev[..., :1] = np.nan
+    prev[..., 1:] = c[..., :-1]
+    return prev
+
+
+def _ewm(x: np.ndarray, span: int) -> np.ndarray:
+    import pandas as pd
+
+    return pd.Series(x, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def true_range_array(high, low, close) -> np.ndarray:
+    """
+    max(H-L, |H-Cprev|, |L-Cprev|) without DataFrame temporaries; NaN terms are
+    skipped. Works along the last axis, so (n_instruments, n_bars) input is fine.
+    """
+    h, l, c = _f64(high), _f64(low), _f64(close)
+    prev = _prev_close(c)
+    return np.fmax(h - l, np.fmax(np.abs(h - prev), np.abs(l - prev)))
+
+
+def ema_array(values, span: int) -> np.ndarray:
+    """EMA of a 1-D series; equals pd.Series(values).ewm(span=span, adjust=False).mean()."""
+    x = _f64(values)
+    if not HAVE_NUMBA:
+        return _ewm(x, span)
+    out = np.empty_like(x)
+    _ema_kernel(x, ema_alpha(span), out)
+    return out
+
+
+def macd_arrays(values, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(macd, signal, hist); a single fused pass when compiled. Equals strategy_v25.MACD."""
+    x = _f64(values)
+    if not HAVE_NUMBA:
+        macd = _ewm(x, fast) - _ewm(x, slow)
+        sig = _ewm(macd, signal)
+        return macd, sig, macd - sig
+    macd, sig, hist = np.empty_like(x), np.empty_like(x), np.empty_like(x)
+    _macd_kernel(x, ema_alpha(fast), ema_alpha(slow), ema_alpha(signal), macd, sig, hist)
+    return macd, sig, hist
+
+
+def atr_array(high, low, close, period: int = 14) -> np.ndarray:
+    """True range + rolling mean (fused into one pass when compiled); equals strategy_v25.ATR."""
+    if not HAVE_NUMBA:
+        import pandas as pd
+
+        return pd.Series(true_range_array(high, low, close), copy=False).rolling(period).mean().to_numpy()
+    h, l, c = _f64(high), _f64(low), _f64(close)
+    tr, out = np.empty_like(c), np.empty_like(c)
+    _atr_kernel(h, l, c, period, tr, out)
+    return out
+
+
+def atr_array_with_state(high, low, close, period: int = 14) -> Tuple[np.ndarray, Optional[StreamingATR]]:
+    """
+    atr_array plus the StreamingATR state at the last bar when the compiled
+    kernel yields it from the same pass. Without numba the state is None: its
+    compensated running sum is only recoverable through from_history's
+    Python replay, which costs more than the ATR itself.
+    """
+    if not HAVE_NUMBA:
+        return atr_array(high, low, close, period), None
+    h, l, c = _f64(high), _f64(low), _f64(close)
+    tr, out = np.empty_like(c), np.empty_like(c)
+    state = _atr_kernel(h, l, c, period, tr, out)
+    return out, (StreamingATR._from_kernel(period, state, tr, c) if len(c) else StreamingATR(period))
+
+
+def v25_indicator_arrays(high, low, close) -> Dict[str, np.ndarray]:
+    """All V25 columns (see V25_COLUMNS) for one instrument."""
+    macd, signal, hist = macd_arrays(close)
+    return {
+        "ema21": ema_array(close, 21),
+        "macd": macd,
+        "macd_signal": signal,
+        "macd_hist": hist,
+        "atr": atr_array(high, low, close),
+    }
+
+
+def apply_v25_indicators(df):
+    """Writes the V25 indicator columns onto an OHLC frame in place and returns it."""
+    arrays = v25_indicator_arrays(df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy())
+    for name, values in arrays.items():
+        df[name] = values
+    return df
+
+
+# ---------------------------
+# Batched (n_instruments x n_bars) computation
+# ---------------------------
+class IndicatorBatch:
+    """
+    V25 indicators for many instruments on a shared bar index.
+
+    Every matrix is (n_instruments, n_bars) with row r belonging to names[r];
+    bars an instrument has no data for are NaN. `batch["atr"][r]` is a plain
+    row view, batch.row("NIFTY") gives all columns for one instrument, and
+    batch.frame("NIFTY") rebuilds the DataFrame check_entry expects.
+    """
+
+    def __init__(self, names, index, ohlc: Dict[str, np.ndarray], columns: Dict[str, np.ndarray]):
+        self.names = list(names)
+        self.index = index
+        self.ohlc = ohlc
+        self.columns = columns
+        self._rows = {name: r for r, name in enumerate(self.names)}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column] if column in self.columns else self.ohlc[column]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def row(self, name) -> Dict[str, np.ndarray]:
+        r = self._rows[name]
+        out = {col: values[r] for col, values in self.ohlc.items()}
+        out.update({col: values[r] for col, values in self.columns.items()})
+        return out
+
+    def frame(self, name, dropna: bool = True):
+        import pandas as pd
+
+        df = pd.DataFrame(self.row(name))
+        if self.index is not None:
+            df.insert(0, "datetime", self.index)
+        if dropna:
+            df = df.dropna(subset=["close"]).reset_index(drop=True)
+        return df
+
+
+def v25_indicator_matrix(high, low, close, period: int = 14) -> Dict[str, np.ndarray]:
+    """
+    V25 columns for aligned (n_instruments, n_bars) OHLC matrices in one pass.
+
+    Row r of each result equals v25_indicator_arrays(high[r], low[r], close[r])
+    exactly. Compiled, each row is a fused pass; otherwise the recurrences run
+    column-wise through pandas' compiled ewm/rolling over the whole matrix.
+    """
+    h, l, c = _f64(high), _f64(low), _f64(close)
+    if c.ndim != 2 or h.shape != c.shape or l.shape != c.shape:
+        raise ValueError(f"expected equal (n_instruments, n_bars) matrices, got {h.shape}, {l.shape}, {c.shape}")
+    if HAVE_NUMBA:
+        ema, macd, sig, hist, tr, atr = (np.empty_like(c) for _ in range(6))
+        _v25_rows_kernel(h, l, c, ema_alpha(21), ema_alpha(12), ema_alpha(26), ema_alpha(9), period,
+                         ema, macd, sig, hist, tr, atr)
+    else:
+        import pandas as pd
+
+        # bars along axis 0 so pandas runs each instrument as one column
+        by_bar = pd.DataFrame(c.T, copy=False)
+
+        def ewm(frame, span):
+            return frame.ewm(span=span, adjust=False).mean()
+
+        ema = ewm(by_bar, 21).to_numpy().T
+        macd_frame = ewm(by_bar, 12) - ewm(by_bar, 26)
+        sig_frame = ewm(macd_frame, 9)
+        macd, sig = macd_frame.to_numpy().T, sig_frame.to_numpy().T
+        hist = macd - sig
+        tr = true_range_array(h, l, c)
+        atr = pd.DataFrame(tr.T, copy=False).rolling(period).mean().to_numpy().T
+    return {
+        "ema21": np.ascontiguousarray(ema),
+        "macd": np.ascontiguousarray(macd),
+        "macd_signal": np.ascontiguousarray(sig),
+        "macd_hist": np.ascontiguousarray(hist),
+        "atr": np.ascontiguousarray(atr),
+    }
+
+
+def align_ohlc(frames: Dict[str, object], time_col: str = "datetime"):
+    """
+    Outer-joins per-instrument OHLC frames on `time_col`.
+
+    Returns (names, index, {"open", "high", "low", "close": (n_instruments, n_bars)})
+    with NaN where an instrument has no bar.
+    """
+    import pandas as pd
+
+    names = list(frames)
+    index = None
+    for df in frames.values():
+        idx = pd.Index(df[time_col])
+        index = idx if index is None else index.union(idx)
+    if index is None:
+        index = pd.Index([])
+    index = index.sort_values()
+    ohlc = {col: np.full((len(names), len(index)), np.nan) for col in ("open", "high", "low", "close")}
+    for r, name in enumerate(names):
+        df = frames[name]
+        pos = index.get_indexer(df[time_col])
+        for col in ohlc:
+            ohlc[col][r, pos] = df[col].to_numpy(dtype=float)
+    return names, index, ohlc
+
+
+def compute_batch(frames: Dict[str, object], time_col: str = "datetime") -> IndicatorBatch:
+    """align_ohlc + v25_indicator_matrix for a {name: OHLC frame} mapping."""
+    names, index, ohlc = align_ohlc(frames, time_col)
+    columns = v25_indicator_matrix(ohlc["high"], ohlc["low"], ohlc["close"])
+    return IndicatorBatch(names, index, ohlc, columns)
+
+
+# ---------------------------
+# Multi-parameter bank
+# ---------------------------
+class IndicatorBank:
+    """
+    EMAs for many spans and MACDs for a (fast, slow, signal) grid over one price series.
+
+    Each distinct span is computed exactly once and shared: the MACD line for
+    (fast, slow) is ema[fast] - ema[slow], and a signal EMA is run once per
+    distinct (fast, slow, signal). Results live in row-per-parameter float64
+    matrices; every row is identical to the strategy_v25 EMA/MACD output.
+
+    Usage:
+        bank = IndicatorBank(df["close"], spans=[21], macd_grid=[(12, 26, 9), (8, 21, 5)])
+        bank.ema(21); macd, signal, hist = bank.macd(8, 21, 5)
+    """
+
+    def __init__(self, close, spans=(), macd_grid=()):
+        x = _f64(close)
+        self.grid = list(dict.fromkeys((int(f), int(s), int(g)) for f, s, g in macd_grid))
+        needed = {int(span) for span in spans}
+        for fast, slow, _ in self.grid:
+            needed.update((fast, slow))
+        self.spans = sorted(needed)
+        self._span_row = {span: r for r, span in enumerate(self.spans)}
+        self.ema_matrix = self._ema_rows(x, self.spans)
+
+        lines = list(dict.fromkeys((f, s) for f, s, _ in self.grid))
+        self._line_row = {line: r for r, line in enumerate(lines)}
+        self.macd_lines = np.empty((len(lines), len(x)))
+        for r, (fast, slow) in enumerate(lines):
+            np.subtract(self.ema_matrix[self._span_row[fast]], self.ema_matrix[self._span_row[slow]], out=self.macd_lines[r])
+
+        self._grid_row = {params: r for r, params in enumerate(self.grid)}
+        self.signal_matrix = self._signal_rows(x.shape[0])
+        self.hist_matrix = self.macd_lines[[self._line_row[(f, s)] for f, s, _ in self.grid]] - self.signal_matrix \
+            if self.grid else np.empty((0, len(x)))
+
+    @staticmethod
+    def _ema_rows(x: np.ndarray, spans) -> np.ndarray:
+        out = np.empty((len(spans), len(x)))
+        if not spans:
+            return out
+        if HAVE_NUMBA:
+            _ema_spans_kernel(x, np.array([ema_alpha(s) for s in spans]), out)
+        else:
+            for r, span in enumerate(spans):
+                out[r] = _ewm(x, span)
+        return out
+
+    def _signal_rows(self, n: int) -> np.ndarray:
+        out = np.empty((len(self.grid), n))
+        if not self.grid:
+            return out
+        sources = np.ascontiguousarray(self.macd_lines[[self._line_row[(f, s)] for f, s, _ in self.grid]])
+        if HAVE_NUMBA:
+            _ema_each_row_kernel(sources, np.array([ema_alpha(g) for _, _, g in self.grid]), out)
+            return out
+        import pandas as pd
+
+        # one column-wise pandas pass per distinct signal span
+        by_signal: Dict[int, list] = {}
+        for r, (_, _, g) in enumerate(self.grid):
+            by_signal.setdefault(g, []).append(r)
+        for g, rows in by_signal.items():
+            frame = pd.DataFrame(sources[rows].T, copy=False)
+            out[rows] = frame.ewm(span=g, adjust=False).mean().to_numpy().T
+        return out
+
+    def ema(self, span: int) -> np.ndarray:
+        return self.ema_matrix[self._span_row[int(span)]]
+
+    def macd(self, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        r = self._grid_row[(int(fast), int(slow), int(signal))]
+        return self.macd_lines[self._line_row[(int(fast), int(slow))]], self.signal_matrix[r], self.hist_matrix[r]
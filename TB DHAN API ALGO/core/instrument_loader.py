@@ -0,0 +1,203 @@
+"""
+Instrument Registry for Trader-Baddu
+
+Builds hash lookups over the Dhan instrument master once, so resolving a
+trading symbol to its (exchange segment, security id) pair no longer needs
+a boolean scan of the full ~200k row frame per name.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Same routing tables Tradehull.get_ltp_data uses to pick a marketfeed segment
+INDEX_NAMES = {"BANKNIFTY", "NIFTY", "MIDCPNIFTY", "FINNIFTY", "SENSEX", "BANKEX", "INDIA VIX"}
+NFO_UNDERLYINGS = ["BANKNIFTY", "NIFTY", "MIDCPNIFTY", "FINNIFTY"]
+BFO_UNDERLYINGS = ["SENSEX", "BANKEX"]
+DERIVATIVE_TAGS = ["CALL", "PUT", "FUT"]
+
+# Dhan accepts at most 1000 instruments per marketfeed request
+MAX_BATCH_SIZE = 1000
+# Marketfeed (ltp / ohlc / quote) is rate limited to one request per second
+MARKETFEED_INTERVAL = 1.0
+
+
+def _last_position_by_key(keys: pd.Series) -> Dict[str, int]:
+    """Map every key to the last row position it occurs at (mirrors `.iloc[-1]`)."""
+    pos = pd.Series(np.arange(len(keys)), index=keys.values)
+    pos = pos[pos.index.notna()]
+    return pos.groupby(level=0).max().to_dict()
+
+
+class InstrumentRegistry:
+    """
+    Cached symbol -> (segment, security_id) resolver over an instrument master.
+
+    Resolution rules are identical to the per-name scans in
+    Tradehull.get_ltp_data / get_quote_data / get_ohlc_data.
+    """
+
+    def __init__(self, instrument_df: pd.DataFrame, commodity_names: Iterable[str] = ()):
+        self._df = instrument_df
+        self._commodities = set(commodity_names)
+        self._security_ids = instrument_df["SEM_SMST_SECURITY_ID"].to_numpy()
+
+        # Rows matched on either SEM_CUSTOM_SYMBOL or SEM_TRADING_SYMBOL; keep the last one.
+        by_custom = _last_position_by_key(instrument_df["SEM_CUSTOM_SYMBOL"])
+        by_trading = _last_position_by_key(instrument_df["SEM_TRADING_SYMBOL"])
+        self._by_symbol = dict(by_custom)
+        for key, pos in by_trading.items():
+            if pos > self._by_symbol.get(key, -1):
+                self._by_symbol[key] = pos
+
+        mcx = instrument_df[instrument_df["SEM_EXM_EXCH_ID"] == "MCX"]
+        mcx_custom = _last_position_by_key(mcx["SEM_CUSTOM_SYMBOL"])
+        mcx_trading = _last_position_by_key(mcx["SEM_TRADING_SYMBOL"])
+        mcx_pos = np.flatnonzero((instrument_df["SEM_EXM_EXCH_ID"] == "MCX").to_numpy())
+        self._mcx_by_symbol = {k: int(mcx_pos[p]) for k, p in mcx_custom.items()}
+        for key, p in mcx_trading.items():
+            if mcx_pos[p] > self._mcx_by_symbol.get(key, -1):
+                self._mcx_by_symbol[key] = int(mcx_pos[p])
+
+        # Commodity names resolve to the nearest-expiry FUTCOM contract.
+        self._front_month: Dict[str, int] = {}
+        if "SM_SYMBOL_NAME" in instrument_df.columns:
+            futcom = mcx[mcx["SEM_INSTRUMENT_NAME"] == "FUTCOM"]
+            futcom = futcom[futcom["SM_SYMBOL_NAME"].isin(self._commodities)]
+            if not futcom.empty:
+                front = futcom.sort_values(by="SEM_EXPIRY_DATE").drop_duplicates("SM_SYMBOL_NAME", keep="first")
+                self._front_month = dict(zip(front["SM_SYMBOL_NAME"], front["SEM_SMST_SECURITY_ID"].astype(int)))
+
+        self._cache: Dict[str, Optional[Tuple[str, int]]] = {}
+
+    def _security_id_at(self, pos: int) -> int:
+        return int(self._security_ids[pos])
+
+    def _route(self, name: str) -> Optional[Tuple[str, int]]:
+        if name in INDEX_NAMES:
+            pos = self._by_symbol.get(name)
+            return None if pos is None else ("IDX_I", self._security_id_at(pos))
+
+        if name in self._commodities:
+            sid = self._front_month.get(name)
+            return None if sid is None else ("MCX_COMM", sid)
+
+        pos = self._by_symbol.get(name)
+        if pos is None:
+            return None
+        security_id = self._security_id_at(pos)
+
+        if any(u in name for u in NFO_UNDERLYINGS):
+            exchange = "NSE_FNO"
+        elif any(u in name for u in BFO_UNDERLYINGS):
+            exchange = "BSE_FNO"
+        elif any(tag in name for tag in DERIVATIVE_TAGS):
+            exchange = "NSE_FNO"
+        else:
+            exchange = "NSE_EQ"
+
+        if any(c in name for c in self._commodities):
+            mcx_pos = self._mcx_by_symbol.get(name)
+            if mcx_pos is not None:
+                return "MCX_COMM", self._security_id_at(mcx_pos)
+        return exchange, security_id
+
+    def resolve(self, name: str) -> Optional[Tuple[str, int]]:
+        """Returns (marketfeed segment, security id) for a name, or None if unknown."""
+        name = str(name).upper()
+        if name not in self._cache:
+            self._cache[name] = self._route(name)
+        return self._cache[name]
+
+    def resolve_many(self, names: Iterable[str]) -> Tuple[Dict[str, List[int]], Dict[Tuple[str, int], str], List[str]]:
+        """
+        Resolves a batch of names.
+
+        Returns:
+            - segment -> list of security ids (duplicates removed, order kept)
+            - (segment, security id) -> requested name
+            - names that could not be resolved
+        """
+        by_segment: Dict[str, List[int]] = {}
+        names_by_key: Dict[Tuple[str, int], str] = {}
+        missing: List[str] = []
+        for raw in names:
+            name = str(raw).upper()
+            hit = self.resolve(name)
+            if hit is None:
+                missing.append(name)
+                continue
+            if hit not in names_by_key:
+                by_segment.setdefault(hit[0], []).append(hit[1])
+                names_by_key[hit] = name
+        return by_segment, names_by_key, missing
+
+
+def split_batches(by_segment: Dict[str, List[int]], batch_size: int = MAX_BATCH_SIZE) -> List[Dict[str, List[int]]]:
+    """Chunks each exchange segment into request payloads of at most `batch_size` ids."""
+    if batch_size < 1 or batch_size > MAX_BATCH_SIZE:
+        raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}, got {batch_size}")
+    batches = []
+    for segment, ids in by_segment.items():
+        for start in range(0, len(ids), batch_size):
+            batches.append({segment: ids[start:start + batch_size]})
+    return batches
+
+
+class RateLimiter:
+    """Spaces call starts at least `interval` seconds apart across threads."""
+
+    def __init__(self, interval: float = MARKETFEED_INTERVAL, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.interval = interval
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self) -> None:
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            self._sleep(slot - now)
+
+
+def fetch_batches(fetch: Callable[[Dict[str, List[int]]], dict], batches: List[Dict[str, List[int]]],
+                  max_workers: int = 4, limiter: Optional[RateLimiter] = None,
+                  retries: int = 2) -> Tuple[List[Optional[dict]], List[Tuple[Dict[str, List[int]], str]]]:
+    """
+    Requests every batch through `limiter`, retrying a batch that raises or
+    answers status "failure" up to `retries` more times.
+
+    Returns (responses, errors): responses[i] is batch i's response or None
+    if it never succeeded, and errors lists (batch, last error) per failure.
+    """
+    limiter = RateLimiter() if limiter is None else limiter
+
+    def one(batch):
+        error = ""
+        for _ in range(retries + 1):
+            limiter.wait()
+            try:
+                response = fetch(batch)
+            except Exception as e:
+                error = str(e)
+                continue
+            if response.get("status") != "failure":
+                return response, None
+            error = str(response.get("remarks") or response)
+        return None, error
+
+    if not batches:
+        return [], []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as pool:
+        results = list(pool.map(one, batches))
+    errors = [(batch, error) for batch, (_, error) in zip(batches, results) if error is not None]
+    return [response for response, _ in results], errors
@@ -0,0 +1,304 @@
+"""
+Intrabar exit resolution for Strategy V25 from 1-minute sub-bars.
+
+The 5-minute engine (core.backtest_engine) checks the stop on the bar close
+and TP1 on the bar high/low, so when both levels sit inside one bar it
+cannot tell which came first. This mode walks the same state machine but,
+on every 5-minute bar with an open position, resolves the stops and TP1
+against that bar's 1-minute sub-bars:
+
+    initial SL vs TP1   whichever level the sub-bars reach first; a sub-bar
+                        touching both counts as a stop (conservative)
+    stops               filled on touch at the stop, or at the sub-bar open
+                        when it gaps through
+    trail, fail-safe,   still on the 5-minute close, since they use the
+    EOD                 5-minute ATR / EMA / MACD
+
+Positions open at the entry bar's close, so the entry bar's own high/low is
+not used for exits. sub_bar_inputs() maps 1-minute rows onto 5-minute bars
+and precomputes each bar's running high / low, so a first passage is a
+binary search over a monotone run (searchsorted) rather than a scan. A
+5-minute bar without 1-minute data stands in as its own single sub-bar.
+
+Usage:
+    sub = sub_bar_inputs(df5["datetime"], df1, open_=df5["open"], high=df5["high"], low=df5["low"])
+    trades = simulate_v25_intrabar(v25_inputs(df5), sub)
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+
+from core.backtest_engine import (
+    EOD_EXIT,
+    EOD_SECONDS,
+    EVENT_DTYPE,
+    EVENT_ENTRY,
+    EVENT_EXIT,
+    HAVE_NUMBA,
+    INITIAL_SL,
+    MACD_EMA_EXIT,
+    SL_HIT,
+    V25_EXITS,
+    _njit,
+    record_events,
+    to_trade_tuples,
+    trade_array,
+    v25_inputs,
+)
+from core.events import INFO
+
+
+def _ns(times) -> np.ndarray:
+    import pandas as pd
+
+    return pd.DatetimeIndex(times).as_unit("ns").asi8
+
+
+def sub_bar_inputs(times, minute_df, open_, high, low, minutes: int = 5) -> Dict[str, np.ndarray]:
+    """
+    1-minute rows grouped under the 5-minute bars starting at `times`.
+
+    Returns bounds (sub-bars of bar i are bounds[i]:bounds[i + 1]), the
+    sub-bar open / high / low, run_high (running max within the bar) and
+    neg_run_low (negated running min), both non-decreasing within a bar.
+    open_ / high / low are the 5-minute columns used for bars with no rows.
+    """
+    import pandas as pd
+
+    t5 = _ns(times)
+    minute_df = minute_df.sort_values("datetime", kind="stable")
+    t1 = _ns(minute_df["datetime"])
+    n = len(t5)
+    bar = np.searchsorted(t5, t1, side="right") - 1
+    valid = bar >= 0
+    valid[valid] = t1[valid] - t5[bar[valid]] < minutes * 60 * 10**9
+    bar = bar[valid]
+    cols = {k: minute_df[k].to_numpy(dtype=np.float64)[valid] for k in ("open", "high", "low")}
+
+    missing = np.flatnonzero(np.bincount(bar, minlength=n) == 0)
+    if len(missing):
+        fill = {"open": open_, "high": high, "low": low}
+        order = np.argsort(np.r_[bar, missing], kind="stable")  # 1-minute rows keep their time order
+        bar = np.r_[bar, missing][order]
+        cols = {k: np.r_[v, np.asarray(fill[k], dtype=np.float64)[missing]][order] for k, v in cols.items()}
+
+    groups = pd.Series(cols["high"]).groupby(bar)
+    run_high = groups.cummax().to_numpy()
+    neg_run_low = pd.Series(-cols["low"]).groupby(bar).cummax().to_numpy()
+    bounds = np.r_[0, np.cumsum(np.bincount(bar, minlength=n))].astype(np.int64)
+    return {"bounds": bounds, "open": cols["open"], "high": cols["high"], "low": cols["low"],
+            "run_high": run_high, "neg_run_low": neg_run_low}
+
+
+def _first_at_least(run, x, lo, hi):
+    """First k in [lo, hi) with run[k] >= x for a non-decreasing run (hi if none); searchsorted 'left'."""
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if run[mid] < x:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _restarted_run(x, lo, hi, sign):
+    """Running max of sign * x over [lo, hi), i.e. a bar's running extreme restarted at lo (index 0 = lo)."""
+    return np.maximum.accumulate(sign * np.asarray(x[lo:hi], dtype=np.float64))
+
+
+def _restarted_run_loop(x, lo, hi, sign):
+    out = np.empty(hi - lo)
+    m = -np.inf
+    for j in range(lo, hi):
+        v = sign * x[j]
+        if v > m:
+            m = v
+        out[j - lo] = m
+    return out
+
+
+if HAVE_NUMBA:
+    _first_at_least = _njit(cache=True, nogil=True)(_first_at_least)
+    # ufunc.accumulate is not available in nopython mode; the compiled loop is the same single pass
+    _restarted_run = _njit(cache=True, nogil=True)(_restarted_run_loop)
+
+
+def _v25_intrabar_kernel(seconds, close, high, low, ema, atr, hist, signal, start,
+                         bounds, sub_open, sub_high, sub_low, run_high, neg_run_low,
+                         sl_atr, tp_points, lock_points, trail_min, trail_atr, trade_i, trade_f):
+    """
+    _v25_kernel with stops and TP1 resolved on sub-bars; returns trades written.
+    trade_f's exit holds the fill price, which may be a gap open past the stop.
+    """
+    nt = 0
+    side = 0
+    entry_i = 0
+    entry = 0.0
+    sl = 0.0
+    initial_sl = 0.0
+    extreme = 0.0
+    tp1_hit = False
+    for i in range(start, len(close)):
+        c = close[i]
+        if side == 0:
+            code = signal[i]
+            if code != 0:
+                side = code
+                entry_i = i
+                entry = c
+                tp1_hit = False
+                sl = np.rint((c - side * sl_atr * atr[i]) * 100.0) / 100.0
+                initial_sl = sl
+                extreme = c
+            continue
+
+        lo = bounds[i]
+        hi = bounds[i + 1]
+        reason = -1
+        exit_price = 0.0
+        k = hi
+        if not tp1_hit:
+            tp1 = entry + side * tp_points
+            # first sub-bar reaching each level: the bar's running extremes are monotone
+            if side == 1:
+                k_sl = _first_at_least(neg_run_low, -initial_sl, lo, hi)
+                k_tp = _first_at_least(run_high, tp1, lo, hi)
+            else:
+                k_sl = _first_at_least(run_high, initial_sl, lo, hi)
+                k_tp = _first_at_least(neg_run_low, -tp1, lo, hi)
+            if k_sl < hi and k_sl <= k_tp:
+                reason = INITIAL_SL
+                k = k_sl
+            elif k_tp < hi:
+                tp1_hit = True
+                sl = np.rint((entry + side * lock_points) * 100.0) / 100.0
+                lo = k_tp + 1  # the locked stop only counts after the TP1 minute
+        if reason < 0 and tp1_hit:
+            if lo == bounds[i]:
+                k = _first_at_least(neg_run_low, -sl, lo, hi) if side == 1 else _first_at_least(run_high, sl, lo, hi)
+                if k < hi:
+                    reason = SL_HIT
+            else:
+                # the bar's running extremes include the minutes before TP1, so restart them after it
+                if side == 1:
+                    run = _restarted_run(sub_low, lo, hi, -1.0)
+                    j = _first_at_least(run, -sl, 0, hi - lo)
+                else:
+                    run = _restarted_run(sub_high, lo, hi, 1.0)
+                    j = _first_at_least(run, sl, 0, hi - lo)
+                if j < hi - lo:
+                    reason = SL_HIT
+                    k = lo + j
+        if reason >= 0:
+            level = initial_sl if reason == INITIAL_SL else sl
+            o = sub_open[k]
+            exit_price = o if (side == 1 and o < level) or (side == -1 and o > level) else level
+        else:
+            # 5-minute close: stop on close as a backstop, then trail / fail-safe / EOD as in _v25_kernel
+            if side == 1:
+                if high[i] > extreme:
+                    extreme = high[i]
+            elif low[i] < extreme:
+                extreme = low[i]
+            level = sl if tp1_hit else initial_sl
+            if (side == 1 and c <= level) or (side == -1 and c >= level):
+                reason = SL_HIT if tp1_hit else INITIAL_SL
+                exit_price = level
+            elif tp1_hit:
+                step = trail_atr * atr[i]
+                trail = step if step > trail_min else trail_min
+                if side == 1:
+                    level = extreme - trail
+                    if level > sl:
+                        sl = np.rint(level * 100.0) / 100.0
+                    fail_safe = c < ema[i] or hist[i] < 0
+                else:
+                    level = extreme + trail
+                    if level < sl:
+                        sl = np.rint(level * 100.0) / 100.0
+                    fail_safe = c > ema[i] or hist[i] > 0
+                if fail_safe:
+                    reason = MACD_EMA_EXIT
+                    exit_price = c
+            if reason < 0 and seconds[i] >= EOD_SECONDS:
+                reason = EOD_EXIT
+                exit_price = c
+
+        if reason >= 0:
+            trade_i[4 * nt] = entry_i
+            trade_i[4 * nt + 1] = i
+            trade_i[4 * nt + 2] = side
+            trade_i[4 * nt + 3] = reason
+            trade_f[3 * nt] = entry
+            trade_f[3 * nt + 1] = exit_price
+            trade_f[3 * nt + 2] = sl
+            nt += 1
+            side = 0
+    return nt
+
+
+if HAVE_NUMBA:
+    _v25_intrabar_kernel = _njit(cache=True, nogil=True)(_v25_intrabar_kernel)
+
+
+def simulate_v25_intrabar(arrays: Dict[str, np.ndarray], sub: Dict[str, np.ndarray], start: int = 35,
+                          **exits) -> np.ndarray:
+    """TRADE_DTYPE trades for v25_inputs() arrays with exits resolved on sub_bar_inputs() sub-bars."""
+    unknown = set(exits) - set(V25_EXITS)
+    if unknown:
+        raise ValueError(f"Unknown exit parameters {sorted(unknown)}. Known: {sorted(V25_EXITS)}")
+    n = len(arrays["close"])
+    if len(sub["bounds"]) != n + 1:
+        raise ValueError(f"Sub-bars are for {len(sub['bounds']) - 1} bars, arrays have {n}")
+    p = {**V25_EXITS, **exits}
+    cap = max(n - start, 0)
+    cols = [arrays[k] for k in ("seconds", "close", "high", "low", "ema21", "atr", "macd_hist", "signal")]
+    subs = [sub[k] for k in ("bounds", "open", "high", "low", "run_high", "neg_run_low")]
+    if HAVE_NUMBA:
+        cols = [np.ascontiguousarray(c) for c in cols]
+        subs = [np.ascontiguousarray(c) for c in subs]
+        trade_i, trade_f = np.empty(4 * cap, np.int64), np.empty(3 * cap)
+    else:
+        cols = [c.tolist() for c in cols]
+        subs = [c.tolist() for c in subs]
+        trade_i, trade_f = [0] * (4 * cap), [0.0] * (3 * cap)
+    nt = _v25_intrabar_kernel(*cols, start, *subs, float(p["sl_atr"]), float(p["tp_points"]),
+                              float(p["lock_points"]), float(p["trail_min"]), float(p["trail_atr"]),
+                              trade_i, trade_f)
+    return trade_array(trade_i, trade_f, nt)
+
+
+def trade_events(trades: np.ndarray, arrays: Dict[str, np.ndarray], sl_atr: float = V25_EXITS["sl_atr"]) -> np.ndarray:
+    """
+    EVENT_DTYPE entry and exit events for intrabar trades, in bar order
+    (record_events() input). The kernel does not trace, so TP1 and trail
+    updates, which happen between sub-bars, are not reported.
+    """
+    n = len(trades)
+    events = np.empty(2 * n, dtype=EVENT_DTYPE)
+    entry, exit_ = events[0::2], events[1::2]
+    side = trades["side"]
+    entry["bar"], entry["kind"], entry["side"], entry["a"] = trades["entry_idx"], EVENT_ENTRY, side, trades["entry"]
+    entry["b"] = np.rint((trades["entry"] - side * sl_atr * arrays["atr"][trades["entry_idx"]]) * 100.0) / 100.0
+    exit_["bar"], exit_["kind"], exit_["side"] = trades["exit_idx"], EVENT_EXIT, side
+    exit_["a"], exit_["b"] = trades["exit"], trades["reason"]
+    return events
+
+
+def run_v25_intrabar(df, minute_df, start: int = 35, recorder=None) -> List[tuple]:
+    """
+    V25 backtest over an indicator frame with exits resolved on `minute_df`
+    (datetime, open, high, low of 1-minute bars). Same tuple layout as
+    run_v25_backtest; exit times are the 5-minute bars the exits fall in.
+    With an EventRecorder at INFO or below, entries and exits are recorded.
+    """
+    times = df["datetime"]
+    open_ = df["open"] if "open" in df.columns else df["close"]
+    sub = sub_bar_inputs(times, minute_df, open_, df["high"], df["low"])
+    arrays = v25_inputs(df)
+    trades = simulate_v25_intrabar(arrays, sub, start)
+    if recorder is not None and recorder.enabled(INFO):
+        record_events(recorder, trade_events(trades, arrays), arrays, times)
+    return to_trade_tuples(trades, times)
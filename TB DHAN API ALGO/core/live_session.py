@@ -0,0 +1,140 @@
+"""
+Live V25 paper session over a streaming bar store.
+
+LiveV25Session reads an IndicatorStream's RingBarStore through zero-copy
+windows. Each closed bar is evaluated once: the V25 entry rule runs on its
+last three bars (strategy_v25.entry_signal_codes) and an open position is
+managed with paper_trader's exits (SL 1.5 x ATR, TP 15 points, EOD from
+15:25). No DataFrame is built per bar. Bars reach the stream from REST polls
+(data_fetcher.get_index_stream) or from the tick feed: pass on_bar_close to
+a BarAggregator and each bar is evaluated the moment its bucket closes.
+"""
+from __future__ import annotations
+
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from core.candle_data import DAY_SECONDS, IST_OFFSET_SECONDS
+
+IST = timezone(timedelta(hours=5, minutes=30))
+SESSION_END_SECONDS = 15 * 3600 + 25 * 60  # 15:25 IST, seconds after midnight
+_SIGNAL_FIELDS = ("close", "ema21", "atr", "macd", "macd_signal", "macd_hist")
+
+
+class LiveV25Session:
+    """
+    One V25 position at a time, driven by the bars in `stream.store`.
+
+    Args:
+        stream: IndicatorStream holding the bars and V25 columns.
+        on_exit: called as on_exit(entry, exit_time, exit_price, reason) for
+            each closed trade; entry is {"side", "entry_time", "entry_price"},
+            the shape paper_trader.log_paper_trade takes.
+        tp_points: take-profit distance in points.
+        sl_atr: stop distance in ATRs of the current bar.
+        session_end: seconds after IST midnight from which an open trade is closed.
+    """
+
+    def __init__(
+        self,
+        stream,
+        on_exit: Optional[Callable[[Dict, datetime, float, str], None]] = None,
+        tp_points: float = 15.0,
+        sl_atr: float = 1.5,
+        session_end: int = SESSION_END_SECONDS,
+    ):
+        self.stream = stream
+        self.on_exit = on_exit
+        self.tp_points = tp_points
+        self.sl_atr = sl_atr
+        self.session_end = session_end
+        self.position: Optional[Dict] = None
+        self._seen: Optional[int] = None  # start of the last evaluated bar
+        self._lock = threading.Lock()  # the feed and its flush timer both deliver bars
+
+    def skip_history(self, forming: bool = False) -> None:
+        """Marks the bars stored so far as seen, so warm-up history is never traded."""
+        n = len(self.stream.store) - (1 if forming else 0)
+        if n > 0:
+            self._seen = int(self.stream.store.starts()[n - 1])
+
+    def update(self, forming: bool = False) -> None:
+        """
+        Evaluates every closed bar not seen yet, oldest first. Pass
+        forming=True when the newest stored bar is still open (REST polls);
+        bars pushed from the tick aggregator are already closed.
+        """
+        store = self.stream.store
+        starts = store.starts()
+        n = len(starts) - (1 if forming else 0)
+        first = 0 if self._seen is None else int(np.searchsorted(starts[:max(n, 0)], self._seen, side="right"))
+        if first >= n:
+            return
+        cols = {name: store.window(name) for name in _SIGNAL_FIELDS}
+        for k in range(first, n):
+            self._on_bar(k, int(starts[k]), cols)
+        self._seen = int(starts[n - 1])
+
+    def on_bar_close(self, bar) -> None:
+        """
+        BarAggregator callback: folds the closed bar into the stream and
+        evaluates it at once. A bar the feed joined mid-bucket keeps the open
+        (and widens the range) of the REST bar already stored for it.
+        """
+        with self._lock:
+            store = self.stream.store
+            o, h, l = bar.open, bar.high, bar.low
+            if bar.start == self.stream.last_start and (self._seen is None or bar.start > self._seen):
+                o = store.last("open")
+                h, l = max(h, store.last("high")), min(l, store.last("low"))
+            self.stream.push(bar.start, o, h, l, bar.close, bar.volume)
+            self.update()
+
+    def _signal(self, k: int, seconds: int, cols) -> Optional[str]:
+        from strategy_v25 import SIGNAL_LABELS, entry_signal_codes
+
+        if k < 2:
+            return None  # not enough history for the 2-bar histogram rule
+        last3 = {name: cols[name][k - 2:k + 1] for name in _SIGNAL_FIELDS}
+        code = entry_signal_codes(np.full(3, float(seconds)), **last3)[-1]
+        return SIGNAL_LABELS.get(int(code))
+
+    def _on_bar(self, k: int, start: int, cols) -> None:
+        seconds = (start + IST_OFFSET_SECONDS) % DAY_SECONDS
+        when = datetime.fromtimestamp(start, IST)
+        close = float(cols["close"][k])
+
+        if self.position is None:
+            side = self._signal(k, seconds, cols)
+            if side is not None:
+                self.position = {"side": side, "entry_time": when, "entry_price": close}
+                print(f"[ENTRY] {side} at {when} price={close}")
+            return
+
+        entry_price = self.position["entry_price"]
+        atr = float(cols["atr"][k])
+        atr = atr if atr == atr else 0.0
+        if self.position["side"] == "BUY_CE":
+            sl_val = entry_price - self.sl_atr * atr
+            tp_val = entry_price + self.tp_points
+            sl_hit, tp_hit = close <= sl_val, close >= tp_val
+        else:  # SELL_PE
+            sl_val = entry_price + self.sl_atr * atr
+            tp_val = entry_price - self.tp_points
+            sl_hit, tp_hit = close >= sl_val, close <= tp_val
+
+        if sl_hit:
+            self._exit(when, sl_val, "SL Hit")
+        elif tp_hit:
+            self._exit(when, tp_val, "TP Hit")
+        elif seconds >= self.session_end:
+            self._exit(when, close, "EOD EXIT")
+
+    def _exit(self, when: datetime, price: float, reason: str) -> None:
+        entry, self.position = self.position, None
+        print(f"[EXIT] {reason} {entry['side']} at {when} exit={price}")
+        if self.on_exit is not None:
+            self.on_exit(entry, when, price, reason)
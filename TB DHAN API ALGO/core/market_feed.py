@@ -0,0 +1,207 @@
+"""
+Live tick sources and the streaming bar pump for Trader-Baddu.
+
+Sources yield Tick tuples; StreamingBarFeed pushes them through a
+BarAggregator and closes bars on a wall-clock timer as well, so a bar-close
+event fires at the bucket boundary even when the instrument goes quiet.
+
+Sources:
+- DhanFeedSource: the dhanhq websocket market feed (Ticker/Quote packets).
+- SocketTickSource: newline-delimited JSON ticks over TCP, served locally by
+  serve_ticks() as a stand-in for offline runs and tests.
+
+Usage:
+    agg = BarAggregator(timeframes=(60, 300), on_bar_close=on_bar)
+    feed = StreamingBarFeed(SocketTickSource("127.0.0.1", 9100), agg)
+    feed.run()      # blocks; feed.stop() from another thread
+"""
+from __future__ import annotations
+
+import json
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from core.candle_data import BarAggregator
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+class Tick(NamedTuple):
+    security_id: int
+    price: float
+    ts: float          # epoch seconds of the trade
+    volume: float = 0.0  # quantity traded since the previous tick
+
+
+class DhanFeedSource:
+    """
+    Adapts dhanhq.marketfeed.DhanFeed packets to Ticks.
+
+    Args:
+        instruments: list of (exchange_segment_code, security_id) tuples, e.g.
+            [(marketfeed.IDX, "13")], as DhanFeed expects.
+        request_code: marketfeed.Quote (default) carries cumulative volume;
+            marketfeed.Ticker only LTP/LTT.
+    """
+
+    def __init__(self, client_id: str, access_token: str, instruments, request_code: Optional[int] = None):
+        from dhanhq import marketfeed  # imported lazily; only live runs need the websocket stack
+
+        code = marketfeed.Quote if request_code is None else request_code
+        subscriptions = [(seg, str(sid), code) for seg, sid in instruments]
+        self._feed = marketfeed.DhanFeed(client_id, access_token, subscriptions, version="v2")
+        self._cum_volume: Dict[int, float] = {}
+
+    @staticmethod
+    def _trade_time(ltt: Optional[str]) -> float:
+        """DhanFeed reports LTT as an IST wall clock 'HH:MM:SS'; pin it to today's IST date."""
+        now = datetime.now(IST)
+        if not ltt:
+            return now.timestamp()
+        try:
+            hh, mm, ss = (int(x) for x in ltt.split(":"))
+        except ValueError:
+            return now.timestamp()
+        return now.replace(hour=hh, minute=mm, second=ss, microsecond=0).timestamp()
+
+    def _to_tick(self, packet: dict) -> Optional[Tick]:
+        if not isinstance(packet, dict) or packet.get("type") not in ("Ticker Data", "Quote Data", "Full Data"):
+            return None
+        sid = int(packet["security_id"])
+        volume = 0.0
+        if "volume" in packet:
+            cum = float(packet["volume"])
+            volume = max(cum - self._cum_volume.get(sid, cum), 0.0)
+            self._cum_volume[sid] = cum
+        return Tick(sid, float(packet["LTP"]), self._trade_time(packet.get("LTT")), volume)
+
+    def __iter__(self) -> Iterator[Tick]:
+        self._feed.run_forever()
+        while True:
+            tick = self._to_tick(self._feed.get_data())
+            if tick is not None:
+                yield tick
+
+    def close(self) -> None:
+        self._feed.close_connection()
+
+
+class SocketTickSource:
+    """Reads newline-delimited JSON ticks {"security_id", "price", "ts", "volume"} from a TCP socket."""
+
+    def __init__(self, host: str, port: int, timeout: float = 10.0):
+        self.address = (host, port)
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+
+    def __iter__(self) -> Iterator[Tick]:
+        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+        with self._sock, self._sock.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                if not line.strip():
+                    continue
+                msg = json.loads(line)
+                yield Tick(int(msg["security_id"]), float(msg["price"]), float(msg["ts"]), float(msg.get("volume", 0.0)))
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+def ticks_from_bars(df, security_id: int) -> Iterator[Tick]:
+    """
+    Replays an OHLCV frame (tz-aware datetime or epoch timestamp, open, high,
+    low, close, volume) as four ticks per bar: open, the nearer extreme, the
+    other extreme, close.
+    """
+    import pandas as pd
+
+    if "datetime" in df.columns:
+        dt = pd.to_datetime(df["datetime"])
+        epoch = pd.Timestamp("1970-01-01", tz="UTC") if dt.dt.tz is not None else pd.Timestamp("1970-01-01")
+        ts = ((dt - epoch) // pd.Timedelta(seconds=1)).to_numpy()
+    else:
+        ts = df["timestamp"].to_numpy()
+    o, h, l, c = (df[col].to_numpy(dtype=float) for col in ("open", "high", "low", "close"))
+    v = df["volume"].to_numpy(dtype=float) if "volume" in df.columns else None
+    for i in range(len(df)):
+        first, second = (l[i], h[i]) if abs(o[i] - l[i]) < abs(h[i] - o[i]) else (h[i], l[i])
+        qty = v[i] / 4.0 if v is not None else 0.0
+        for k, price in enumerate((o[i], first, second, c[i])):
+            yield Tick(security_id, float(price), float(ts[i]) + k, qty)
+
+
+def serve_ticks(ticks: Iterable[Tick], host: str = "127.0.0.1", port: int = 0, pace: float = 0.0) -> Tuple[socket.socket, int]:
+    """
+    Local stand-in for the market feed: accepts one client and streams ticks to it
+    as JSON lines from a daemon thread. Returns (listening socket, port).
+    """
+    server = socket.create_server((host, port))
+
+    def _serve():
+        conn, _ = server.accept()
+        with conn:
+            for t in ticks:
+                line = json.dumps({"security_id": t.security_id, "price": t.price, "ts": t.ts, "volume": t.volume}) + "\n"
+                try:
+                    conn.sendall(line.encode())
+                except OSError:
+                    break
+                if pace:
+                    time.sleep(pace)
+        server.close()
+
+    threading.Thread(target=_serve, name="tick-stand-in", daemon=True).start()
+    return server, server.getsockname()[1]
+
+
+class StreamingBarFeed:
+    """
+    Pumps a tick source into a BarAggregator.
+
+    A timer thread calls aggregator.flush(now) every `flush_interval`
+    seconds so bars close on the boundary even without a new tick; `grace`
+    allows for exchange timestamps lagging the local clock. Use
+    flush_interval=0 when replaying historical ticks, whose timestamps are
+    far behind the wall clock.
+    """
+
+    def __init__(self, source, aggregator: BarAggregator, flush_interval: float = 0.25, grace: float = 1.0):
+        self.source = source
+        self.aggregator = aggregator
+        self.flush_interval = flush_interval
+        self.grace = grace
+        self._stop = threading.Event()
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.aggregator.flush(time.time() - self.grace)
+
+    def run(self, flush_on_exit: bool = True) -> None:
+        timer = None
+        if self.flush_interval:
+            timer = threading.Thread(target=self._flush_loop, name="bar-flush", daemon=True)
+            timer.start()
+        try:
+            for tick in self.source:
+                if self._stop.is_set():
+                    break
+                self.aggregator.on_tick(tick.security_id, tick.price, tick.ts, tick.volume)
+        finally:
+            self._stop.set()
+            if timer is not None:
+                timer.join()
+            if flush_on_exit:
+                self.aggregator.flush()
+
+    def stop(self) -> None:
+        self._stop.set()
+        close = getattr(self.source, "close", None)
+        if close is not None:
+            close()
@@ -0,0 +1,194 @@
+"""
+Vectorized performance metrics for columnar trades.
+
+Works on TRADE_DTYPE arrays (core.backtest_engine) plus the bar arrays the
+trades index into, with no per-trade Python loop:
+    per trade   pnl, MAE / MFE, bars held              trade_columns()
+    per bar     mark-to-market equity                   bar_pnl()
+    scalars     net, win rate, profit factor, expectancy, closed-trade and
+                mark-to-market max drawdown, daily Sharpe / Sortino,
+                time in market                          summary_metrics()
+    by reason   count / net / average / win rate per exit reason
+                                                        reason_breakdown()
+
+summary_metrics() stays in NumPy, so it is cheap enough to run for every
+config of a parameter sweep; report() wraps everything in DataFrames.
+All values are in price points (index points for V25).
+"""
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from core.backtest_engine import REASONS, SIDES
+
+TRADING_DAYS = 252
+
+
+def trade_pnl(trades: np.ndarray) -> np.ndarray:
+    return trades["side"] * (trades["exit"] - trades["entry"])
+
+
+def trade_columns(trades: np.ndarray, high: np.ndarray, low: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    pnl, MAE (worst adverse excursion, >= 0), MFE (best favourable excursion)
+    and bars held per trade. Excursions use the high/low of every bar from
+    the entry bar to the exit bar, the same bars the exit rules look at.
+    """
+    pnl = trade_pnl(trades)
+    entry_idx, exit_idx = trades["entry_idx"], trades["exit_idx"]
+    if len(trades) == 0:
+        empty = np.empty(0)
+        return {"pnl": pnl, "mae": empty, "mfe": empty, "bars": np.empty(0, dtype=np.int64)}
+    # trades never overlap, so [entry, exit + 1) pairs are increasing reduceat edges;
+    # the padding keeps exit + 1 in range for a trade closed on the last bar
+    edges = np.column_stack([entry_idx, exit_idx + 1]).ravel()
+    top = np.maximum.reduceat(np.append(high, -np.inf), edges)[::2]
+    bottom = np.minimum.reduceat(np.append(low, np.inf), edges)[::2]
+    long = trades["side"] == 1
+    entry = trades["entry"]
+    mfe = np.where(long, top - entry, entry - bottom)
+    mae = np.where(long, entry - bottom, top - entry)
+    return {"pnl": pnl, "mae": mae, "mfe": mfe, "bars": exit_idx - entry_idx}
+
+
+def bar_pnl(trades: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    Mark-to-market PnL per bar: open positions are valued at each close,
+    entries and exits at their own prices. Sums to the trades' total PnL.
+    """
+    n = len(close)
+    out = np.zeros(n)
+    if len(trades) == 0 or n == 0:
+        return out
+    side = trades["side"].astype(np.float64)
+    entry_idx, exit_idx = trades["entry_idx"], trades["exit_idx"]
+    # position held over (entry, exit]: +side from entry + 1, -side from exit + 1
+    pos = np.cumsum(np.bincount(entry_idx + 1, side, n + 1) - np.bincount(exit_idx + 1, side, n + 1))[:n]
+    out[1:] = pos[1:] * np.diff(close)
+    out += np.bincount(entry_idx, side * (close[entry_idx] - trades["entry"]), n)
+    out += np.bincount(exit_idx, side * (trades["exit"] - close[exit_idx]), n)
+    return out
+
+
+def _max_drawdown(equity: np.ndarray) -> float:
+    if len(equity) == 0:
+        return 0.0
+    peak = np.maximum(np.maximum.accumulate(equity), 0.0)  # equity starts at 0
+    return float((peak - equity).max())
+
+
+def day_starts(seconds: np.ndarray) -> np.ndarray:
+    """First bar of each session from seconds-since-midnight (a new day resets the clock)."""
+    seconds = np.asarray(seconds)
+    if len(seconds) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, seconds[1:] < seconds[:-1]])
+
+
+def closed_trade_stats(pnl: np.ndarray) -> Dict[str, float]:
+    """Metrics from per-trade PnL alone (no bars needed), e.g. for trade logs."""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    n = len(pnl)
+    if n == 0:
+        return {"trades": 0, "wins": 0, "win_rate": 0.0, "net_points": 0.0, "avg_points": 0.0,
+                "expectancy": 0.0, "avg_win": 0.0, "avg_loss": 0.0, "profit_factor": float("nan"),
+                "max_drawdown": 0.0}
+    wins = pnl > 0
+    losses = pnl < 0
+    gains = pnl[wins].sum()
+    lost = -pnl[losses].sum()
+    n_wins = int(wins.sum())
+    avg_win = float(gains / n_wins) if n_wins else 0.0
+    avg_loss = float(lost / losses.sum()) if losses.any() else 0.0
+    net = float(pnl.sum())
+    return {
+        "trades": n,
+        "wins": n_wins,
+        "win_rate": n_wins / n,
+        "net_points": net,
+        "avg_points": net / n,
+        # per-trade expected value: p(win) * avg win - p(loss) * avg loss
+        "expectancy": float(n_wins / n * avg_win - losses.sum() / n * avg_loss),
+        "avg_win": avg_win,
+        "avg_loss": avg_loss,
+        "profit_factor": float(gains / lost) if lost > 0 else float("inf"),
+        "max_drawdown": _max_drawdown(np.cumsum(pnl)),
+    }
+
+
+def summary_metrics(trades: np.ndarray, close: Optional[np.ndarray] = None,
+                    seconds: Optional[np.ndarray] = None,
+                    periods_per_year: int = TRADING_DAYS) -> Dict[str, float]:
+    """
+    closed_trade_stats() plus, when the bar closes are given, mark-to-market
+    drawdown and time in market, and with bar seconds as well, annualised
+    Sharpe / Sortino of daily PnL (zero risk-free rate, in points).
+    """
+    out = closed_trade_stats(trade_pnl(trades))
+    if close is None:
+        return out
+    per_bar = bar_pnl(trades, close)
+    out["mtm_max_drawdown"] = _max_drawdown(np.cumsum(per_bar))
+    n = len(close)
+    out["time_in_market"] = float((trades["exit_idx"] - trades["entry_idx"]).sum() / n) if n else 0.0
+    if seconds is not None and n:
+        daily = np.add.reduceat(per_bar, day_starts(seconds))
+        std = daily.std(ddof=1) if len(daily) > 1 else 0.0
+        downside = np.sqrt(np.mean(np.minimum(daily, 0.0) ** 2))
+        scale = np.sqrt(periods_per_year)
+        out["sharpe"] = float(daily.mean() / std * scale) if std > 0 else float("nan")
+        out["sortino"] = float(daily.mean() / downside * scale) if downside > 0 else float("nan")
+    return out
+
+
+def reason_breakdown(trades: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """count, net, avg and win rate per exit reason, via bincount."""
+    pnl = trade_pnl(trades)
+    reason = trades["reason"].astype(np.int64)
+    k = len(REASONS)
+    count = np.bincount(reason, minlength=k)
+    net = np.bincount(reason, weights=pnl, minlength=k)
+    wins = np.bincount(reason, weights=pnl > 0, minlength=k)
+    return {
+        REASONS[r]: {
+            "trades": int(count[r]),
+            "net_points": float(net[r]),
+            "avg_points": float(net[r] / count[r]),
+            "win_rate": float(wins[r] / count[r]),
+        }
+        for r in range(k) if count[r]
+    }
+
+
+class Report(NamedTuple):
+    summary: Dict[str, float]
+    trades: object      # DataFrame, one row per trade with pnl / mae / mfe / bars
+    by_reason: object   # DataFrame indexed by exit reason
+    equity: object      # Series, mark-to-market equity per bar
+
+
+def report(trades: np.ndarray, arrays: Dict[str, np.ndarray], times=None) -> Report:
+    """Full report for trades over the v25_inputs() arrays (times: optional datetime Series)."""
+    import pandas as pd
+
+    cols = trade_columns(trades, arrays["high"], arrays["low"])
+    table = pd.DataFrame({
+        "entry_idx": trades["entry_idx"], "exit_idx": trades["exit_idx"],
+        "side": np.where(trades["side"] == 1, SIDES[1], SIDES[-1]),
+        "entry": trades["entry"], "exit": trades["exit"],
+        "reason": np.asarray(REASONS, dtype=object)[trades["reason"].astype(np.int64)],
+        **cols,
+    })
+    index = None
+    if times is not None:
+        table.insert(0, "entry_time", times.iloc[trades["entry_idx"]].to_numpy())
+        table.insert(1, "exit_time", times.iloc[trades["exit_idx"]].to_numpy())
+        index = pd.Index(times.to_numpy(), name="datetime")
+    summary = summary_metrics(trades, arrays["close"], arrays.get("seconds"))
+    if len(trades):
+        summary.update(avg_mae=float(cols["mae"].mean()), avg_mfe=float(cols["mfe"].mean()))
+    by_reason = pd.DataFrame.from_dict(reason_breakdown(trades), orient="index")
+    equity = pd.Series(np.cumsum(bar_pnl(trades, arrays["close"])), index=index, name="equity")
+    return Report(summary, table, by_reason, equity)
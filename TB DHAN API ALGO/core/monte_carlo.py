@@ -0,0 +1,137 @@
+"""
+Monte Carlo resampling of trade sequences.
+
+Takes the per-trade PnL of a trade log (V25Trade_Log.csv from the backtest,
+trade_logs/PaperTrade.csv from the paper trader; both carry PnL_Points and
+PnL_INR) and builds many alternative histories as a (paths, trades) matrix:
+    bootstrap  draw trades with replacement
+    permute    shuffle the actual trades (same total, different path)
+
+Each block of paths is cumulated in place and reduced to per-path final PnL,
+max drawdown and a ruin flag, so 100k+ paths never need the full matrix in
+memory at once. Blocks use child seeds of one SeedSequence, so results are
+identical whether they run in this process or spread over a process pool.
+
+Usage:
+    pnl = load_trade_pnl("V25Trade_Log.csv")
+    result = run_monte_carlo(pnl, n_paths=100_000, capital=200_000, workers=8)
+    print(result.summary())
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+METHODS = ("bootstrap", "permute")
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+# Paths per block: ~25 MB of float64 for a 1.5k-trade log, and the unit of work per process
+BLOCK_PATHS = 2048
+
+
+class MonteCarloResult(NamedTuple):
+    final: np.ndarray         # total PnL per path
+    max_drawdown: np.ndarray  # largest peak-to-trough drop per path (PnL units)
+    ruined: np.ndarray        # bool, equity touched capital * (1 - ruin_fraction)
+    capital: float
+    ruin_fraction: float
+
+    @property
+    def risk_of_ruin(self) -> float:
+        return float(self.ruined.mean()) if len(self.ruined) else 0.0
+
+    def summary(self):
+        """Percentile table of final PnL, return % and max drawdown (absolute and % of capital)."""
+        import pandas as pd
+
+        cols = {
+            "final_pnl": self.final,
+            "return_pct": self.final / self.capital * 100,
+            "max_drawdown": self.max_drawdown,
+            "max_drawdown_pct": self.max_drawdown / self.capital * 100,
+        }
+        table = pd.DataFrame({name: np.percentile(values, PERCENTILES) for name, values in cols.items()},
+                             index=[f"p{p}" for p in PERCENTILES])
+        table.loc["mean"] = [values.mean() for values in cols.values()]
+        return table
+
+
+def load_trade_pnl(path: str, column: str = "PnL_INR") -> np.ndarray:
+    """Per-trade PnL in log order from a V25 / paper trade CSV."""
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    if column not in df.columns:
+        raise ValueError(f"{path} has no '{column}' column (columns: {list(df.columns)})")
+    pnl = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+    return pnl[~np.isnan(pnl)]
+
+
+def resample(pnl: np.ndarray, n_paths: int, method: str = "bootstrap", n_trades: Optional[int] = None,
+             rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """(n_paths, n_trades) matrix of resampled trade PnL."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Known: {list(METHODS)}")
+    rng = np.random.default_rng() if rng is None else rng
+    pnl = np.asarray(pnl, dtype=np.float64)
+    if method == "permute":
+        if n_trades not in (None, len(pnl)):
+            raise ValueError("permute keeps every trade; n_trades must be None or len(pnl)")
+        return rng.permuted(np.broadcast_to(pnl, (n_paths, len(pnl))), axis=1)
+    n_trades = len(pnl) if n_trades is None else n_trades
+    return pnl[rng.integers(0, len(pnl), size=(n_paths, n_trades))]
+
+
+def path_stats(paths: np.ndarray, ruin_level: float) -> Dict[str, np.ndarray]:
+    """Final PnL, max drawdown and ruin flag per row; cumulates `paths` in place."""
+    equity = np.cumsum(paths, axis=1, out=paths)
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, 0.0, out=peak)  # equity starts at 0 before the first trade
+    np.subtract(peak, equity, out=peak)
+    return {
+        "final": equity[:, -1].copy(),
+        "max_drawdown": peak.max(axis=1),
+        "ruined": equity.min(axis=1) <= ruin_level,
+    }
+
+
+def _block(args) -> Dict[str, np.ndarray]:
+    pnl, method, n_trades, size, seed, ruin_level = args
+    paths = resample(pnl, size, method, n_trades, np.random.default_rng(seed))
+    return path_stats(paths, ruin_level)
+
+
+def run_monte_carlo(pnl, n_paths: int = 100_000, method: str = "bootstrap", n_trades: Optional[int] = None,
+                    capital: float = 100_000.0, ruin_fraction: float = 0.5, seed: Optional[int] = None,
+                    workers: Optional[int] = 1, block_paths: int = BLOCK_PATHS) -> MonteCarloResult:
+    """
+    Resamples `n_paths` trade sequences and reduces them to per-path stats.
+
+    A path is ruined once its running PnL reaches -capital * ruin_fraction.
+    workers=None uses every core; blocks run in a process pool when > 1.
+    """
+    pnl = np.asarray(pnl, dtype=np.float64)
+    if len(pnl) == 0:
+        raise ValueError("No trades to resample")
+    if n_paths < 1:
+        raise ValueError(f"n_paths must be positive, got {n_paths}")
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}'. Known: {list(METHODS)}")
+    sizes = [min(block_paths, n_paths - lo) for lo in range(0, n_paths, block_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    ruin_level = -capital * ruin_fraction
+    tasks = [(pnl, method, n_trades, size, s, ruin_level) for size, s in zip(sizes, seeds)]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    if workers == 1:
+        blocks = [_block(t) for t in tasks]
+    else:
+        ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        with ctx.Pool(workers) as pool:
+            blocks = pool.map(_block, tasks, chunksize=1)
+    stats = {k: np.concatenate([b[k] for b in blocks]) for k in ("final", "max_drawdown", "ruined")}
+    return MonteCarloResult(stats["final"], stats["max_drawdown"], stats["ruined"], float(capital), float(ruin_fraction))
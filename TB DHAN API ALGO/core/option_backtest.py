@@ -0,0 +1,302 @@
+"""
+Option-premium backtest for Strategy V25.
+
+The index backtest books PnL in NIFTY points, while live trading buys the
+ATM option: a call on BUY_CE signals, a put on SELL_PE signals. This module
+replays the index trades on the option candles that data_collector saves
+under data/options ("<trading symbol>_<expiry>.csv"):
+
+    contract   earliest collected expiry on or after the entry day, at the
+               strike nearest round(spot / step) * step (order_manager's
+               ATM rule); strike / type / expiry come from the instrument
+               master when given, else from the file name. data_collector
+               saves one strike per expiry, so a trade whose nearest
+               collected strike is more than `max_strike_distance` (default
+               one step) from ATM is reported and skipped rather than
+               priced on an away-from-the-money contract
+    fills      option close as of the index entry / exit bar (backward
+               as-of join by bar time, at most `max_lag` stale)
+    exits      the index exit bar, or earlier if an optional premium stop /
+               target (fractions of the entry premium) is touched first
+
+Contracts are resolved with searchsorted over sorted expiries and strikes,
+and trades are grouped per contract, so each option file is loaded once per
+run. Parsed candles are also cached per contract, in memory and as .npz
+files beside the CSVs (refreshed when the CSV changes), so multi-month runs
+skip the CSV parsing.
+
+Usage:
+    trades = run_option_backtest(df, "data/options")    # one row per index trade
+    trades["PnL_INR"].sum()
+"""
+from __future__ import annotations
+
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from core.backtest_engine import REASONS, SIDES, simulate_v25, v25_inputs
+
+OPTIONS_DIR = os.path.join("data", "options")
+CACHE_DIRNAME = ".premium_cache"
+OPTION_TYPES = {1: "CE", -1: "PE"}
+# Premium exits that cut a trade short of its index exit
+PREMIUM_SL, PREMIUM_TP = "Premium SL", "Premium TP"
+# Option candles from data_collector are epoch seconds parsed without a zone, i.e. UTC
+OPTION_NAIVE_TZ = "UTC"
+# Index candles without a zone are exchange time
+INDEX_NAIVE_TZ = "Asia/Kolkata"
+_SYMBOL = re.compile(r"(\d+(?:\.\d+)?)\D*(CE|PE)$")
+
+
+def _utc_ns(times, naive_tz: str) -> np.ndarray:
+    import pandas as pd
+
+    stamps = pd.DatetimeIndex(pd.to_datetime(times))
+    if stamps.tz is None:
+        stamps = stamps.tz_localize(naive_tz)
+    return stamps.as_unit("ns").asi8
+
+
+def option_catalog(options_dir: str = OPTIONS_DIR, instrument_df=None):
+    """
+    One row per collected contract file: symbol, expiry, strike, option_type,
+    path. With an instrument master, its strike / type / expiry override the
+    values parsed from the file name.
+    """
+    import pandas as pd
+
+    rows = []
+    for name in sorted(os.listdir(options_dir)) if os.path.isdir(options_dir) else []:
+        stem, ext = os.path.splitext(name)
+        if ext.lower() != ".csv" or "_" not in stem:
+            continue
+        symbol, expiry = stem.rsplit("_", 1)
+        match = _SYMBOL.search(symbol.upper())
+        rows.append({"symbol": symbol.upper(), "expiry": expiry, "strike": float(match.group(1)) if match else np.nan,
+                     "option_type": match.group(2) if match else None, "path": os.path.join(options_dir, name)})
+    catalog = pd.DataFrame(rows, columns=["symbol", "expiry", "strike", "option_type", "path"])
+    catalog["expiry"] = pd.to_datetime(catalog["expiry"], errors="coerce").dt.normalize()
+
+    if instrument_df is not None and len(catalog):
+        from order_manager import _normalize_instruments
+
+        master = _normalize_instruments(instrument_df.copy())
+        master = master.drop_duplicates("SEM_TRADING_SYMBOL", keep="last").set_index("SEM_TRADING_SYMBOL")
+        known = catalog["symbol"].isin(master.index)
+        hit = master.loc[catalog.loc[known, "symbol"]]
+        catalog.loc[known, "strike"] = hit["STRIKE_PRICE"].to_numpy(dtype=np.float64)
+        catalog.loc[known, "option_type"] = hit["OPTION_TYPE"].to_numpy()
+        catalog.loc[known, "expiry"] = pd.to_datetime(hit["EXPIRY"].to_numpy())
+    unusable = catalog["expiry"].isna() | catalog["strike"].isna() | ~catalog["option_type"].isin(["CE", "PE"])
+    if unusable.any():
+        print(f"[WARN] Skipping {int(unusable.sum())} option files without expiry/strike/type: "
+              f"{catalog.loc[unusable, 'symbol'].tolist()[:5]}")
+    return catalog[~unusable].reset_index(drop=True)
+
+
+class OptionCandleStore:
+    """
+    Per-contract premium arrays (ns, open, high, low, close; ns = UTC epoch
+    nanoseconds of the bar start), parsed once per CSV. Parsed contracts are
+    kept in an in-memory LRU and in <options_dir>/.premium_cache/<name>.npz,
+    which is rebuilt whenever the CSV's size or mtime changes.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_contracts: int = 256):
+        self.cache_dir = cache_dir
+        self.max_contracts = max_contracts
+        self._memory: "OrderedDict[str, Dict[str, np.ndarray]]" = OrderedDict()
+
+    def _cache_path(self, path: str) -> str:
+        base = self.cache_dir or os.path.join(os.path.dirname(path), CACHE_DIRNAME)
+        return os.path.join(base, os.path.splitext(os.path.basename(path))[0] + ".npz")
+
+    def candles(self, path: str) -> Dict[str, np.ndarray]:
+        stat = os.stat(path)
+        stamp = np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+        hit = self._memory.get(path)
+        if hit is not None and np.array_equal(hit["stamp"], stamp):
+            self._memory.move_to_end(path)
+            return hit
+        cache_path = self._cache_path(path)
+        data = None
+        if os.path.exists(cache_path):
+            try:
+                with np.load(cache_path) as npz:
+                    if np.array_equal(npz["stamp"], stamp):
+                        data = {k: npz[k] for k in npz.files}
+            except (OSError, ValueError, KeyError):
+                data = None
+        if data is None:
+            data = self._parse(path, stamp)
+            try:
+                os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+                np.savez(cache_path, **data)
+            except OSError as e:
+                print(f"[WARN] Could not write premium cache {cache_path}: {e}")
+        self._memory[path] = data
+        if len(self._memory) > self.max_contracts:
+            self._memory.popitem(last=False)
+        return data
+
+    @staticmethod
+    def _parse(path: str, stamp: np.ndarray) -> Dict[str, np.ndarray]:
+        import pandas as pd
+
+        df = pd.read_csv(path, usecols=["datetime", "open", "high", "low", "close"])
+        ns = _utc_ns(df["datetime"], OPTION_NAIVE_TZ)
+        order = np.argsort(ns, kind="stable")
+        data = {"ns": ns[order], "stamp": stamp}
+        for col in ("open", "high", "low", "close"):
+            data[col] = df[col].to_numpy(dtype=np.float64)[order]
+        return data
+
+
+def asof_positions(ns: np.ndarray, targets: np.ndarray, max_lag_ns: int) -> np.ndarray:
+    """Row of the last bar at or before each target (-1 if none or older than max_lag_ns)."""
+    pos = np.searchsorted(ns, targets, side="right") - 1
+    ok = pos >= 0
+    ok[ok] = targets[ok] - ns[pos[ok]] <= max_lag_ns
+    return np.where(ok, pos, -1)
+
+
+def atm_contracts(catalog, entry_days: np.ndarray, spots: np.ndarray, sides: np.ndarray,
+                  step: float = 50.0) -> np.ndarray:
+    """
+    Catalog row per trade (-1 if none): earliest expiry >= entry day among
+    the contracts of the side's type, then the strike nearest to ATM.
+    """
+    out = np.full(len(spots), -1, dtype=np.int64)
+    atm = np.round(np.asarray(spots, dtype=np.float64) / step) * step
+    expiries = catalog["expiry"].to_numpy(dtype="datetime64[D]")
+    strikes = catalog["strike"].to_numpy(dtype=np.float64)
+    types = catalog["option_type"].to_numpy()
+    for side, kind in OPTION_TYPES.items():
+        rows = np.flatnonzero(types == kind)
+        trades = np.flatnonzero(sides == side)
+        if len(rows) == 0 or len(trades) == 0:
+            continue
+        series = np.unique(expiries[rows])
+        k = np.searchsorted(series, entry_days[trades], side="left")
+        has = k < len(series)
+        trades, k = trades[has], k[has]
+        for e in np.unique(k):
+            group = trades[k == e]
+            cands = rows[expiries[rows] == series[e]]
+            cands = cands[np.argsort(strikes[cands], kind="stable")]
+            levels = strikes[cands]
+            pos = np.searchsorted(levels, atm[group])
+            lower = np.clip(pos - 1, 0, len(levels) - 1)
+            upper = np.clip(pos, 0, len(levels) - 1)
+            nearer = np.abs(levels[lower] - atm[group]) <= np.abs(levels[upper] - atm[group])
+            out[group] = cands[np.where(nearer, lower, upper)]
+    return out
+
+
+def premium_trades(df, trades: np.ndarray, catalog, store: Optional[OptionCandleStore] = None,
+                   lot_size: Optional[int] = None, step: float = 50.0, max_lag: str = "5min",
+                   premium_sl: Optional[float] = None, premium_tp: Optional[float] = None,
+                   max_strike_distance: Optional[float] = None):
+    """
+    Replays TRADE_DTYPE index trades on option premiums. Returns one row per
+    trade that found a contract within max_strike_distance of ATM (default
+    `step`) and both fills; the rest are reported and dropped. PnL is
+    premium points (long option) times lot_size.
+    """
+    import pandas as pd
+
+    if lot_size is None:
+        from config import LOT_SIZE as lot_size
+    store = OptionCandleStore() if store is None else store
+    times = df["datetime"]
+    index = pd.DatetimeIndex(times)
+    bar_ns = _utc_ns(index, INDEX_NAIVE_TZ)
+    lag = int(pd.Timedelta(max_lag).value)
+    entry_idx, exit_idx = trades["entry_idx"], trades["exit_idx"]
+    days = index[entry_idx].tz_localize(None).normalize().to_numpy(dtype="datetime64[D]")  # exchange dates
+    contract = atm_contracts(catalog, days, trades["entry"], trades["side"].astype(np.int64), step)
+    n = len(trades)
+    limit = step if max_strike_distance is None else max_strike_distance
+    found = contract >= 0
+    atm = np.round(trades["entry"] / step) * step
+    far = np.zeros(n, dtype=bool)
+    far[found] = np.abs(catalog["strike"].to_numpy(dtype=np.float64)[contract[found]] - atm[found]) > limit
+    if far.any():
+        print(f"[WARN] {int(far.sum())} of {n} trades have no collected strike within {limit:g} of ATM; skipped")
+        contract[far] = -1
+
+    entry_p = np.full(n, np.nan)
+    exit_p = np.full(n, np.nan)
+    exit_ns = np.zeros(n, dtype=np.int64)
+    reason = np.asarray(REASONS, dtype=object)[trades["reason"].astype(np.int64)]
+    for row in np.unique(contract[contract >= 0]):
+        group = np.flatnonzero(contract == row)
+        opt = store.candles(catalog.at[row, "path"])
+        pe = asof_positions(opt["ns"], bar_ns[entry_idx[group]], lag)
+        px = asof_positions(opt["ns"], bar_ns[exit_idx[group]], lag)
+        ok = (pe >= 0) & (px >= 0)
+        group, pe, px = group[ok], pe[ok], px[ok]
+        entry_p[group] = opt["close"][pe]
+        exit_p[group] = opt["close"][px]
+        exit_ns[group] = opt["ns"][px]
+        if premium_sl is None and premium_tp is None:
+            continue
+        # first option bar after entry touching the stop / target, up to the index exit
+        for t, a, b in zip(group.tolist(), pe.tolist(), px.tolist()):
+            lows, highs = opt["low"][a + 1:b + 1], opt["high"][a + 1:b + 1]
+            stop = entry_p[t] * (1 - premium_sl) if premium_sl is not None else -np.inf
+            target = entry_p[t] * (1 + premium_tp) if premium_tp is not None else np.inf
+            hit_sl = np.flatnonzero(lows <= stop)
+            hit_tp = np.flatnonzero(highs >= target)
+            k_sl = hit_sl[0] if len(hit_sl) else len(lows)
+            k_tp = hit_tp[0] if len(hit_tp) else len(lows)
+            if k_sl == k_tp == len(lows):
+                continue
+            k = min(k_sl, k_tp)
+            o = opt["open"][a + 1 + k]
+            if k_sl <= k_tp:  # a bar touching both counts as the stop
+                exit_p[t], reason[t] = min(o, stop), PREMIUM_SL
+            else:
+                exit_p[t], reason[t] = max(o, target), PREMIUM_TP
+            exit_ns[t] = opt["ns"][a + 1 + k]
+
+    filled = ~np.isnan(entry_p) & ~np.isnan(exit_p)
+    missing = ~filled & ~far
+    if missing.any():
+        print(f"[WARN] {int(missing.sum())} of {n} trades have no option contract or premium bars; skipped")
+    keep = np.flatnonzero(filled)
+    exit_times = pd.DatetimeIndex(exit_ns[keep]).tz_localize("UTC").tz_convert(index.tz or INDEX_NAIVE_TZ)
+    if index.tz is None:
+        exit_times = exit_times.tz_localize(None)
+    pnl = exit_p[keep] - entry_p[keep]
+    picked = catalog.iloc[contract[keep]]
+    out = pd.DataFrame({
+        "EntryTime": times.iloc[entry_idx[keep]].to_numpy(),
+        "Side": [SIDES[s] for s in trades["side"][keep].tolist()],
+        "Symbol": picked["symbol"].to_numpy(),
+        "Expiry": picked["expiry"].dt.date.to_numpy(),
+        "Strike": picked["strike"].to_numpy(),
+        "EntrySpot": trades["entry"][keep],
+        "EntryPrice": entry_p[keep],
+        "ExitTime": exit_times,
+        "ExitPrice": exit_p[keep],
+        "ExitSpot": trades["exit"][keep],
+        "Reason": reason[keep],
+        "PnL_Points": np.round(pnl, 2),
+        "PnL_INR": np.round(pnl * lot_size, 2),
+    })
+    return out
+
+
+def run_option_backtest(df, options_dir: str = OPTIONS_DIR, instrument_df=None, start: int = 35,
+                        store: Optional[OptionCandleStore] = None, **kwargs):
+    """V25 index trades over an indicator frame, replayed on the collected ATM option candles."""
+    catalog = option_catalog(options_dir, instrument_df)
+    if catalog.empty:
+        raise FileNotFoundError(f"No option candle files in {options_dir}")
+    trades, _ = simulate_v25(v25_inputs(df), start)
+    return premium_trades(df, trades, catalog, store, **kwargs)
@@ -0,0 +1,107 @@
+"""
+Day-partitioned parallel V25 backtest.
+
+V25 is flat after the 15:25 bar and cannot enter after 15:15, so a run can be
+cut at any day start whose previous day reaches 15:25 (backtest_engine.flat_cuts)
+without changing a single trade. Indicators and entry codes are computed once
+over the full series in this process, so every segment sees the real
+warm-up; the arrays go to the workers through one shared-memory block and
+each worker runs the exit kernel on its own day range. Segments come back
+in order, so the merged trade list (and, when tracing, the event lines) is
+identical to run_v25_backtest's.
+
+Usage:
+    trades = run_v25_by_day(df, workers=8)   # same tuples as run_v25_backtest(df)
+"""
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.backtest_engine import (
+    EVENT_DTYPE,
+    TRADE_DTYPE,
+    day_bounds,
+    flat_cuts,
+    record_events,
+    simulate_v25,
+    to_trade_tuples,
+    v25_inputs,
+)
+from core.events import INFO
+from core.shared_data import SharedArrays, attach
+
+# Segments per worker, so uneven days still keep every process busy
+SEGMENTS_PER_WORKER = 4
+
+
+def split_points(seconds: np.ndarray, bounds: np.ndarray, parts: int) -> np.ndarray:
+    """Segment edges [0, ..., n]: up to `parts` segments of similar bar counts, cut only at flat day starts."""
+    n = int(bounds[-1])
+    cuts = flat_cuts(seconds, bounds)
+    if parts <= 1 or len(cuts) == 0:
+        return np.array([0, n], dtype=np.int64)
+    targets = np.arange(1, parts) * (n / parts)
+    pos = np.clip(np.searchsorted(cuts, targets), 0, len(cuts) - 1)
+    prev = np.clip(pos - 1, 0, len(cuts) - 1)
+    nearest = np.where(np.abs(cuts[prev] - targets) < np.abs(cuts[pos] - targets), cuts[prev], cuts[pos])
+    return np.unique(np.r_[0, nearest, n]).astype(np.int64)
+
+
+def _segment(arrays: Dict[str, np.ndarray], lo: int, hi: int, start: int, trace: bool,
+             exits: Dict[str, float]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    trades, events = simulate_v25({k: v[lo:hi] for k, v in arrays.items()}, max(start - lo, 0), trace, **exits)
+    trades["entry_idx"] += lo
+    trades["exit_idx"] += lo
+    if events is not None:
+        events["bar"] += lo
+    return trades, events
+
+
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(name: str, start: int, trace: bool, exits: Dict[str, float]) -> None:
+    _WORKER.update(arrays=dict(attach(name).arrays), start=start, trace=trace, exits=exits)
+
+
+def _run_segment(bounds: Tuple[int, int]):
+    lo, hi = bounds
+    return _segment(_WORKER["arrays"], lo, hi, _WORKER["start"], _WORKER["trace"], _WORKER["exits"])
+
+
+def simulate_v25_by_day(arrays: Dict[str, np.ndarray], bounds: np.ndarray, workers: Optional[int] = None,
+                        start: int = 35, trace: bool = False,
+                        **exits) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """simulate_v25 split over day segments; same (trades, events) as one continuous run."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    edges = split_points(arrays["seconds"], bounds, max(workers, 1) * SEGMENTS_PER_WORKER)
+    segments = list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+    workers = max(1, min(workers, len(segments)))
+    if workers == 1:
+        parts = [_segment(arrays, lo, hi, start, trace, exits) for lo, hi in segments]
+    else:
+        with SharedArrays.publish(arrays) as shared:
+            ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+            with ctx.Pool(workers, initializer=_init_worker, initargs=(shared.name, start, trace, exits)) as pool:
+                parts = pool.map(_run_segment, segments, chunksize=1)  # map keeps segment order
+    trades = np.concatenate([t for t, _ in parts]) if parts else np.empty(0, dtype=TRADE_DTYPE)
+    events = None
+    if trace:
+        events = np.concatenate([e for _, e in parts]) if parts else np.empty(0, dtype=EVENT_DTYPE)
+    return trades, events
+
+
+def run_v25_by_day(df, workers: Optional[int] = None, start: int = 35, recorder=None) -> List[tuple]:
+    """Day-parallel run_v25_backtest: same trade tuples and recorded events."""
+    times = df["datetime"]
+    arrays = v25_inputs(df)
+    trace = recorder is not None and recorder.enabled(INFO)
+    trades, events = simulate_v25_by_day(arrays, day_bounds(times), workers, start, trace=trace)
+    if trace:
+        record_events(recorder, events, arrays, times)
+    return to_trade_tuples(trades, times)
@@ -0,0 +1,198 @@
+"""
+Array-based Renko brick engine.
+
+Same brick rules as the original Tradehull.renko_bricks: the grid is anchored
+at floor(first open / box) * box, a brick forms each time the close moves a
+full box beyond the last brick, and a reversal needs a 2-box move. Bricks
+come back as columnar NumPy arrays (source bar index, open, high, low, close,
+direction) instead of one dict per brick.
+
+RenkoBuilder keeps the grid state between calls, so a live session or a
+growing archive only processes the bars appended since the last update; the
+state round-trips through to_state() / from_state().
+
+The brick loop is path dependent and cannot be vectorized exactly; it is
+compiled with numba when installed and otherwise runs as plain Python over
+lists (no DataFrame row access).
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+try:  # optional JIT; the same kernel runs as plain Python without it
+    from numba import njit as _njit
+    HAVE_NUMBA = True
+except ImportError:
+    _njit = None
+    HAVE_NUMBA = False
+
+GREEN = 1
+RED = -1
+RENKO_FIELDS = ("bar", "open", "high", "low", "close", "direction")
+
+
+def _renko_kernel(close, start, prev, direction, box, out_bar, out_close, out_dir):
+    """
+    Emits bricks for close[start:] into the out_* buffers.
+
+    Returns (bricks written, bar to resume at, prev, direction). Stops early
+    when the buffers are full; calling again from the returned bar and state
+    continues exactly where it left off, even in the middle of a bar.
+    """
+    cap = len(out_close)
+    count = 0
+    n = len(close)
+    two_box = 2 * box
+    for i in range(start, n):
+        c = close[i]
+        while abs(c - prev) >= box:
+            diff = c - prev
+            if diff > 0:
+                if direction == -1:
+                    if diff < two_box:
+                        break
+                    step = two_box
+                else:
+                    step = box
+                if count == cap:
+                    return count, i, prev, direction
+                prev += step
+                direction = 1
+            elif diff < 0:
+                if direction == 1:
+                    if -diff < two_box:
+                        break
+                    step = two_box
+                else:
+                    step = box
+                if count == cap:
+                    return count, i, prev, direction
+                prev -= step
+                direction = -1
+            else:
+                break
+            out_bar[count] = i
+            out_close[count] = prev
+            out_dir[count] = direction
+            count += 1
+    return count, n, prev, direction
+
+
+if HAVE_NUMBA:
+    _renko_kernel = _njit(cache=True, nogil=True)(_renko_kernel)
+
+
+def brick_columns(close: np.ndarray, direction: np.ndarray, box_size: float) -> Dict[str, np.ndarray]:
+    """open/high/low for brick closes, using the original builder's formulas (including its low for green bricks)."""
+    green = direction == GREEN
+    red = direction == RED
+    return {
+        "open": np.where(green, close - box_size, close + box_size),
+        "high": np.where(green, close, close + box_size),
+        "low": np.where(red, close - box_size, close),
+    }
+
+
+class RenkoBuilder:
+    """
+    Incremental Renko builder.
+
+    Args:
+        box_size: brick height in price points.
+
+    update(open, close) folds in a block of new bars (arrays) and returns the
+    bricks they completed; bricks() returns everything built so far.
+    """
+
+    def __init__(self, box_size: float = 7):
+        if not box_size > 0:
+            raise ValueError(f"box_size must be positive, got {box_size}")
+        self.box_size = float(box_size)
+        self.prev: Optional[float] = None  # close of the last brick (grid anchor before the first)
+        self.direction = 0
+        self.bars = 0
+        self._chunks = []
+
+    def update(self, open_, close) -> Dict[str, np.ndarray]:
+        c = np.ascontiguousarray(close, dtype=np.float64)
+        if len(c) == 0:
+            return self._pack([], [], [], 0)
+        if self.prev is None:
+            first_open = float(np.asarray(open_, dtype=np.float64)[0])
+            self.prev = (first_open // self.box_size) * self.box_size
+
+        size = max(64, len(c) // 8)
+        bars, closes, dirs = [], [], []
+        start, total = 0, 0
+        src = c if HAVE_NUMBA else c.tolist()
+        while True:
+            if HAVE_NUMBA:
+                out_bar, out_close, out_dir = np.empty(size, np.int64), np.empty(size), np.empty(size, np.int8)
+            else:
+                out_bar, out_close, out_dir = [0] * size, [0.0] * size, [0] * size
+            count, start, self.prev, self.direction = _renko_kernel(
+                src, start, self.prev, self.direction, self.box_size, out_bar, out_close, out_dir)
+            bars.append(np.asarray(out_bar[:count], dtype=np.int64))
+            closes.append(np.asarray(out_close[:count], dtype=np.float64))
+            dirs.append(np.asarray(out_dir[:count], dtype=np.int8))
+            total += count
+            if start >= len(c):
+                break
+            size *= 2
+        offset = self.bars
+        self.bars += len(c)
+        new = self._pack(np.concatenate(bars) + offset, np.concatenate(closes), np.concatenate(dirs), total)
+        if total:
+            self._chunks.append(new)
+        return new
+
+    def _pack(self, bar, close, direction, total) -> Dict[str, np.ndarray]:
+        close = np.asarray(close, dtype=np.float64)
+        direction = np.asarray(direction, dtype=np.int8)
+        out = {"bar": np.asarray(bar, dtype=np.int64), "close": close, "direction": direction}
+        out.update(brick_columns(close, direction, self.box_size))
+        return {f: out[f] for f in RENKO_FIELDS}
+
+    def bricks(self) -> Dict[str, np.ndarray]:
+        """All bricks since construction (bar = index into every bar ever passed to update)."""
+        if not self._chunks:
+            return self._pack([], [], [], 0)
+        if len(self._chunks) > 1:
+            self._chunks = [{f: np.concatenate([ch[f] for ch in self._chunks]) for f in RENKO_FIELDS}]
+        return self._chunks[0]
+
+    def to_state(self) -> Dict:
+        """Grid state only; bricks already emitted are not included."""
+        return {"box_size": self.box_size, "prev": self.prev, "direction": self.direction, "bars": self.bars}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "RenkoBuilder":
+        obj = cls(state["box_size"])
+        obj.prev = None if state["prev"] is None else float(state["prev"])
+        obj.direction = int(state["direction"])
+        obj.bars = int(state["bars"])
+        return obj
+
+
+def renko_arrays(open_, close, box_size: float = 7) -> Dict[str, np.ndarray]:
+    """Columnar bricks for a whole series (see RenkoBuilder)."""
+    return RenkoBuilder(box_size).update(open_, close)
+
+
+def renko_frame(df, box_size: float = 7, time_col: str = "timestamp"):
+    """DataFrame in the original renko_bricks layout: timestamp, open, high, low, close, brick_color."""
+    import pandas as pd
+
+    bricks = renko_arrays(df["open"].to_numpy(), df["close"].to_numpy(), box_size)
+    if len(bricks["close"]) == 0:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        time_col: df[time_col].iloc[bricks["bar"]].reset_index(drop=True),
+        "open": bricks["open"],
+        "high": bricks["high"],
+        "low": bricks["low"],
+        "close": bricks["close"],
+        "brick_color": np.where(bricks["direction"] == GREEN, "green", "red"),
+    })
@@ -0,0 +1,199 @@
+"""
+Shared-memory dataset registry for multi-process backtests.
+
+A dataset (candle, indicator and signal arrays of equal length) is published
+once into a single shared-memory block. The block starts with a small JSON
+header describing its columns, so a worker needs nothing but the block name
+to attach: every column comes back as a zero-copy NumPy view, and no
+DataFrame is pickled or CSV re-read per process. Memory stays one copy of
+the data however many workers attach.
+
+Blocks created by this process are tracked in a registry and unlinked by
+release(), by leaving a `with` block, or at interpreter exit (atexit), so an
+exception or Ctrl-C mid-run does not leave segments behind in /dev/shm.
+If the owner is killed outright, multiprocessing's resource tracker still
+unlinks its blocks when the owner's process tree goes away.
+
+Usage:
+    with publish_frame(df) as data:          # owner
+        pool = ctx.Pool(8, initargs=(data.name,), ...)
+    data = attach(name)                      # worker: cached per process
+    data.arrays["close"], data.frame()
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import secrets
+from multiprocessing import shared_memory
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+# Block names: short enough for macOS (31 chars incl. the leading slash)
+PREFIX = "tbd_"
+# Header: 8-byte JSON length, then the JSON; columns start on a 64-byte boundary
+_LEN_BYTES = 8
+_ALIGN = 64
+
+Layout = Dict[str, Tuple[int, str, int]]
+
+
+def _aligned(offset: int, align: int = _ALIGN) -> int:
+    return -(-offset // align) * align
+
+
+class SharedArrays:
+    """
+    Equal-length 1-D arrays packed into one self-describing shared-memory block.
+
+    The owner creates it with publish() and releases it with close() (or a
+    `with` block); other processes rebuild zero-copy views with attach(name).
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Layout, meta: Dict, owner: bool):
+        self.shm = shm
+        self.layout = layout
+        self.meta = meta
+        self.owner = owner
+        self._pid = os.getpid()
+        self.arrays = {
+            name: np.ndarray((length,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+            for name, (offset, dtype, length) in layout.items()
+        }
+        if not owner:
+            for values in self.arrays.values():
+                values.flags.writeable = False
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @classmethod
+    def publish(cls, arrays: Dict[str, np.ndarray], name: Optional[str] = None,
+                meta: Optional[Dict] = None) -> "SharedArrays":
+        """Copies `arrays` into a new block (registered for cleanup) and returns the owner handle."""
+        arrays = {k: np.ascontiguousarray(v) for k, v in arrays.items()}
+        lengths = {len(v) for v in arrays.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Shared arrays must have equal lengths, got {sorted(lengths)}")
+        if any(v.dtype.hasobject for v in arrays.values()):
+            raise ValueError("Object columns cannot be shared; convert them to numeric arrays first")
+        meta = dict(meta or {})
+        relative: Layout = {}
+        offset = 0
+        for key, values in arrays.items():
+            relative[key] = (offset, values.dtype.str, len(values))
+            offset = _aligned(offset + values.nbytes, 8)
+        header = json.dumps({"layout": relative, "meta": meta}).encode()
+        base = _aligned(_LEN_BYTES + len(header))
+        layout = {k: (base + o, d, n) for k, (o, d, n) in relative.items()}
+        shm = shared_memory.SharedMemory(name=name or f"{PREFIX}{os.getpid()}_{secrets.token_hex(4)}",
+                                         create=True, size=base + max(offset, 1))
+        shm.buf[:_LEN_BYTES] = len(header).to_bytes(_LEN_BYTES, "little")
+        shm.buf[_LEN_BYTES:_LEN_BYTES + len(header)] = header
+        obj = cls(shm, layout, meta, owner=True)
+        for key, values in arrays.items():
+            obj.arrays[key][:] = values
+        _OWNED[obj.name] = obj
+        return obj
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedArrays":
+        """Read-only views of the block published under `name`."""
+        # processes started from the owner share its resource tracker, which
+        # holds one entry per block, so the owner's unlink stays the only cleanup
+        shm = shared_memory.SharedMemory(name=name)
+        size = int.from_bytes(bytes(shm.buf[:_LEN_BYTES]), "little")
+        header = json.loads(bytes(shm.buf[_LEN_BYTES:_LEN_BYTES + size]).decode())
+        base = _aligned(_LEN_BYTES + size)
+        layout = {k: (base + int(o), str(d), int(n)) for k, (o, d, n) in header["layout"].items()}
+        return cls(shm, layout, header["meta"], owner=False)
+
+    def frame(self):
+        """The arrays as a DataFrame; datetime columns published by publish_frame() come back tz-aware."""
+        import pandas as pd
+
+        columns = {}
+        for key, values in self.arrays.items():
+            stamp = self.meta.get("datetime", {}).get(key)
+            if stamp is not None:
+                tz, unit = stamp
+                stamps = pd.DatetimeIndex(values.view(f"M8[{unit}]"))
+                columns[key] = stamps.tz_localize("UTC").tz_convert(tz) if tz else stamps
+            else:
+                columns[key] = values
+        return pd.DataFrame(columns, copy=False)
+
+    def close(self) -> None:
+        """Drops the views and the mapping; the owner also unlinks the block."""
+        self.arrays = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # a caller still holds a view; the mapping goes with the process
+        if self.owner and os.getpid() == self._pid:
+            _OWNED.pop(self.name, None)
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# Blocks this process created (unlinked at exit) and blocks it attached to (reused per name)
+_OWNED: Dict[str, SharedArrays] = {}
+_ATTACHED: Dict[str, SharedArrays] = {}
+
+
+def publish_frame(df, columns=None, name: Optional[str] = None) -> SharedArrays:
+    """
+    Publishes the numeric columns of a candle / indicator frame (all of them
+    by default); datetime columns travel as int64 ticks plus their unit and tz.
+    """
+    import pandas as pd
+
+    arrays, zones = {}, {}
+    for col in (df.columns if columns is None else columns):
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            stamps = pd.DatetimeIndex(values)
+            zones[col] = (str(stamps.tz) if stamps.tz is not None else None, stamps.unit)
+            arrays[col] = stamps.asi8  # UTC epoch ticks when tz-aware
+        else:
+            arrays[col] = values.to_numpy()
+    return SharedArrays.publish(arrays, name=name, meta={"datetime": zones})
+
+
+def attach(name: str) -> SharedArrays:
+    """Worker-side attach, cached so every task in a process reuses one mapping."""
+    data = _ATTACHED.get(name)
+    if data is None:
+        data = _ATTACHED[name] = SharedArrays.attach(name)
+    return data
+
+
+def release(name: str) -> None:
+    """Closes an owned block (unlinking it) or an attached one."""
+    data = _OWNED.get(name) or _ATTACHED.pop(name, None)
+    if data is not None:
+        data.close()
+
+
+def release_all() -> None:
+    """Closes every attached block and unlinks every block this process owns."""
+    for data in list(_ATTACHED.values()):
+        data.close()
+    _ATTACHED.clear()
+    for data in list(_OWNED.values()):
+        if data._pid == os.getpid():  # forked children inherit the registry but not ownership
+            data.close()
+
+
+atexit.register(release_all)
@@ -0,0 +1,299 @@
+"""
+Single-pass multi-strategy engine.
+
+Strategies declare the indicators they read (ema / macd / atr specs) and
+implement on_bar(); the engine owns one bar stream and one indicator cache
+for all of them. Each distinct indicator is computed once however many
+strategies use it, and every bar is visited once, with each strategy's
+on_bar() as a small state machine over the shared values. N strategies or
+parameter variants cost one indicator pass plus N state machines instead of
+N full pipelines.
+
+    backtest  run(df) computes the cache with the array kernels
+              (IndicatorBank / atr_array), then walks the bars once
+    live      on_bar(time, open, high, low, close) folds one closed bar into
+              streaming indicators (core.indicators) and dispatches it
+
+Both modes produce the same values, so a strategy behaves identically in a
+backtest and in a live session. V25Strategy is Strategy V25 on this
+interface; with default parameters its trades equal simulate_v25's.
+
+Usage:
+    engine = StrategyEngine([V25Strategy(), V25Strategy("v25_tp20", tp_points=20)])
+    trades = engine.run(df)                       # {name: TRADE_DTYPE array}
+    for bar in feed: events = engine.on_bar(*bar) # [(name, "BUY_CE" | exit reason), ...]
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.backtest_engine import (
+    EOD_EXIT,
+    EOD_SECONDS,
+    INITIAL_SL,
+    MACD_EMA_EXIT,
+    REASONS,
+    SIDES,
+    SL_HIT,
+    TRADE_DTYPE,
+    V25_PARAMS,
+)
+from core.indicators import IndicatorBank, StreamingATR, StreamingEMA, StreamingMACD, atr_array
+
+Spec = Tuple  # ("ema", span) | ("macd", fast, slow, signal) | ("atr", period)
+
+
+def spec_columns(spec: Spec) -> Tuple[str, ...]:
+    """Cache column names for an indicator spec; the V25 defaults keep the strategy frame's names."""
+    kind, *params = spec
+    if kind == "ema":
+        return (f"ema{params[0]}",)
+    if kind == "atr":
+        return ("atr",) if params[0] == 14 else (f"atr{params[0]}",)
+    if kind == "macd":
+        suffix = "" if tuple(params) == (12, 26, 9) else "_" + "_".join(str(p) for p in params)
+        return tuple(f"{name}{suffix}" for name in ("macd", "macd_signal", "macd_hist"))
+    raise ValueError(f"Unknown indicator spec {spec!r}; use ema / macd / atr")
+
+
+def _seconds(time) -> float:
+    return time.hour * 3600 + time.minute * 60 + time.second + time.microsecond / 1e6
+
+
+class BarView:
+    """
+    The engine's cursor: bar i's prices and cached indicators. Columns are
+    plain lists, so scalar reads stay cheap inside per-bar Python code.
+    `memo` is cleared every bar, for values several strategies derive alike
+    (V25 variants with the same entry parameters share one entry check).
+    """
+
+    __slots__ = ("i", "time", "seconds", "open", "high", "low", "close", "memo", "_columns")
+
+    def __init__(self, columns: Dict[str, list]):
+        self._columns = columns
+        self.i = -1
+        self.memo: Dict = {}
+
+    def __getitem__(self, name: str) -> float:
+        return self._columns[name][self.i]
+
+    def prev(self, name: str, k: int = 1) -> float:
+        """Value k bars back (NaN before the first bar)."""
+        j = self.i - k
+        return self._columns[name][j] if j >= 0 else float("nan")
+
+
+class Strategy(ABC):
+    """
+    Base class: set `name` and `indicators`, implement on_bar(). on_bar()
+    returns an event label (entry side or exit reason) or None; closed
+    trades go to self.trades as TRADE_DTYPE tuples
+    (entry_idx, exit_idx, side, entry, exit, reason, sl).
+    """
+
+    name = "strategy"
+    indicators: Sequence[Spec] = ()
+
+    def __init__(self, name: Optional[str] = None):
+        if name is not None:
+            self.name = name
+        self.trades: List[tuple] = []
+
+    def reset(self) -> None:
+        self.trades = []
+
+    @abstractmethod
+    def on_bar(self, bar: BarView) -> Optional[str]:
+        ...
+
+    def trade_array(self) -> np.ndarray:
+        return np.array(self.trades, dtype=TRADE_DTYPE)
+
+
+class V25Strategy(Strategy):
+    """
+    Strategy V25 (check_entry + the backtest exit rules) as a per-bar state
+    machine; keyword overrides take the V25_PARAMS names, as in the sweep.
+    """
+
+    name = "v25"
+    indicators = (("ema", 21), ("macd", 12, 26, 9), ("atr", 14))
+
+    def __init__(self, name: Optional[str] = None, start: int = 35, **params):
+        super().__init__(name)
+        unknown = set(params) - set(V25_PARAMS)
+        if unknown:
+            raise ValueError(f"Unknown V25 parameters {sorted(unknown)}. Known: {sorted(V25_PARAMS)}")
+        self.params = {**V25_PARAMS, **params}
+        self.start = start
+        self._entry_key = ("v25_entry", self.params["macd_gap"], self.params["min_atr_ratio"])
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self.side = 0
+        self.entry_i = 0
+        self.entry = self.sl = self.initial_sl = self.extreme = 0.0
+        self.tp1_hit = False
+
+    def entry_code(self, bar: BarView) -> int:
+        """check_entry on the current bar: 1 (BUY_CE), -1 (SELL_PE) or 0."""
+        if not 9 * 3600 + 30 * 60 <= bar.seconds <= 15 * 3600 + 15 * 60:
+            return 0
+        p = self.params
+        c = bar.close
+        hist, prev1, prev2 = bar["macd_hist"], bar.prev("macd_hist"), bar.prev("macd_hist", 2)
+        spread = bar["macd"] - bar["macd_signal"]
+        if not bar["atr"] / c >= p["min_atr_ratio"]:
+            return 0
+        if hist > prev1 > prev2 and spread > p["macd_gap"] and c > bar["ema21"]:
+            return 1
+        if hist < prev1 < prev2 and spread < -p["macd_gap"] and c < bar["ema21"]:
+            return -1
+        return 0
+
+    def on_bar(self, bar: BarView) -> Optional[str]:
+        if bar.i < self.start:
+            return None
+        p = self.params
+        i, c, side = bar.i, bar.close, self.side
+        event = None
+        if side == 0:
+            side = bar.memo.get(self._entry_key)
+            if side is None:
+                side = bar.memo[self._entry_key] = self.entry_code(bar)
+            if side == 0:
+                return None
+            self.side, self.entry_i, self.entry, self.tp1_hit = side, i, c, False
+            self.sl = self.initial_sl = round((c - side * p["sl_atr"] * bar["atr"]) * 100.0) / 100.0
+            self.extreme = c if side == 1 else bar.low
+            event = SIDES[side]
+
+        if side == 1:
+            if bar.high > self.extreme:
+                self.extreme = bar.high
+        elif bar.low < self.extreme:
+            self.extreme = bar.low
+
+        reason, exit_price = -1, 0.0
+        if not self.tp1_hit and side * (c - self.initial_sl) <= 0:
+            reason, exit_price = INITIAL_SL, self.initial_sl
+        else:
+            tp1 = self.entry + side * p["tp_points"]
+            if not self.tp1_hit and ((side == 1 and bar.high >= tp1) or (side == -1 and bar.low <= tp1)):
+                self.tp1_hit = True
+                self.sl = round((self.entry + side * p["lock_points"]) * 100.0) / 100.0
+            if side * (c - self.sl) <= 0:
+                reason, exit_price = SL_HIT, self.sl
+            elif self.tp1_hit:
+                step = p["trail_atr"] * bar["atr"]
+                trail = step if step > p["trail_min"] else p["trail_min"]
+                level = self.extreme - side * trail
+                if side * (level - self.sl) > 0:
+                    self.sl = round(level * 100.0) / 100.0
+                if side * (c - bar["ema21"]) < 0 or side * bar["macd_hist"] < 0:
+                    reason, exit_price = MACD_EMA_EXIT, c
+            if reason < 0 and bar.seconds >= EOD_SECONDS:
+                reason, exit_price = EOD_EXIT, c
+
+        if reason >= 0:
+            self.trades.append((self.entry_i, i, side, self.entry, exit_price, reason, self.sl))
+            self.side = 0
+            return REASONS[reason]
+        return event
+
+
+class StrategyEngine:
+    """One bar stream and one indicator cache driving many strategies."""
+
+    def __init__(self, strategies: Iterable[Strategy]):
+        self.strategies = list(strategies)
+        names = [s.name for s in self.strategies]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Strategy names must be unique, got {names}")
+        self.specs: List[Spec] = list(dict.fromkeys(tuple(spec) for s in self.strategies for spec in s.indicators))
+        for spec in self.specs:
+            spec_columns(spec)
+        self._reset_live()
+
+    # --- backtest ---
+    def indicator_columns(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> Dict[str, np.ndarray]:
+        """Every requested indicator over whole arrays, each distinct EMA span computed once."""
+        spans = [s[1] for s in self.specs if s[0] == "ema"]
+        grid = [tuple(s[1:]) for s in self.specs if s[0] == "macd"]
+        bank = IndicatorBank(close, spans=spans, macd_grid=grid)
+        out: Dict[str, np.ndarray] = {}
+        for spec in self.specs:
+            names = spec_columns(spec)
+            if spec[0] == "ema":
+                out[names[0]] = bank.ema(spec[1])
+            elif spec[0] == "macd":
+                out.update(zip(names, bank.macd(*spec[1:])))
+            else:
+                out[names[0]] = atr_array(high, low, close, spec[1])
+        return out
+
+    def run(self, df) -> Dict[str, np.ndarray]:
+        """Backtest every strategy over an OHLC frame in one pass; {name: TRADE_DTYPE trades}."""
+        from strategy_v25 import session_seconds
+
+        ohlc = {k: df[k].to_numpy(dtype=np.float64) for k in ("open", "high", "low", "close")}
+        columns = {k: v.tolist() for k, v in self.indicator_columns(ohlc["high"], ohlc["low"], ohlc["close"]).items()}
+        seconds = session_seconds(df["datetime"]).tolist()
+        times = df["datetime"].tolist()
+        opens, highs, lows, closes = (ohlc[k].tolist() for k in ("open", "high", "low", "close"))
+        for s in self.strategies:
+            s.reset()
+        bar = BarView(columns)
+        handlers = [s.on_bar for s in self.strategies]
+        for i in range(len(closes)):
+            bar.i, bar.time, bar.seconds = i, times[i], seconds[i]
+            bar.open, bar.high, bar.low, bar.close = opens[i], highs[i], lows[i], closes[i]
+            bar.memo = {}
+            for handler in handlers:
+                handler(bar)
+        return {s.name: s.trade_array() for s in self.strategies}
+
+    # --- live ---
+    def _reset_live(self) -> None:
+        self._streams = []
+        for spec in self.specs:
+            kind, *params = spec
+            stream = StreamingEMA(*params) if kind == "ema" else StreamingMACD(*params) if kind == "macd" \
+                else StreamingATR(*params)
+            self._streams.append((kind, spec_columns(spec), stream))
+        self._live_columns: Dict[str, list] = {name: [] for _, names, _ in self._streams for name in names}
+        self._bar = BarView(self._live_columns)
+
+    def reset(self) -> None:
+        """Clears the live indicator state and every strategy's position and trades."""
+        self._reset_live()
+        for s in self.strategies:
+            s.reset()
+
+    def on_bar(self, time, open_: float, high: float, low: float, close: float) -> List[Tuple[str, str]]:
+        """Folds one closed bar into the shared indicators and runs every strategy on it."""
+        for kind, names, stream in self._streams:
+            if kind == "ema":
+                values = (stream.update(close),)
+            elif kind == "macd":
+                values = stream.update(close)
+            else:
+                values = (stream.update(high, low, close),)
+            for name, value in zip(names, values):
+                self._live_columns[name].append(value)
+        bar = self._bar
+        bar.i += 1
+        bar.time, bar.seconds = time, _seconds(time)
+        bar.open, bar.high, bar.low, bar.close = float(open_), float(high), float(low), float(close)
+        bar.memo = {}
+        events = []
+        for s in self.strategies:
+            event = s.on_bar(bar)
+            if event is not None:
+                events.append((s.name, event))
+        return events
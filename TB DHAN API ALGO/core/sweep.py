@@ -0,0 +1,187 @@
+"""
+Parallel parameter sweep for Strategy V25.
+
+Every V25 constant is a sweep parameter (see core.backtest_engine.V25_PARAMS):
+    macd_gap       check_entry's (macd - signal) > 0.20
+    min_atr_ratio  check_entry's atr / close >= 0.00065
+    sl_atr         initial SL at 1.0 * atr   (config.SL_MULTIPLIER in live trading)
+    tp_points      TP1 at +/-15              (config.TP_POINTS in live trading)
+    lock_points    stop locked at +/-13 after TP1
+    trail_min      trail distance max(10, 0.3 * atr) ...
+    trail_atr      ... and its ATR multiple
+
+The candle and indicator arrays are published once in a shared-memory block
+(core.shared_data) that pool workers attach to by name at startup, so tasks
+only carry config ids and values. Configs are handed out in chunks ordered
+by entry parameters, each worker caches the entry codes per (macd_gap,
+min_atr_ratio), and finished chunks are streamed into the results table (and
+an optional CSV) as they complete.
+
+Usage:
+    results = run_sweep(df, {"tp_points": [10, 15, 20], "trail_atr": [0.2, 0.3]},
+                        workers=8, out_path="sweep.csv")
+"""
+from __future__ import annotations
+
+import csv
+import itertools
+import multiprocessing as mp
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from core.backtest_engine import V25_ENTRIES, V25_PARAMS, simulate_v25, v25_inputs, v25_signals
+from core.metrics import summary_metrics
+from core.shared_data import SharedArrays, attach
+
+# Entry parameters first, so configs sharing entry codes land in the same chunks
+PARAM_ORDER = tuple(V25_ENTRIES) + tuple(k for k in V25_PARAMS if k not in V25_ENTRIES)
+METRIC_COLUMNS = ("trades", "wins", "win_rate", "net_points", "avg_points", "expectancy", "profit_factor",
+                  "max_drawdown", "mtm_max_drawdown", "time_in_market", "sharpe", "sortino")
+SHARED_COLUMNS = ("seconds", "close", "high", "low", "ema21", "atr", "macd", "macd_signal", "macd_hist")
+# Entry-code arrays kept per worker
+MAX_CACHED_SIGNALS = 32
+
+
+def expand_grid(grid: Dict[str, Iterable]) -> List[Dict[str, float]]:
+    """Cartesian product of the grid, in PARAM_ORDER; parameters left out keep their V25 value."""
+    unknown = set(grid) - set(V25_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown sweep parameters {sorted(unknown)}. Known: {list(PARAM_ORDER)}")
+    axes = []
+    for name in PARAM_ORDER:
+        values = [float(v) for v in grid.get(name, [V25_PARAMS[name]])]
+        if not values:
+            raise ValueError(f"Sweep parameter '{name}' has no values")
+        axes.append(values)
+    return [dict(zip(PARAM_ORDER, combo)) for combo in itertools.product(*axes)]
+
+
+def summarize(trades: np.ndarray, arrays: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, float]:
+    """
+    METRIC_COLUMNS for a TRADE_DTYPE array (core.metrics). The bar-based
+    metrics need the arrays the trades index into and are NaN without them.
+    """
+    if arrays is None:
+        stats = summary_metrics(trades)
+    else:
+        stats = summary_metrics(trades, arrays["close"], arrays["seconds"])
+    return {k: stats.get(k, float("nan")) for k in METRIC_COLUMNS}
+
+
+# --- worker side ---
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(name: str, start: int) -> None:
+    _WORKER.update(arrays=dict(attach(name).arrays), start=start, signals={})
+
+
+def _signals_for(arrays: Dict[str, np.ndarray], cache: Dict, params: Dict[str, float]) -> np.ndarray:
+    key = tuple(params[k] for k in V25_ENTRIES)
+    codes = cache.get(key)
+    if codes is None:
+        if len(cache) >= MAX_CACHED_SIGNALS:
+            cache.clear()
+        codes = cache[key] = v25_signals(arrays, **{k: params[k] for k in V25_ENTRIES})
+    return codes
+
+
+def _evaluate(arrays: Dict[str, np.ndarray], cache: Dict, start: int, task) -> Tuple[object, List[Dict]]:
+    """task = (tag, lo, hi, chunk): every config of the chunk over bars [lo, hi)."""
+    tag, lo, hi, chunk = task
+    view = {k: v[lo:hi] for k, v in arrays.items()}
+    first = max(start - lo, 0)
+    rows = []
+    for config_id, values in chunk:
+        params = dict(zip(PARAM_ORDER, values))
+        # entry codes come from the full series, so a window's first bars see real history
+        inputs = dict(view, signal=_signals_for(arrays, cache, params)[lo:hi])
+        trades, _ = simulate_v25(inputs, first, **{k: v for k, v in params.items() if k not in V25_ENTRIES})
+        rows.append({"config": config_id, **params, **summarize(trades, view)})
+    return tag, rows
+
+
+def _run_task(task) -> Tuple[object, List[Dict]]:
+    return _evaluate(_WORKER["arrays"], _WORKER["signals"], _WORKER["start"], task)
+
+
+# --- driver ---
+def chunk_configs(configs: List[Dict[str, float]], size: int) -> Iterator[List[Tuple[int, Tuple[float, ...]]]]:
+    """(config id, values in PARAM_ORDER) lists of up to `size` configs, the unit of work for run_tasks."""
+    for lo in range(0, len(configs), size):
+        yield [(i, tuple(configs[i][k] for k in PARAM_ORDER)) for i in range(lo, min(lo + size, len(configs)))]
+
+
+def shared_inputs(df) -> Dict[str, np.ndarray]:
+    """The SHARED_COLUMNS arrays of an indicator frame (entry codes are derived per config)."""
+    arrays = v25_inputs(df)
+    return {k: arrays[k] for k in SHARED_COLUMNS}
+
+
+def run_tasks(arrays: Dict[str, np.ndarray], tasks: Iterable, workers: int,
+              start: int = 35) -> Iterator[Tuple[object, List[Dict]]]:
+    """
+    Evaluates (tag, lo, hi, chunk) tasks, yielding (tag, rows) in completion
+    order. workers <= 1 runs in this process; otherwise the arrays are
+    published to shared memory for the pool and released afterwards.
+    """
+    if workers <= 1:
+        cache: Dict = {}
+        for task in tasks:
+            yield _evaluate(arrays, cache, start, task)
+        return
+
+    with SharedArrays.publish(arrays) as shared:
+        ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(shared.name, start)) as pool:
+            yield from pool.imap_unordered(_run_task, tasks)
+
+
+def iter_sweep(df, grid: Dict[str, Iterable], workers: Optional[int] = None,
+               chunk_size: int = 64, start: int = 35) -> Iterator[List[Dict]]:
+    """
+    Yields lists of result rows as chunks finish (completion order, not config
+    order). workers=None uses every core; workers <= 1 runs in this process.
+    """
+    configs = expand_grid(grid)
+    arrays = shared_inputs(df)
+    n = len(arrays["close"])
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, -(-len(configs) // chunk_size)))
+    tasks = ((None, 0, n, chunk) for chunk in chunk_configs(configs, chunk_size))
+    for _, rows in run_tasks(arrays, tasks, workers, start):
+        yield rows
+
+
+def run_sweep(df, grid: Dict[str, Iterable], workers: Optional[int] = None, chunk_size: int = 64,
+              out_path: Optional[str] = None, start: int = 35, progress: bool = False):
+    """
+    Runs the sweep and returns the results table (one row per config, by
+    config id). With out_path, rows are also appended to a CSV as chunks
+    complete, so a long overnight run can be inspected or salvaged midway.
+    """
+    import pandas as pd
+
+    columns = ["config", *PARAM_ORDER, *METRIC_COLUMNS]
+    total = len(expand_grid(grid))
+    rows: List[Dict] = []
+    fh = writer = None
+    if out_path:
+        fh = open(out_path, "w", newline="", encoding="utf-8")
+        writer = csv.DictWriter(fh, fieldnames=columns)
+        writer.writeheader()
+    try:
+        for chunk_rows in iter_sweep(df, grid, workers, chunk_size, start):
+            rows.extend(chunk_rows)
+            if writer is not None:
+                writer.writerows(chunk_rows)
+                fh.flush()
+            if progress:
+                print(f"[INFO] Sweep {len(rows)}/{total} configs")
+    finally:
+        if fh is not None:
+            fh.close()
+    return pd.DataFrame(rows, columns=columns).sort_values("config").reset_index(drop=True)
@@ -0,0 +1,150 @@
+"""
+Walk-forward optimization for Strategy V25.
+
+The archive is split by trading day into rolling windows: `train_days` of
+in-sample data followed by `test_days` out-of-sample, advancing by
+`step_days`. Every window's in-sample sweep goes into one process pool
+(core.sweep), the best config per window by `objective` is then traded on
+that window's out-of-sample days, and the out-of-sample trades are stitched
+into one trade list and equity curve.
+
+Indicators are computed once for the whole archive (normally through the
+IndicatorCache) and windows are views into those arrays, so overlapping
+windows share both the indicator values and their warm-up; entry codes are
+cached per worker across windows, and the out-of-sample pass computes them
+once per distinct entry config and slices every window from them. V25 is flat by 15:25, so day-aligned
+windows never cut a trade in half.
+
+Usage:
+    result = walk_forward(df, {"tp_points": [10, 15, 20]}, train_days=60, test_days=20)
+    result.windows      # chosen params + in/out-of-sample metrics per window
+    result.equity       # stitched out-of-sample equity (points) by exit time
+"""
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from core.backtest_engine import TRADE_DTYPE, V25_ENTRIES, V25_PARAMS, day_bounds, simulate_v25
+from core.sweep import (METRIC_COLUMNS, PARAM_ORDER, _signals_for, chunk_configs, expand_grid, run_tasks,
+                        shared_inputs, summarize)
+
+
+class Window(NamedTuple):
+    train_lo: int
+    train_hi: int
+    test_lo: int
+    test_hi: int
+
+
+class WalkForwardResult(NamedTuple):
+    windows: object      # DataFrame, one row per window
+    in_sample: object    # DataFrame, every (window, config) in-sample result
+    trades: np.ndarray   # TRADE_DTYPE, out-of-sample, bar indices into the full frame
+    equity: object       # Series of cumulative out-of-sample points by exit time
+
+
+def day_windows(bounds: np.ndarray, train_days: int, test_days: int,
+                step_days: Optional[int] = None) -> List[Window]:
+    """
+    Rolling windows over day_bounds(). The last test window may be shorter so
+    every day after the first training span is traded out of sample once.
+    """
+    step_days = test_days if step_days is None else step_days
+    if train_days < 1 or test_days < 1:
+        raise ValueError("train_days and test_days must be at least 1")
+    if step_days < test_days:
+        raise ValueError(f"step_days ({step_days}) < test_days ({test_days}) would trade some days twice")
+    n_days = len(bounds) - 1
+    windows = []
+    first = 0
+    while first + train_days < n_days:
+        split = first + train_days
+        end = min(split + test_days, n_days)
+        windows.append(Window(int(bounds[first]), int(bounds[split]), int(bounds[split]), int(bounds[end])))
+        first += step_days
+    return windows
+
+
+# Objectives where lower is better; every other metric is maximised
+MINIMIZE = {"max_drawdown", "mtm_max_drawdown"}
+
+
+def _pick(rows: List[Dict], objective: str, min_trades: int) -> Optional[Dict]:
+    """Best row by objective among those with enough trades; ties go to the lowest config id."""
+    eligible = [r for r in rows if r["trades"] >= min_trades and not np.isnan(r[objective])]
+    if not eligible:
+        return None
+    sign = 1 if objective in MINIMIZE else -1
+    return min(eligible, key=lambda r: (sign * r[objective], r["config"]))
+
+
+def _trade_window(arrays: Dict[str, np.ndarray], cache: Dict, params: Dict[str, float], lo: int, hi: int,
+                  start: int) -> Tuple[np.ndarray, Dict[str, float]]:
+    """
+    Trades (bar indices into the full arrays) and their metrics for bars
+    [lo, hi). Entry codes come from `cache`, shared across windows.
+    """
+    inputs = {k: v[lo:hi] for k, v in arrays.items()}
+    inputs["signal"] = _signals_for(arrays, cache, params)[lo:hi]
+    trades, _ = simulate_v25(inputs, max(start - lo, 0), **{k: v for k, v in params.items() if k not in V25_ENTRIES})
+    stats = summarize(trades, inputs)
+    trades["entry_idx"] += lo
+    trades["exit_idx"] += lo
+    return trades, stats
+
+
+def walk_forward(df, grid: Dict[str, Iterable], train_days: int = 60, test_days: int = 20,
+                 step_days: Optional[int] = None, objective: str = "net_points", min_trades: int = 20,
+                 workers: Optional[int] = None, chunk_size: int = 64, start: int = 35) -> WalkForwardResult:
+    """
+    Walk-forward run over an indicator frame (datetime, OHLC, ema21, macd*, atr).
+
+    A window whose in-sample results have no config with `min_trades` trades
+    trades the plain V25 parameters out of sample (flagged in `fallback`).
+    """
+    import pandas as pd
+
+    if objective not in METRIC_COLUMNS:
+        raise ValueError(f"Unknown objective '{objective}'. Known: {list(METRIC_COLUMNS)}")
+    configs = expand_grid(grid)
+    arrays = shared_inputs(df)
+    times = df["datetime"]
+    windows = day_windows(day_bounds(times), train_days, test_days, step_days)
+    if not windows:
+        raise ValueError(f"Not enough trading days for a {train_days}+{test_days} day window")
+
+    tasks = [(w, win.train_lo, win.train_hi, chunk)
+             for w, win in enumerate(windows) for chunk in chunk_configs(configs, chunk_size)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    per_window: Dict[int, List[Dict]] = {w: [] for w in range(len(windows))}
+    for w, rows in run_tasks(arrays, tasks, workers, start):
+        per_window[w].extend(rows)
+
+    summary, in_sample, oos = [], [], []
+    signal_cache: Dict = {}
+    stamps = times.iloc[[i for win in windows for i in (win.train_lo, win.test_lo, win.test_hi - 1)]].tolist()
+    for w, win in enumerate(windows):
+        rows = sorted(per_window[w], key=lambda r: r["config"])
+        in_sample.extend({"window": w, **r} for r in rows)
+        best = _pick(rows, objective, min_trades)
+        params = {k: best[k] for k in PARAM_ORDER} if best else dict(V25_PARAMS)
+        trades, out = _trade_window(arrays, signal_cache, params, win.test_lo, win.test_hi, start)
+        oos.append(trades)
+        summary.append({
+            "window": w,
+            "train_start": stamps[3 * w], "test_start": stamps[3 * w + 1], "test_end": stamps[3 * w + 2],
+            "config": best["config"] if best else -1, "fallback": best is None, **params,
+            f"is_{objective}": best[objective] if best else np.nan,
+            **{f"oos_{k}": v for k, v in out.items()},
+        })
+
+    trades = np.concatenate(oos) if oos else np.empty(0, dtype=TRADE_DTYPE)
+    pnl = trades["side"] * (trades["exit"] - trades["entry"])
+    equity = pd.Series(np.cumsum(pnl), index=pd.Index(times.iloc[trades["exit_idx"]].to_numpy(), name="datetime"),
+                       name="equity")
+    return WalkForwardResult(pd.DataFrame(summary), pd.DataFrame(in_sample), trades, equity)
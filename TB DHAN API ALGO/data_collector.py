@@ -14,6 +14,7 @@ import pytz
 
 from config import DHAN_CLIENT_ID, DHAN_ACCESS_TOKEN
 from order_manager import get_nifty_security_id, fetch_expiry_list, get_atm_option_symbol
+from core.cassette import install_from_env
 
 # === Config ===
 SAVE_DIR = "data/options"
@@ -23,9 +24,11 @@ DAYS_BACK = 30
 DRY_RUN = False
 
 os.makedirs(SAVE_DIR, exist_ok=True)
+install_from_env()  # DHAN_CASSETTE=<file> records/replays all API traffic
 IST = pytz.timezone("Asia/Kolkata")
 
-INTRADAY_URL = "https://api.dhan.co/v2/charts/intraday"
+API_BASE_URL = os.getenv("DHAN_API_BASE_URL", "https://api.dhan.co/v2").rstrip("/")
+INTRADAY_URL = f"{API_BASE_URL}/charts/intraday"
 HEADERS = {
     "access-token": DHAN_ACCESS_TOKEN,
     "client-id": DHAN_CLIENT_ID,
@@ -7,6 +7,7 @@ Handles resilient fetching of OHLC data for indices and options.
 from __future__ import annotations
 
 from typing import Optional, List, Union, Dict, Set
+import numpy as np
 import pandas as pd
 import pytz
 import time
@@ -15,11 +16,15 @@ from datetime import datetime
 from config import CLIENT_ID, ACCESS_TOKEN, ALIAS_MAP
 from Dhan_Tradehull import Tradehull
 from order_manager import get_atm_option_symbols
+from core.candle_data import RingBarStore, aggregate_ohlcv
+from core.indicators import IndicatorStream
 
 # --- CONFIGURATION ---
 IST = pytz.timezone("Asia/Kolkata")
 _TSL: Optional[Tradehull] = None
 _VALID_TF = {1, 2, 3, 5, 10, 15, 30, 60}
+# Live bars + V25 indicators per (index, timeframe); fixed memory for the whole session
+_BAR_STREAMS: Dict[tuple, IndicatorStream] = {}
 
 # ---------------------------
 # Client Bootstrap & Preflight
@@ -115,6 +120,60 @@ def _try_symbols(symbols: Set[str], exchange: str, interval: int) -> pd.DataFram
             print(f"[WARN] Unexpected error for {sym} ({exchange}, TF={interval}): {e}")
     return pd.DataFrame()
 
+def _index_security_id(tsl: Tradehull, base_symbol: str) -> int:
+    """
+    Resolves an index's security ID manually from the instrument master,
+    bypassing the flawed `get_intraday_data` in the SDK which causes a
+    KeyError for the 'INDEX' exchange type.
+    """
+    canonical_name = next((k for k, v in ALIAS_MAP.items() if base_symbol.upper() in v["aliases"]), None)
+    if not canonical_name:
+        raise ValueError(f"'{base_symbol}' is not a configured index.")
+
+    instrument_df = tsl.instrument_df
+    # For indices, the trading symbol in the master file is the canonical name (e.g., 'NIFTY 50')
+    # and the instrument type is 'INDEX'.
+    security_check = instrument_df[
+        (instrument_df['SEM_TRADING_SYMBOL'].str.upper() == ALIAS_MAP[canonical_name]["master_name"].upper()) &
+        (instrument_df['SEM_INSTRUMENT_NAME'].str.upper() == 'INDEX')
+    ]
+
+    if security_check.empty:
+        raise RuntimeError(f"Manual lookup failed for index '{base_symbol}'. Could not find it in the instrument master.")
+    return int(security_check.iloc[0]['SEM_SMST_SECURITY_ID'])
+
+def get_index_security_id(base_symbol: str = "NIFTY") -> int:
+    """Security ID of an index (e.g. 13 for NIFTY), for market-feed subscriptions."""
+    return _index_security_id(_ensure_client(), base_symbol)
+
+def _index_minute_data(tsl: Tradehull, base_symbol: str) -> Dict[str, list]:
+    """
+    Today's 1-minute candles for an index straight from the base API, as the
+    raw column lists ('timestamp' in epoch seconds, 'open', ..., 'volume').
+    """
+    security_id = _index_security_id(tsl, base_symbol)
+
+    # Direct API call using the resolved security ID
+    start_date = datetime.now().strftime('%Y-%m-%d')
+    end_date = start_date
+
+    # The exchange_segment for indices is INDEX
+    exchange_segment = tsl.Dhan.INDEX
+
+    # The underlying API fetches 1-minute data, which callers then resample.
+    raw_ohlc = tsl.Dhan.intraday_minute_data(
+        security_id=str(security_id),
+        exchange_segment=exchange_segment,
+        instrument_type='Index', # Instrument type for indices is 'Index'
+        from_date=start_date,
+        to_date=end_date,
+        interval=1
+    )
+
+    if raw_ohlc.get('status') != 'success' or not raw_ohlc.get('data'):
+        raise RuntimeError(f"Received empty or failed OHLC response from base API for {base_symbol}")
+    return raw_ohlc['data']
+
 def get_index_ohlc(
     base_symbol: str,
     interval: Union[int, str] = 5,
@@ -122,57 +181,18 @@ def get_index_ohlc(
 ) -> Optional[pd.DataFrame]:
     """
     Fetches OHLC data for a given index (e.g., 'NIFTY', 'BANKNIFTY').
-    This function is updated to manually resolve the security ID and call the
-    base API directly, bypassing the flawed `get_intraday_data` in the SDK
-    which causes a KeyError for the 'INDEX' exchange type.
+    Candles come from the base API via _index_minute_data, with the legacy
+    symbol lookup as a fallback.
     """
     tsl = _ensure_client()
     tf = _coerce_timeframe(interval)
     print(f"[FETCH] {base_symbol.upper()} OHLC for interval={tf}m via direct API call.")
 
     try:
-        # 1. Resolve symbol and find its security ID from the instrument master
-        canonical_name = next((k for k, v in ALIAS_MAP.items() if base_symbol.upper() in v["aliases"]), None)
-        if not canonical_name:
-            raise ValueError(f"'{base_symbol}' is not a configured index.")
-
-        instrument_df = tsl.instrument_df
-        # For indices, the trading symbol in the master file is the canonical name (e.g., 'NIFTY 50')
-        # and the instrument type is 'INDEX'.
-        security_check = instrument_df[
-            (instrument_df['SEM_TRADING_SYMBOL'].str.upper() == ALIAS_MAP[canonical_name]["master_name"].upper()) &
-            (instrument_df['SEM_INSTRUMENT_NAME'].str.upper() == 'INDEX')
-        ]
-
-        if security_check.empty:
-            raise RuntimeError(f"Manual lookup failed for index '{base_symbol}'. Could not find it in the instrument master.")
-
-        security_id = security_check.iloc[0]['SEM_SMST_SECURITY_ID']
-        
-        # 2. Direct API call using the resolved security ID
-        start_date = datetime.now().strftime('%Y-%m-%d')
-        end_date = start_date
-        
-        # The exchange_segment for indices is INDEX
-        exchange_segment = tsl.Dhan.INDEX
-        
-        # The underlying API fetches 1-minute data, which we then resample.
-        raw_ohlc = tsl.Dhan.intraday_minute_data(
-            security_id=str(security_id),
-            exchange_segment=exchange_segment,
-            instrument_type='Index', # Instrument type for indices is 'Index'
-            from_date=start_date,
-            to_date=end_date,
-            interval=1
-        )
-
-        if raw_ohlc.get('status') != 'success' or not raw_ohlc.get('data'):
-            raise RuntimeError(f"Received empty or failed OHLC response from base API for {base_symbol}")
-
-        df = pd.DataFrame(raw_ohlc['data'])
+        df = pd.DataFrame(_index_minute_data(tsl, base_symbol))
         df['timestamp'] = df['timestamp'].apply(lambda x: tsl.convert_to_date_time(x))
 
-        # 3. Resample to the desired timeframe if needed
+        # Resample to the desired timeframe if needed
         if tf > 1:
             # Define resampling rules for OHLCV data
             resample_rules = {
@@ -188,7 +208,7 @@ def get_index_ohlc(
             df = df.resample(f'{tf}T').apply(resample_rules).dropna()
             df.reset_index(inplace=True)
 
-        # 4. Normalize and return
+        # Normalize and return
         df = _normalize_ohlc_df(df)
 
         if df is None or df.empty:
@@ -207,7 +227,7 @@ def get_index_ohlc(
         print(f"[ERROR] Direct fetch for index {base_symbol} failed: {e}")
         # As a fallback, we can try the old method, though it might fail
         print("[WARN] Falling back to legacy _try_symbols method...")
-        canonical_name = next((k for k, v in ALIAS_MAP.items() if base_symbol.upper() in v["aliases"]), canonical_name)
+        canonical_name = next((k for k, v in ALIAS_MAP.items() if base_symbol.upper() in v["aliases"]), None)
         if canonical_name:
             aliases = ALIAS_MAP[canonical_name]["aliases"]
             return _try_symbols(aliases, exchange="INDEX", interval=tf)
@@ -218,6 +238,42 @@ def get_nifty_ohlc(interval: Union[int, str] = 5, lookback_bars: int = 500) -> O
     return get_index_ohlc("NIFTY", interval, lookback_bars)
 
 
+def get_index_stream(base_symbol: str = "NIFTY", interval: Union[int, str] = 5) -> IndicatorStream:
+    """
+    Refreshes and returns the live bar stream for an index.
+
+    The raw 1-minute lists from the base API are cut to the minutes at or
+    after the newest stored bar and grouped into 09:15-anchored buckets with
+    NumPy; only those bars are pushed, so a poll never builds a DataFrame.
+    The stream's RingBarStore keeps memory flat and hands out zero-copy
+    windows, e.g. stream.store.window("close", 3), with EMA21/MACD/ATR columns
+    maintained incrementally. The tick feed can push into the same stream.
+    """
+    tf = _coerce_timeframe(interval)
+    key = (base_symbol.upper(), tf)
+    stream = _BAR_STREAMS.get(key)
+    if stream is None:
+        stream = _BAR_STREAMS[key] = IndicatorStream(capacity=500)
+    try:
+        data = _index_minute_data(_ensure_client(), base_symbol)
+    except Exception as e:
+        print(f"[ERROR] Bar refresh for index {base_symbol} failed: {e}")
+        return stream
+
+    ts = np.asarray(data['timestamp'], dtype=np.int64)
+    ts_from = 0 if stream.last_start is None else int(np.searchsorted(ts, stream.last_start, side="left"))
+    cut = {col: np.asarray(data[col], dtype=float)[ts_from:] for col in ("open", "high", "low", "close", "volume")}
+    bars = aggregate_ohlcv(ts[ts_from:], cut["open"], cut["high"], cut["low"], cut["close"], cut["volume"], tf * 60)
+    for start, o, h, l, c, v in zip(*bars):
+        stream.push(int(start), o, h, l, c, v)
+    return stream
+
+
+def get_index_bar_store(base_symbol: str = "NIFTY", interval: Union[int, str] = 5) -> RingBarStore:
+    """Refreshes and returns the ring-buffer bar history (with V25 columns) for an index; see get_index_stream."""
+    return get_index_stream(base_symbol, interval).store
+
+
 def get_nifty_spot_price() -> float:
     """
     Fetches the NIFTY spot price using get_quote_data.
@@ -0,0 +1,622 @@
+"""
+Local Dhan v2 REST stand-in for offline runs and load tests.
+
+Serves the endpoints Trader-Baddu uses from the local candle archive:
+- POST /v2/charts/intraday, /v2/charts/historical
+- POST /v2/marketfeed/ltp, /v2/marketfeed/quote, /v2/marketfeed/ohlc
+- POST /v2/optionchain/expirylist, /v2/optionchain
+- POST/GET /v2/orders, GET/DELETE /v2/orders/{id}
+- GET /v2/positions, /v2/fundlimit
+- GET /v2/instruments/scrip-master.csv (the instrument master Tradehull downloads)
+
+Responses follow the Dhan v2 JSON shapes, so `dhanhq`, `Tradehull` and the raw
+`requests` calls in data_collector work unchanged once pointed at the server
+through the DHAN_API_BASE_URL environment variable; Tradehull then also takes
+its scrip master from here (DHAN_INSTRUMENT_URL overrides that URL on its own).
+
+The scrip master lists the indices plus one row per option file collected by
+data_collector (<name>_<expiry>.csv under --options), each served from its
+own candles. Without collected files it lists synthetic ATM +/- 20 strikes for
+the next expiries around the session spot.
+
+Fault injection (all deterministic for a given seed):
+- latency / jitter per request
+- error_rate  -> HTTP 500 (DH-908)
+- rate_limit_rate -> HTTP 429 (DH-904) with a Retry-After header
+
+Usage:
+    python mock_dhan_server.py --port 8765 --latency 0.05 --rate-limit-rate 0.1
+    DHAN_API_BASE_URL=http://127.0.0.1:8765/v2 python paper_trader.py
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ARCHIVE = os.path.join(SCRIPT_DIR, ".vscode", "data", "nifty_5min_last_year.csv")
+DEFAULT_OPTIONS_DIR = os.path.join(SCRIPT_DIR, "data", "options")
+NIFTY_SECURITY_ID = 13
+# Index rows of the served scrip master: (SEM_TRADING_SYMBOL, security id, underlying)
+INDEX_INSTRUMENTS = (("NIFTY 50", 13, "NIFTY"), ("NIFTY BANK", 25, "BANKNIFTY"),
+                     ("NIFTY FIN SERVICE", 27, "FINNIFTY"), ("NIFTY MID SELECT", 442, "MIDCPNIFTY"))
+OPTION_ID_BASE = 100000
+NIFTY_LOT_SIZE = 75
+DEFAULT_BALANCE = 500000.0
+STRIKE_STEP = 50
+TICK = 0.05
+
+
+def load_candle_archive(path: str, naive_tz: str = "Asia/Kolkata") -> pd.DataFrame:
+    """
+    Reads an OHLCV CSV (datetime or epoch timestamp column) into an IST-indexed
+    frame. Zone-less datetimes are read in `naive_tz` (data_collector's option
+    files are UTC).
+    """
+    df = pd.read_csv(path)
+    if "datetime" in df.columns:
+        ts = pd.to_datetime(df["datetime"], errors="coerce")
+    else:
+        ts = pd.to_datetime(df["timestamp"], unit="s", errors="coerce", utc=True)
+    if ts.dt.tz is None:
+        ts = ts.dt.tz_localize(naive_tz)
+    df = df.assign(datetime=ts.dt.tz_convert("Asia/Kolkata")).dropna(subset=["datetime"])
+    if "volume" not in df.columns:
+        df["volume"] = 0
+    return df.set_index("datetime")[["open", "high", "low", "close", "volume"]].sort_index()
+
+
+class MockDhanState:
+    """Candle archive, simulated clock, order book and fault settings shared by all handler threads."""
+
+    def __init__(
+        self,
+        archives: Optional[Dict[int, Union[str, pd.DataFrame]]] = None,
+        session_date: Optional[Union[str, date]] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 1.0,
+        access_token: Optional[str] = None,
+        balance: float = DEFAULT_BALANCE,
+        seed: int = 7,
+        options_dir: Optional[str] = DEFAULT_OPTIONS_DIR,
+    ):
+        if archives is None:
+            archives = {NIFTY_SECURITY_ID: DEFAULT_ARCHIVE}
+        self.archives: Dict[int, pd.DataFrame] = {
+            int(sid): load_candle_archive(src) if isinstance(src, str) else src
+            for sid, src in archives.items()
+        }
+        self.base_id = NIFTY_SECURITY_ID if NIFTY_SECURITY_ID in self.archives else next(iter(self.archives))
+        base = self.archives[self.base_id]
+        self.session_date = pd.Timestamp(session_date).date() if session_date else base.index[-1].date()
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.access_token = access_token
+        self.balance = balance
+
+        self._sessions: Dict[int, Tuple[pd.DataFrame, float]] = {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._order_ids = itertools.count(1)
+        self.orders: Dict[str, dict] = {}
+        self.request_count = 0
+        self.options_dir = options_dir
+        self._option_files: Dict[int, str] = {}
+        self._master_csv: Optional[bytes] = None
+
+    # --- faults ---
+    def draw_fault(self) -> Tuple[float, Optional[int]]:
+        """Returns (delay seconds, forced HTTP status or None) for the next request."""
+        with self._lock:
+            self.request_count += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return delay, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+    # --- candles ---
+    def candles(self, security_id: int) -> pd.DataFrame:
+        """Archive for a security id; unknown ids get a deterministic scaled copy of the base series."""
+        sid = int(security_id)
+        if sid not in self.archives and sid in self._option_files:
+            option = load_candle_archive(self._option_files[sid], naive_tz="UTC")
+            with self._lock:
+                self.archives.setdefault(sid, option)
+        if sid not in self.archives:
+            scale = 0.005 + (sid % 50) / 2000.0
+            synthetic = self.archives[self.base_id].copy()
+            synthetic[["open", "high", "low", "close"]] = (synthetic[["open", "high", "low", "close"]] * scale).round(2)
+            with self._lock:
+                self.archives.setdefault(sid, synthetic)
+        return self.archives[sid]
+
+    def window(self, security_id: int, from_date: str, to_date: str) -> pd.DataFrame:
+        """Bars between two dates; falls back to the simulated session day when the range is outside the archive."""
+        df = self.candles(security_id)
+        out = df.loc[str(from_date)[:10]:str(to_date)[:10]]
+        if out.empty:
+            out = self.session(security_id)
+        return out
+
+    def _session_entry(self, security_id: int) -> Tuple[pd.DataFrame, float]:
+        sid = int(security_id)
+        entry = self._sessions.get(sid)
+        if entry is None:
+            df = self.candles(sid)
+            day = str(self.session_date)
+            before = df.loc[:pd.Timestamp(day).tz_localize(df.index.tz) - pd.Timedelta(seconds=1)]
+            prev_close = float(before["close"].iloc[-1]) if not before.empty else float(df["close"].iloc[0])
+            entry = (df.loc[day:day], prev_close)
+            self._sessions[sid] = entry
+        return entry
+
+    def session(self, security_id: int) -> pd.DataFrame:
+        """Bars of the simulated session day."""
+        return self._session_entry(security_id)[0]
+
+    def previous_close(self, security_id: int) -> float:
+        return self._session_entry(security_id)[1]
+
+    def expiries(self, count: int = 4):
+        """Next weekly Thursdays from the simulated session day."""
+        d = self.session_date
+        d += timedelta(days=(3 - d.weekday()) % 7)
+        return [(d + timedelta(weeks=i)).strftime("%Y-%m-%d") for i in range(count)]
+
+    # --- instrument master ---
+    def _option_rows(self) -> pd.DataFrame:
+        """Collected option files as (symbol, expiry, strike, option_type, path); synthetic strikes without them."""
+        from core.option_backtest import option_catalog
+
+        catalog = option_catalog(self.options_dir) if self.options_dir else pd.DataFrame()
+        if len(catalog):
+            return catalog
+        session = self.session(self.base_id)
+        spot = float(session["close"].iloc[-1]) if not session.empty else self.previous_close(self.base_id)
+        atm = round(spot / STRIKE_STEP) * STRIKE_STEP
+        rows = []
+        for expiry in self.expiries():
+            stamp = pd.Timestamp(expiry)
+            for k in range(-20, 21):
+                strike = atm + k * STRIKE_STEP
+                for kind in ("CE", "PE"):
+                    rows.append({"symbol": f"NIFTY-{stamp.strftime('%b%Y')}-{strike:.0f}-{kind}",
+                                 "expiry": stamp, "strike": float(strike), "option_type": kind, "path": None})
+        return pd.DataFrame(rows)
+
+    def scrip_master(self) -> bytes:
+        """The instrument master CSV (built once): the index rows, then one row per option contract."""
+        with self._lock:
+            if self._master_csv is not None:
+                return self._master_csv
+        rows = [{"SEM_EXM_EXCH_ID": "NSE", "SEM_SEGMENT": "I", "SEM_SMST_SECURITY_ID": sid,
+                 "SEM_INSTRUMENT_NAME": "INDEX", "SEM_TRADING_SYMBOL": name, "SEM_LOT_UNITS": 1.0,
+                 "SEM_CUSTOM_SYMBOL": underlying, "SEM_EXPIRY_CODE": 0, "SEM_EXCH_INSTRUMENT_TYPE": "INDEX",
+                 "SM_SYMBOL_NAME": underlying}
+                for name, sid, underlying in INDEX_INSTRUMENTS]
+        option_files = {}
+        for i, opt in enumerate(self._option_rows().itertuples(index=False)):
+            sid = OPTION_ID_BASE + i
+            if opt.path:
+                option_files[sid] = opt.path
+            underlying = opt.symbol.split("-", 1)[0]
+            expiry = pd.Timestamp(opt.expiry)
+            rows.append({
+                "SEM_EXM_EXCH_ID": "NSE", "SEM_SEGMENT": "D", "SEM_SMST_SECURITY_ID": sid,
+                "SEM_INSTRUMENT_NAME": "OPTIDX", "SEM_EXPIRY_CODE": 0, "SEM_TRADING_SYMBOL": opt.symbol,
+                "SEM_LOT_UNITS": float(NIFTY_LOT_SIZE),
+                "SEM_CUSTOM_SYMBOL": f"{underlying} {expiry.day} {expiry.strftime('%b').upper()} {opt.strike:.0f} "
+                                     f"{'CALL' if opt.option_type == 'CE' else 'PUT'}",
+                "SEM_EXPIRY_DATE": expiry.strftime("%Y-%m-%d 14:30:00"), "SEM_STRIKE_PRICE": opt.strike,
+                "SEM_OPTION_TYPE": opt.option_type, "SEM_TICK_SIZE": TICK, "SEM_EXPIRY_FLAG": "W",
+                "SEM_EXCH_INSTRUMENT_TYPE": "OP", "SM_SYMBOL_NAME": underlying,
+            })
+        master = pd.DataFrame(rows).to_csv(index=False).encode()
+        with self._lock:
+            self._option_files.update(option_files)
+            if self._master_csv is None:
+                self._master_csv = master
+            return self._master_csv
+
+    # --- orders ---
+    def place_order(self, body: dict) -> dict:
+        sid = int(body.get("securityId", self.base_id))
+        session = self.session(sid)
+        ltp = float(session["close"].iloc[-1]) if not session.empty else self.previous_close(sid)
+        price = float(body.get("price") or 0) or ltp
+        with self._lock:
+            order_id = str(next(self._order_ids))
+            self.orders[order_id] = {
+                "dhanClientId": body.get("dhanClientId", ""),
+                "orderId": order_id,
+                "correlationId": body.get("correlationId", ""),
+                "orderStatus": "TRADED",
+                "transactionType": body.get("transactionType", "BUY"),
+                "exchangeSegment": body.get("exchangeSegment", "NSE_FNO"),
+                "productType": body.get("productType", "INTRADAY"),
+                "orderType": body.get("orderType", "MARKET"),
+                "validity": body.get("validity", "DAY"),
+                "securityId": str(sid),
+                "quantity": int(body.get("quantity", 0)),
+                "price": price,
+                "triggerPrice": float(body.get("triggerPrice") or 0),
+                "averageTradedPrice": price,
+                "filledQty": int(body.get("quantity", 0)),
+                "createTime": f"{self.session_date} {datetime.now().strftime('%H:%M:%S')}",
+                "exchangeTime": f"{self.session_date} {datetime.now().strftime('%H:%M:%S')}",
+            }
+        return {"orderId": order_id, "orderStatus": "TRANSIT"}
+
+    def cancel_order(self, order_id: str) -> Optional[dict]:
+        with self._lock:
+            order = self.orders.get(order_id)
+            if order is None:
+                return None
+            if order["orderStatus"] not in ("TRADED", "REJECTED"):
+                order["orderStatus"] = "CANCELLED"
+        return {"orderId": order_id, "orderStatus": order["orderStatus"]}
+
+    def positions(self):
+        book: Dict[Tuple[str, str], dict] = {}
+        with self._lock:
+            orders = [o for o in self.orders.values() if o["orderStatus"] == "TRADED"]
+        for o in orders:
+            key = (o["securityId"], o["productType"])
+            p = book.setdefault(key, {
+                "dhanClientId": o["dhanClientId"], "securityId": o["securityId"],
+                "exchangeSegment": o["exchangeSegment"], "productType": o["productType"],
+                "buyQty": 0, "sellQty": 0, "buyValue": 0.0, "sellValue": 0.0,
+            })
+            side = "buy" if o["transactionType"] == "BUY" else "sell"
+            p[f"{side}Qty"] += o["filledQty"]
+            p[f"{side}Value"] += o["filledQty"] * o["averageTradedPrice"]
+        out = []
+        for p in book.values():
+            ltp_df = self.session(int(p["securityId"]))
+            ltp = float(ltp_df["close"].iloc[-1]) if not ltp_df.empty else 0.0
+            net = p["buyQty"] - p["sellQty"]
+            buy_avg = p["buyValue"] / p["buyQty"] if p["buyQty"] else 0.0
+            sell_avg = p["sellValue"] / p["sellQty"] if p["sellQty"] else 0.0
+            closed = min(p["buyQty"], p["sellQty"])
+            out.append({
+                "dhanClientId": p["dhanClientId"],
+                "tradingSymbol": "",
+                "securityId": p["securityId"],
+                "positionType": "LONG" if net > 0 else ("SHORT" if net < 0 else "CLOSED"),
+                "exchangeSegment": p["exchangeSegment"],
+                "productType": p["productType"],
+                "buyAvg": round(buy_avg, 2),
+                "buyQty": p["buyQty"],
+                "sellAvg": round(sell_avg, 2),
+                "sellQty": p["sellQty"],
+                "netQty": net,
+                "realizedProfit": round(closed * (sell_avg - buy_avg), 2),
+                "unrealizedProfit": round(net * (ltp - (buy_avg if net > 0 else sell_avg)), 2) if net else 0.0,
+            })
+        return out
+
+
+def _epoch(index: pd.DatetimeIndex) -> list:
+    return (index.tz_convert("UTC").tz_localize(None).astype("datetime64[s]").astype(np.int64)).tolist()
+
+
+def _resample(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    rules = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+    return df.resample(rule, origin="start_day", offset="9h15min").agg(rules).dropna(subset=["close"])
+
+
+def _columnar(df: pd.DataFrame) -> dict:
+    return {
+        "open": df["open"].tolist(),
+        "high": df["high"].tolist(),
+        "low": df["low"].tolist(),
+        "close": df["close"].tolist(),
+        "volume": df["volume"].astype(int).tolist(),
+        "timestamp": _epoch(df.index),
+    }
+
+
+class MockDhanHandler(BaseHTTPRequestHandler):
+    """Routes Dhan v2 paths onto MockDhanState; one instance per request."""
+
+    server_version = "MockDhan/2"
+    state: MockDhanState = None  # bound by make_server()
+
+    def log_message(self, fmt, *args):  # keep load tests quiet
+        pass
+
+    # --- plumbing ---
+    def _send(self, status: int, payload, headers: Optional[dict] = None):
+        body = json.dumps(payload, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_csv(self, body: bytes):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/csv")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, code: str, error_type: str, message: str, headers: Optional[dict] = None):
+        self._send(status, {"errorType": error_type, "errorCode": code, "errorMessage": message}, headers)
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            return {}
+
+    def _dispatch(self, method: str):
+        st = self.state
+        delay, forced = st.draw_fault()
+        if delay > 0:
+            time.sleep(delay)
+        body = self._body() if method in ("POST", "PUT") else {}
+        if st.access_token and self.headers.get("access-token") != st.access_token:
+            return self._error(401, "DH-906", "Invalid_Authentication", "Invalid Token")
+        if forced == 429:
+            return self._error(429, "DH-904", "Rate_Limit", "Too many requests",
+                               headers={"Retry-After": str(st.retry_after)})
+        if forced == 500:
+            return self._error(500, "DH-908", "Internal_Server_Error", "Injected server error")
+
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path.startswith("/v2"):
+            path = path[3:]
+        for route_method, pattern, handler in ROUTES:
+            if route_method != method:
+                continue
+            match = re.fullmatch(pattern, path)
+            if match:
+                try:
+                    return handler(self, body, *match.groups())
+                except (KeyError, ValueError, TypeError) as e:
+                    return self._error(400, "DH-905", "Input_Exception", f"Bad request: {e}")
+        return self._error(404, "DH-910", "Not_Found", f"No route for {method} {self.path}")
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    # --- charts ---
+    def intraday(self, body):
+        df = self.state.window(body["securityId"], body["fromDate"], body["toDate"])
+        interval = int(body.get("interval", 1))
+        step = df.index.to_series().diff().min() if len(df) > 1 else pd.Timedelta(minutes=interval)
+        if pd.Timedelta(minutes=interval) > step:
+            df = _resample(df, f"{interval}min")
+        self._send(200, _columnar(df))
+
+    def historical(self, body):
+        df = self.state.window(body["securityId"], body["fromDate"], body["toDate"])
+        daily = df.groupby(df.index.normalize()).agg(
+            {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+        self._send(200, _columnar(daily))
+
+    # --- marketfeed ---
+    def _feed(self, body, kind: str):
+        st = self.state
+        data: Dict[str, Dict[str, dict]] = {}
+        for segment, ids in body.items():
+            seg = data.setdefault(segment, {})
+            for sid in ids:
+                session = st.session(int(sid))
+                prev_close = st.previous_close(int(sid))
+                if session.empty:
+                    ltp, day = prev_close, None
+                else:
+                    ltp = float(session["close"].iloc[-1])
+                    day = session
+                entry = {"last_price": ltp}
+                if kind in ("ohlc", "quote"):
+                    entry["ohlc"] = {
+                        "open": float(day["open"].iloc[0]) if day is not None else ltp,
+                        "close": prev_close,
+                        "high": float(day["high"].max()) if day is not None else ltp,
+                        "low": float(day["low"].min()) if day is not None else ltp,
+                    }
+                if kind == "quote":
+                    volume = int(day["volume"].sum()) if day is not None else 0
+                    entry.update({
+                        "average_price": round(float(day["close"].mean()), 2) if day is not None else ltp,
+                        "buy_quantity": 1500, "sell_quantity": 1500,
+                        "depth": {
+                            "buy": [{"quantity": 75 * (i + 1), "orders": i + 1, "price": round(ltp - TICK * (i + 1), 2)} for i in range(5)],
+                            "sell": [{"quantity": 75 * (i + 1), "orders": i + 1, "price": round(ltp + TICK * (i + 1), 2)} for i in range(5)],
+                        },
+                        "last_quantity": 75,
+                        "last_trade_time": f"{st.session_date.strftime('%d/%m/%Y')} 15:29:59",
+                        "lower_circuit_limit": round(prev_close * 0.9, 2),
+                        "upper_circuit_limit": round(prev_close * 1.1, 2),
+                        "net_change": round(ltp - prev_close, 2),
+                        "volume": volume,
+                        "oi": 0 if segment in ("IDX_I", "NSE_EQ", "BSE_EQ") else 100000 + int(sid) % 1000 * 75,
+                        "oi_day_high": 0, "oi_day_low": 0,
+                    })
+                seg[str(sid)] = entry
+        self._send(200, {"data": data, "status": "success"})
+
+    def ltp(self, body):
+        self._feed(body, "ltp")
+
+    def ohlc(self, body):
+        self._feed(body, "ohlc")
+
+    def quote(self, body):
+        self._feed(body, "quote")
+
+    # --- option chain ---
+    def expiry_list(self, body):
+        self._send(200, {"data": self.state.expiries(), "status": "success"})
+
+    def option_chain(self, body):
+        st = self.state
+        sid = int(body["UnderlyingScrip"])
+        session = st.session(sid)
+        spot = float(session["close"].iloc[-1]) if not session.empty else st.previous_close(sid)
+        expiry = pd.Timestamp(body.get("Expiry") or st.expiries()[0]).date()
+        days = max((expiry - st.session_date).days, 0) + 1
+        atm = round(spot / STRIKE_STEP) * STRIKE_STEP
+        oc = {}
+        for k in range(-20, 21):
+            strike = atm + k * STRIKE_STEP
+            time_value = max(spot * 0.0012 * np.sqrt(days) - abs(spot - strike) * 0.08, TICK * 10)
+            legs = {}
+            for kind, intrinsic in (("ce", max(spot - strike, 0.0)), ("pe", max(strike - spot, 0.0))):
+                price = round(intrinsic + time_value, 2)
+                legs[kind] = {
+                    "last_price": price, "oi": 100000, "previous_oi": 95000, "volume": 250000,
+                    "implied_volatility": 12.5, "previous_close_price": price,
+                    "top_bid_price": round(price - TICK, 2), "top_bid_quantity": 750,
+                    "top_ask_price": round(price + TICK, 2), "top_ask_quantity": 750,
+                    "greeks": {"delta": 0.5, "theta": -5.0, "gamma": 0.001, "vega": 10.0},
+                }
+            oc[f"{strike:.6f}"] = legs
+        self._send(200, {"data": {"last_price": spot, "oc": oc}, "status": "success"})
+
+    # --- instruments ---
+    def scrip_master(self, body):
+        self._send_csv(self.state.scrip_master())
+
+    # --- orders / portfolio / funds ---
+    def place_order(self, body):
+        self._send(200, self.state.place_order(body))
+
+    def order_list(self, body):
+        self._send(200, list(self.state.orders.values()))
+
+    def order_by_id(self, body, order_id):
+        order = self.state.orders.get(order_id)
+        if order is None:
+            return self._error(404, "DH-906", "Order_Error", f"Order {order_id} not found")
+        self._send(200, order)
+
+    def cancel_order(self, body, order_id):
+        result = self.state.cancel_order(order_id)
+        if result is None:
+            return self._error(404, "DH-906", "Order_Error", f"Order {order_id} not found")
+        self._send(200, result)
+
+    def positions(self, body):
+        self._send(200, self.state.positions())
+
+    def fund_limit(self, body):
+        bal = self.state.balance
+        self._send(200, {
+            "dhanClientId": "", "availabelBalance": bal, "sodLimit": bal, "collateralAmount": 0.0,
+            "receiveableAmount": 0.0, "utilizedAmount": 0.0, "blockedPayoutAmount": 0.0, "withdrawableBalance": bal,
+        })
+
+
+ROUTES = [
+    ("POST", r"/charts/intraday", MockDhanHandler.intraday),
+    ("POST", r"/charts/historical", MockDhanHandler.historical),
+    ("POST", r"/marketfeed/ltp", MockDhanHandler.ltp),
+    ("POST", r"/marketfeed/ohlc", MockDhanHandler.ohlc),
+    ("POST", r"/marketfeed/quote", MockDhanHandler.quote),
+    ("POST", r"/optionchain/expirylist", MockDhanHandler.expiry_list),
+    ("POST", r"/optionchain", MockDhanHandler.option_chain),
+    ("POST", r"/orders", MockDhanHandler.place_order),
+    ("GET", r"/orders", MockDhanHandler.order_list),
+    ("GET", r"/orders/([^/]+)", MockDhanHandler.order_by_id),
+    ("DELETE", r"/orders/([^/]+)", MockDhanHandler.cancel_order),
+    ("GET", r"/positions", MockDhanHandler.positions),
+    ("GET", r"/fundlimit", MockDhanHandler.fund_limit),
+    ("GET", r"/instruments/scrip-master\.csv", MockDhanHandler.scrip_master),
+]
+
+
+def make_server(state: Optional[MockDhanState] = None, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Builds (but does not start) a threaded mock server; port=0 picks a free port."""
+    handler = type("BoundMockDhanHandler", (MockDhanHandler,), {"state": state or MockDhanState()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(state: Optional[MockDhanState] = None, host: str = "127.0.0.1", port: int = 0):
+    """Starts the server on a daemon thread. Returns (server, base_url); call server.shutdown() when done."""
+    server = make_server(state, host, port)
+    threading.Thread(target=server.serve_forever, name="mock-dhan", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v2"
+
+
+def _parse_archives(specs):
+    archives = {}
+    for spec in specs or []:
+        sid, _, path = spec.partition("=")
+        archives[int(sid)] = path
+    return archives or None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Dhan v2 REST stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--archive", action="append", help="SECURITY_ID=path/to/candles.csv (repeatable)")
+    parser.add_argument("--options", default=DEFAULT_OPTIONS_DIR, help="collected option candles listed in the scrip master")
+    parser.add_argument("--session-date", default=None, help="Archive day served as 'today' (default: last day)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Base latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of an HTTP 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--access-token", default=None, help="Reject requests with a different access-token")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    state = MockDhanState(
+        archives=_parse_archives(args.archive), session_date=args.session_date,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after,
+        access_token=args.access_token, seed=args.seed, options_dir=args.options,
+    )
+    server = make_server(state, args.host, args.port)
+    print(f"[MOCK DHAN] Serving {len(state.archives)} archive(s), session {state.session_date} "
+          f"at http://{args.host}:{args.port}/v2")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("[MOCK DHAN] Shutting down")
+    finally:
+        server.server_close()
@@ -0,0 +1,45 @@
+# monte_carlo_trades.py
+#Trader Baddu:D
+"""
+Monte Carlo drawdown / risk-of-ruin report for a trade log.
+
+    python monte_carlo_trades.py [--log V25Trade_Log.csv] [--column PnL_INR]
+                                 [--paths 100000] [--method bootstrap|permute]
+                                 [--capital 100000] [--ruin 0.5] [--workers 8] [--seed 1]
+
+Works on V25Trade_Log.csv (backtest) and trade_logs/PaperTrade.csv (paper trader).
+"""
+import argparse
+import os
+import time
+
+from core.monte_carlo import METHODS, load_trade_pnl, run_monte_carlo
+
+DEFAULT_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "V25Trade_Log.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--log", default=DEFAULT_LOG)
+    parser.add_argument("--column", default="PnL_INR")
+    parser.add_argument("--paths", type=int, default=100_000)
+    parser.add_argument("--method", choices=METHODS, default="bootstrap")
+    parser.add_argument("--trades", type=int, default=None, help="trades per path (bootstrap only; default: log size)")
+    parser.add_argument("--capital", type=float, default=100_000.0)
+    parser.add_argument("--ruin", type=float, default=0.5, help="ruin = losing this fraction of capital")
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    pnl = load_trade_pnl(args.log, args.column)
+    print(f"[INFO] {len(pnl)} trades from {args.log}, net {pnl.sum():.2f} ({args.column})")
+    t0 = time.perf_counter()
+    result = run_monte_carlo(pnl, args.paths, args.method, args.trades, capital=args.capital,
+                             ruin_fraction=args.ruin, seed=args.seed, workers=args.workers)
+    print(f"[INFO] {args.paths} {args.method} paths in {time.perf_counter() - t0:.2f}s")
+    print(result.summary().round(2).to_string())
+    print(f"Risk of ruin (-{args.ruin:.0%} of {args.capital:.0f}): {result.risk_of_ruin:.4%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# option_backtest_v25.py
+#Trader Baddu:D
+"""
+Option-premium backtest of Strategy V25 on the collected ATM CE/PE candles.
+
+    python option_backtest_v25.py [--data path.csv] [--options data/options]
+                                  [--instruments all_instrument.csv] [--premium-sl 0.3]
+                                  [--premium-tp 0.5] [--out V25Option_Trade_Log.csv]
+
+Index trades come from the V25 engine; each is replayed on the ATM option
+of the nearest collected expiry (see core.option_backtest). The trade log
+has the PaperTrade / V25Trade_Log PnL columns, so monte_carlo_trades.py can
+read it directly.
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from config import LOT_SIZE
+from core.indicator_cache import IndicatorCache
+from core.metrics import closed_trade_stats
+from core.option_backtest import OPTIONS_DIR, run_option_backtest
+from sweep_v25 import DEFAULT_DATA
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--options", default=OPTIONS_DIR)
+    parser.add_argument("--instruments", default=None, help="instrument master csv (default: parse file names)")
+    parser.add_argument("--step", type=float, default=50.0, help="strike step for the ATM strike")
+    parser.add_argument("--max-strike-distance", type=float, default=None,
+                        help="farthest collected strike from ATM accepted (default: one step)")
+    parser.add_argument("--lot-size", type=int, default=LOT_SIZE)
+    parser.add_argument("--max-lag", default="5min", help="oldest option bar accepted for a fill")
+    parser.add_argument("--premium-sl", type=float, default=None, help="stop at this fraction below the entry premium")
+    parser.add_argument("--premium-tp", type=float, default=None, help="target at this fraction above the entry premium")
+    parser.add_argument("--out", default="V25Option_Trade_Log.csv")
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.data)
+    df["datetime"] = pd.to_datetime(df["datetime"])
+    IndicatorCache.for_archive(args.data).apply_v25(df)
+    instruments = pd.read_csv(args.instruments, low_memory=False) if args.instruments else None
+
+    t0 = time.perf_counter()
+    trades = run_option_backtest(df, args.options, instruments, lot_size=args.lot_size, step=args.step,
+                                 max_lag=args.max_lag, premium_sl=args.premium_sl, premium_tp=args.premium_tp,
+                                 max_strike_distance=args.max_strike_distance)
+    elapsed = time.perf_counter() - t0
+    trades.to_csv(args.out, index=False)
+    stats = closed_trade_stats(trades["PnL_INR"].to_numpy())
+    print(f"[INFO] {stats['trades']} option trades in {elapsed:.2f}s | win rate={stats['win_rate'] * 100:.2f}% "
+          f"net={stats['net_points']:.2f} INR max DD={stats['max_drawdown']:.2f} INR | log in {args.out}")
+    if len(trades):
+        print(trades.groupby("Reason")["PnL_INR"].agg(["count", "sum", "mean"]).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 #Trader Baddu:D
 # PAPER TRADER for Strategy V25 (TradeHull, Fusion)
+import argparse
 import os
+import re
+import threading
+import time
 import pandas as pd
 import numpy as np
 import pytz
 from datetime import datetime, time as dtime
 
-from data_fetcher import get_nifty_ohlc, get_option_ohlc, set_tsl, get_nifty_spot_price
-from strategy_v25 import EMA, MACD, ATR, check_entry
+from data_fetcher import get_index_security_id, get_index_stream, get_nifty_ohlc, get_option_ohlc, set_tsl, get_nifty_spot_price
+from strategy_v25 import generate_entry_signals
 from order_manager import get_atm_option_symbols
 from config import LOT_SIZE, CLIENT_ID, ACCESS_TOKEN
 from Dhan_Tradehull import Tradehull
+from core.candle_data import BarAggregator
+from core.cassette import install_from_env
+from core.indicator_cache import CACHE_DIRNAME, IndicatorCache
+from core.indicators import apply_v25_indicators
+from core.live_session import LiveV25Session
+from core.market_feed import DhanFeedSource, StreamingBarFeed
 
 # ----------------------
 # Global configuration
@@ -19,11 +29,19 @@ DEBUG = os.getenv("DEBUG", "0") == "1"
 IST = pytz.timezone("Asia/Kolkata")
 SESSION_START = dtime(9, 30)
 SESSION_END = dtime(15, 25)
+MARKET_CLOSE = dtime(15, 30)
 PAPER_LOG_FILE = "trade_logs/PaperTrade.csv"
+# Indicator columns cached beside the option candle archive written by data_collector
+INDICATOR_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "options", CACHE_DIRNAME)
+
+def indicator_cache(symbol: str) -> IndicatorCache:
+    """Cache for one contract; a root per symbol keeps the CE and PE entries from evicting each other."""
+    return IndicatorCache(os.path.join(INDICATOR_CACHE_DIR, re.sub(r"[^\w.-]", "_", symbol)))
 
 # ----------------------
 # Bootstrap Tradehull with preflight (fixes Invalid Token DH-906 early)
 # ----------------------
+install_from_env()  # DHAN_CASSETTE=<file> records/replays all API traffic
 try:
     print(f"[DEBUG] Initializing Tradehull with CLIENT_ID: {CLIENT_ID}, ACCESS_TOKEN: {ACCESS_TOKEN[:5]}...hidden")
     tsl = Tradehull(ClientCode=CLIENT_ID, token_id=ACCESS_TOKEN)
@@ -76,17 +94,14 @@ def print_summary():
 # ----------------------
 # Helper: add indicators safely
 # ----------------------
-def add_indicators(df: pd.DataFrame) -> pd.DataFrame:
-    """Compute EMA21, MACD, ATR with safe fallbacks."""
-    df = df.copy()
-    df["ema21"] = EMA(df["close"], 21)
-    macd_tuple = MACD(df["close"])
-    if isinstance(macd_tuple, tuple) and len(macd_tuple) >= 3:
-        df["macd"], df["macd_signal"], df["macd_hist"] = macd_tuple
-    else:
-        df["macd"] = df["macd_signal"] = df["macd_hist"] = np.nan
-    df["atr"] = ATR(df)
-    return df
+def add_indicators(df: pd.DataFrame, cache: IndicatorCache = None) -> pd.DataFrame:
+    """
+    Compute EMA21, MACD, ATR with the array kernels in core.indicators.
+    Pass an IndicatorCache to reuse/extend columns persisted across runs.
+    """
+    if cache is not None:
+        return cache.apply_v25(df.copy())
+    return apply_v25_indicators(df.copy())
 
 # ----------------------
 # Main
@@ -146,8 +161,8 @@ def main():
     pe_ohlc = pe_ohlc.dropna(subset=["datetime"]).sort_values("datetime").reset_index(drop=True)
 
     # 4) Add indicators
-    ce_ohlc = add_indicators(ce_ohlc)
-    pe_ohlc = add_indicators(pe_ohlc)
+    ce_ohlc = add_indicators(ce_ohlc, cache=indicator_cache(str(ce_symbol)))
+    pe_ohlc = add_indicators(pe_ohlc, cache=indicator_cache(str(pe_symbol)))
 
     # 5) Filter to session window
     ce_ohlc = ce_ohlc[(ce_ohlc["datetime"].dt.time >= SESSION_START) & (ce_ohlc["datetime"].dt.time <= SESSION_END)].copy().reset_index(drop=True)
@@ -161,12 +176,13 @@ def main():
     for side, opt_df in [("BUY_CE", ce_ohlc), ("SELL_PE", pe_ohlc)]:
         open_trade = None
         entry_idx = None
+        signals = generate_entry_signals(opt_df).to_numpy()  # check_entry for every bar, one pass
 
         for i in range(2, len(opt_df)):
             row = opt_df.iloc[i]
             dt = row["datetime"]
             close = float(row["close"])
-            signal = check_entry(opt_df, i)
+            signal = signals[i]
 
             # Entry logic
             if open_trade is None and signal == side:
@@ -221,5 +237,63 @@ def main():
 
     print_summary()
 
+# ----------------------
+# Live: V25 on the NIFTY bar store, evaluated at each bar close
+# ----------------------
+def _seconds_until(t: dtime) -> float:
+    now = datetime.now(IST)
+    return max((now.replace(hour=t.hour, minute=t.minute, second=0, microsecond=0) - now).total_seconds(), 0.0)
+
+def run_live(interval: int = 5, poll_seconds: float = 5.0, feed: str = "ticks"):
+    """
+    Paper trades V25 on live NIFTY index bars. The REST history warms up the
+    index bar store (data_fetcher.get_index_stream), then bars arrive either
+
+    - feed="ticks": from the Dhan market feed through a BarAggregator; the
+      session evaluates each bar inside the bar-close callback, at the bucket
+      boundary, or
+    - feed="rest": by polling, which appends only the new minutes; each bar
+      is evaluated on the first poll after it closes.
+    """
+    print(f"[INFO] Starting LIVE PAPER TRADER for Strategy V25 on NIFTY {interval}m ({feed} feed)")
+    stream = get_index_stream("NIFTY", interval)
+    session = LiveV25Session(stream, on_exit=log_paper_trade)
+    session.skip_history(forming=True)
+    print(f"[INFO] Warm-up: {len(stream.store)} bars; trading until {MARKET_CLOSE}")
+    try:
+        if feed == "ticks":
+            from dhanhq import marketfeed
+
+            source = DhanFeedSource(CLIENT_ID, ACCESS_TOKEN, [(marketfeed.IDX, get_index_security_id("NIFTY"))],
+                                    request_code=marketfeed.Ticker)
+            bar_feed = StreamingBarFeed(source, BarAggregator((interval * 60,), on_bar_close=session.on_bar_close))
+            closer = threading.Timer(_seconds_until(MARKET_CLOSE) + bar_feed.grace, bar_feed.stop)
+            closer.daemon = True
+            closer.start()
+            try:
+                bar_feed.run()  # closes the open bar on exit
+            except Exception as e:
+                print(f"[WARN] Market feed ended: {e}")
+        else:
+            while datetime.now(IST).time() <= MARKET_CLOSE:
+                time.sleep(poll_seconds)
+                get_index_stream("NIFTY", interval)
+                session.update(forming=True)
+            get_index_stream("NIFTY", interval)
+            session.update()  # market closed: the last bar is final
+    except KeyboardInterrupt:
+        print("[INFO] Stopped by user")
+    print_summary()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Paper trade Strategy V25 on today's ATM options, or live on NIFTY bars")
+    parser.add_argument("--live", action="store_true", help="trade live NIFTY index bars instead of replaying option candles")
+    parser.add_argument("--interval", type=int, default=5, help="bar size in minutes for --live")
+    parser.add_argument("--feed", choices=("ticks", "rest"), default="ticks",
+                        help="--live bar source: market-feed ticks (bar-close events) or REST polling")
+    parser.add_argument("--poll", type=float, default=5.0, help="seconds between REST polls for --live --feed rest")
+    args = parser.parse_args()
+    if args.live:
+        run_live(args.interval, args.poll, args.feed)
+    else:
+        main()
\ No newline at end of file
@@ -1,4 +1,13 @@
 # === Entry Signal Function ===
+def _record_entry(side, row, macd, signal, hist, atr):
+    recorder = get_recorder()
+    if recorder.enabled(INFO):
+        recorder.emit(INFO, "entry_signal",
+                      f"[ENTRY SIGNAL] {side} {row['datetime']} | macd={macd:.3f} signal={signal:.3f} hist={hist:.3f} atr={atr:.2f}",
+                      time=row['datetime'], side=side, price=float(row['close']), macd=macd, signal=signal, hist=hist, atr=atr)
+        if recorder.echo:
+            recorder.flush()  # a live signal is printed when it fires, as the former print() did
+
 def check_entry(df, i):
     """
     df: DataFrame with ['datetime','open','high','low','close','ema21','macd','macd_signal','macd_hist','atr']
@@ -33,7 +42,7 @@ def check_entry(df, i):
             (atr / close) >= 0.00065
 
         ):
-            print(f"[ENTRY SIGNAL] BUY_CE {row['datetime']} | macd={macd:.3f} signal={signal:.3f} hist={hist:.3f} atr={atr:.2f}")
+            _record_entry("BUY_CE", row, macd, signal, hist, atr)
             return "BUY_CE"
         # SELL_PE
         hist_falling = hist < prev1 < prev2
@@ -43,14 +52,67 @@ def check_entry(df, i):
             close < ema21 and
             (atr / close) >= 0.00065
         ):
-            print(f"[ENTRY SIGNAL] SELL_PE {row['datetime']} | macd={macd:.3f} signal={signal:.3f} hist={hist:.3f} atr={atr:.2f}")
+            _record_entry("SELL_PE", row, macd, signal, hist, atr)
             return "SELL_PE"
     return None
+
+# === Vectorized Entry Signals ===
+SIGNAL_NONE, SIGNAL_BUY_CE, SIGNAL_SELL_PE = 0, 1, -1
+SIGNAL_LABELS = {SIGNAL_BUY_CE: "BUY_CE", SIGNAL_SELL_PE: "SELL_PE"}
+
+def session_seconds(dt):
+    """Seconds (with fractions) since local midnight for a datetime Series, as float64."""
+    dt = pd.to_datetime(dt)
+    return ((dt - dt.dt.normalize()) / pd.Timedelta(seconds=1)).to_numpy(dtype=np.float64)
+
+def entry_signal_codes(seconds, close, ema21, atr, macd, macd_signal, macd_hist,
+                       macd_gap=0.20, min_atr_ratio=0.00065):
+    """
+    check_entry for every bar at once, on arrays. Returns int8 codes
+    (SIGNAL_BUY_CE / SIGNAL_SELL_PE / SIGNAL_NONE). Bar 0 never signals and
+    bar 1 compares against the last bar as prev2, exactly like check_entry's
+    iloc[i-2] does. macd_gap / min_atr_ratio are check_entry's 0.20 and
+    0.00065 thresholds, exposed for parameter sweeps.
+    """
+    hist = np.asarray(macd_hist, dtype=np.float64)
+    n = len(hist)
+    codes = np.zeros(n, dtype=np.int8)
+    if n < 2:
+        return codes
+    prev1 = np.roll(hist, 1)
+    prev2 = np.roll(hist, 2)
+    close = np.asarray(close, dtype=np.float64)
+    spread = np.asarray(macd, dtype=np.float64) - np.asarray(macd_signal, dtype=np.float64)
+    ema21 = np.asarray(ema21, dtype=np.float64)
+    vol_ok = (np.asarray(atr, dtype=np.float64) / close) >= min_atr_ratio
+    window = (seconds >= 9 * 3600 + 30 * 60) & (seconds <= 15 * 3600 + 15 * 60)
+    buy = window & (hist > prev1) & (prev1 > prev2) & (spread > macd_gap) & (close > ema21) & vol_ok
+    sell = window & ~buy & (hist < prev1) & (prev1 < prev2) & (spread < -macd_gap) & (close < ema21) & vol_ok
+    codes[buy] = SIGNAL_BUY_CE
+    codes[sell] = SIGNAL_SELL_PE
+    codes[0] = SIGNAL_NONE
+    return codes
+
+def generate_entry_signals(df):
+    """
+    Frame-level check_entry: a Series aligned with df holding "BUY_CE",
+    "SELL_PE" or None for every bar, computed in one pass and without printing.
+    """
+    codes = entry_signal_codes(session_seconds(df['datetime']), df['close'], df['ema21'], df['atr'],
+                               df['macd'], df['macd_signal'], df['macd_hist'])
+    labels = np.full(len(codes), None, dtype=object)
+    labels[codes == SIGNAL_BUY_CE] = "BUY_CE"
+    labels[codes == SIGNAL_SELL_PE] = "SELL_PE"
+    return pd.Series(labels, index=df.index, name="signal", dtype=object)
 #Trader Baddu:D
 import pandas as pd
 import numpy as np
 from datetime import time
 
+from core.events import INFO, get_recorder
+from core.indicator_cache import IndicatorCache
+from core.indicators import apply_v25_indicators
+
 # === Helper Functions ===
 def EMA(series, period):
     return series.ewm(span=period, adjust=False).mean()
@@ -72,7 +134,21 @@ def MACD(series, fast=12, slow=26, signal=9):
     return macd, macd_signal, macd_hist
 
 # === Backtest Engine ===
-def backtest(data):
+def backtest(data, recorder=None):
+    """
+    V25 backtest on an indicator frame. Runs on the array engine in
+    core.backtest_engine; same trades as backtest_loop. Its event lines go to
+    `recorder` (default: core.events.get_recorder(), which echoes them).
+    """
+    from core.backtest_engine import run_v25_backtest
+    recorder = get_recorder() if recorder is None else recorder
+    trades = run_v25_backtest(data, start=35, recorder=recorder)
+    recorder.flush()
+    return trades
+
+
+def backtest_loop(data):
+    """Original row-by-row implementation, kept as the reference for the array engine."""
     trades = []
     position = None
 
@@ -202,10 +278,33 @@ def backtest(data):
 
 
 
-def run_backtest(data_path="nifty_5min_last_month.csv"):
+def run_backtest(data_path="nifty_5min_last_month.csv", use_cache=True, workers=1, recorder=None, minute_path=None):
+    """
+    workers != 1 splits the simulation by trading day over a process pool (None = all cores); same trades.
+    minute_path (a 1-minute candle csv) resolves stops and TP1 inside each 5-minute bar (core.intrabar);
+    it runs in one process and records entries and exits only.
+    """
+    if minute_path and workers != 1:
+        raise ValueError("minute_path runs in a single process; use workers=1")
     df = pd.read_csv(data_path)
     df['datetime'] = pd.to_datetime(df['datetime'])
-    df['ema21'] = EMA(df['close'], 21)
-    df['macd'], df['macd_signal'], df['macd_hist'] = MACD(df['close'])
-    df['atr'] = ATR(df)
-    return backtest(df)
\ No newline at end of file
+    # same values as EMA/MACD/ATR above; cached next to the csv and extended as it grows
+    if use_cache:
+        IndicatorCache.for_archive(data_path).apply_v25(df)
+    else:
+        apply_v25_indicators(df)
+    if minute_path:
+        from core.intrabar import run_v25_intrabar
+        minute_df = pd.read_csv(minute_path)
+        minute_df['datetime'] = pd.to_datetime(minute_df['datetime'])
+        recorder = get_recorder() if recorder is None else recorder
+        trades = run_v25_intrabar(df, minute_df, start=35, recorder=recorder)
+        recorder.flush()
+        return trades
+    if workers != 1:
+        from core.parallel_backtest import run_v25_by_day
+        recorder = get_recorder() if recorder is None else recorder
+        trades = run_v25_by_day(df, workers=workers, start=35, recorder=recorder)
+        recorder.flush()
+        return trades
+    return backtest(df, recorder)
\ No newline at end of file
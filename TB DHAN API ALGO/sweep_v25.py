@@ -0,0 +1,58 @@
+# sweep_v25.py
+#Trader Baddu:D
+"""
+Parameter sweep for Strategy V25 over a candle archive.
+
+    python sweep_v25.py [--data path.csv] [--workers 8] [--out sweep.csv]
+                        [--tp-points 10,15,20] [--sl-atr 1.0,1.5] [--trail-atr 0.2,0.3] ...
+
+Each --<param> takes a comma-separated list of values (see core.sweep for
+the parameters); parameters left out keep the V25 value. Results are
+streamed to --out as they complete and the top configs are printed.
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from core.backtest_engine import HAVE_NUMBA, V25_PARAMS
+from core.indicator_cache import IndicatorCache
+from core.sweep import expand_grid, run_sweep
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".vscode", "data", "nifty_5min_last_year.csv")
+
+
+def _values(text):
+    return [float(v) for v in text.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--out", default="v25_sweep.csv")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--sort", default="net_points")
+    for name, default in V25_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=_values, default=None, help=f"default: {default}")
+    args = parser.parse_args()
+
+    grid = {name: getattr(args, name) for name in V25_PARAMS if getattr(args, name) is not None}
+    df = pd.read_csv(args.data)
+    df["datetime"] = pd.to_datetime(df["datetime"])
+    IndicatorCache.for_archive(args.data).apply_v25(df)
+
+    total = len(expand_grid(grid))
+    print(f"[INFO] {len(df)} bars, {total} configs, numba={'yes' if HAVE_NUMBA else 'no'}")
+    t0 = time.perf_counter()
+    results = run_sweep(df, grid, workers=args.workers, chunk_size=args.chunk_size, out_path=args.out,
+                        progress=True)
+    elapsed = time.perf_counter() - t0
+    print(f"[INFO] {total} configs in {elapsed:.2f}s ({total / elapsed:.0f}/s), results in {args.out}")
+    print(results.sort_values(args.sort, ascending=False).head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import pandas as pd
+
+import numpy as np
+
+from core.candle_data import BarAggregator, StreamingHeikinAshi, bucket_start, heikin_ashi_arrays
+from core.market_feed import SocketTickSource, StreamingBarFeed, serve_ticks, ticks_from_bars
+
+
+def _ts(s):
+    return pd.Timestamp(s, tz="Asia/Kolkata").timestamp()
+
+
+def test_buckets_are_anchored_at_session_open():
+    assert bucket_start(_ts("2025-09-12 09:19:59"), 300) == _ts("2025-09-12 09:15:00")
+    assert bucket_start(_ts("2025-09-12 09:20:00"), 300) == _ts("2025-09-12 09:20:00")
+    assert bucket_start(_ts("2025-09-12 10:00:30"), 900) == _ts("2025-09-12 10:00:00")
+
+
+def test_bar_close_event_on_first_tick_of_next_bucket():
+    closed = []
+    agg = BarAggregator(timeframes=(60, 300), on_bar_close=closed.append)
+    agg.on_tick(13, 100.0, _ts("2025-09-12 09:15:01"), 5)
+    agg.on_tick(13, 103.0, _ts("2025-09-12 09:15:20"), 5)
+    agg.on_tick(13, 99.0, _ts("2025-09-12 09:15:40"), 5)
+    assert closed == []
+    agg.on_tick(13, 101.0, _ts("2025-09-12 09:16:00"), 1)
+    assert len(closed) == 1
+    bar = closed[0]
+    assert (bar.timeframe, bar.open, bar.high, bar.low, bar.close, bar.volume) == (60, 100.0, 103.0, 99.0, 99.0, 15)
+    # a late tick is dropped for the closed 1m bucket but still lands in the open 5m one
+    agg.on_tick(13, 98.0, _ts("2025-09-12 09:15:59"))
+    agg.flush(now=_ts("2025-09-12 09:20:00"))
+    assert [(b.timeframe, b.start) for b in closed].count((60, int(_ts("2025-09-12 09:15")))) == 1
+    five = [b for b in closed if b.timeframe == 300][0]
+    assert (five.high, five.low, five.close, five.volume) == (103.0, 98.0, 98.0, 16)
+
+
+def test_socket_stand_in_rebuilds_source_bars():
+    idx = pd.date_range("2025-09-12 09:15", periods=6, freq="5min", tz="Asia/Kolkata")
+    src = pd.DataFrame({"datetime": idx, "open": [10, 11, 12, 13, 14, 15.0], "high": [12, 13, 14, 15, 16, 17.0],
+                        "low": [9, 10, 11, 12, 13, 14.0], "close": [11, 12, 13, 14, 15, 16.0], "volume": [4, 8, 4, 8, 4, 8.0]})
+    server, port = serve_ticks(list(ticks_from_bars(src, 13)))
+    bars = []
+    StreamingBarFeed(SocketTickSource("127.0.0.1", port), BarAggregator((300,), bars.append), flush_interval=0).run()
+    got = pd.DataFrame(bars)
+    assert got["start"].tolist() == [int(t.timestamp()) for t in idx]
+    for col in ("open", "high", "low", "close", "volume"):
+        assert got[col].tolist() == src[col].tolist()
+
+
+def test_ring_store_windows_are_zero_copy_and_bounded():
+    import numpy as np
+    from core.candle_data import RingBarStore
+
+    store = RingBarStore(capacity=4, extra_fields=("ema21",))
+    for i in range(10):
+        store.append(i * 300, i, i + 1, i - 1, i + 0.5, 10)
+        store.set_last(ema21=i * 2.0)
+    assert len(store) == 4 and store.total == 10
+    assert store.window("open").tolist() == [6, 7, 8, 9]
+    assert store.window("ema21", 2).tolist() == [16.0, 18.0]
+    assert store.last("close", back=1) == 8.5
+    assert np.shares_memory(store.window("close"), store._cols["close"])
+    assert store.to_frame()["open"].tolist() == [6, 7, 8, 9]
+
+
+def _ha_loop(df):
+    # the per-row recursion Tradehull.heikin_ashi used before vectorization
+    ha_close = (df['open'] + df['high'] + df['low'] + df['close']) / 4
+    ha_open, ha_high, ha_low = [df['open'].iloc[0]], [df['high'].iloc[0]], [df['low'].iloc[0]]
+    for i in range(1, len(df)):
+        ha_open.append((ha_open[-1] + ha_close.iloc[i - 1]) / 2)
+        ha_high.append(max(df['high'].iloc[i], ha_open[-1], ha_close.iloc[i]))
+        ha_low.append(min(df['low'].iloc[i], ha_open[-1], ha_close.iloc[i]))
+    return ha_open, ha_high, ha_low, ha_close.tolist()
+
+
+def test_heikin_ashi_vectorized_and_streaming_match_loop():
+    rng = np.random.default_rng(3)
+    close = 25000 + np.cumsum(rng.normal(0, 7, 500))
+    df = pd.DataFrame({"open": close + rng.normal(0, 3, 500), "close": close})
+    df["high"] = df[["open", "close"]].max(axis=1) + rng.uniform(0, 5, 500)
+    df["low"] = df[["open", "close"]].min(axis=1) - rng.uniform(0, 5, 500)
+    expected = _ha_loop(df)
+    got = heikin_ashi_arrays(df["open"], df["high"], df["low"], df["close"])
+    for g, e in zip(got, expected):
+        assert np.array_equal(g, np.array(e))
+    ha = StreamingHeikinAshi()
+    for i, row in enumerate(df[["open", "high", "low", "close"]].itertuples(index=False)):
+        if i == 250:
+            ha = StreamingHeikinAshi.from_state(ha.to_state())
+        assert ha.update(*row) == tuple(col[i] for col in expected)
+
+
+def test_heikin_ashi_nan_bars_agree_between_array_and_streaming():
+    o = np.array([10.0, 11.0, np.nan, 12.0, 13.0, 12.5])
+    h = np.array([11.0, np.nan, 12.5, 13.0, 14.0, 13.0])
+    l = np.array([9.5, 10.5, 11.0, np.nan, 12.0, 12.0])
+    c = np.array([10.5, 11.5, 12.0, 12.5, np.nan, 12.8])
+    got = np.column_stack(heikin_ashi_arrays(o, h, l, c))
+    ha = StreamingHeikinAshi()
+    streamed = np.array([ha.update(*bar) for bar in zip(o, h, l, c)])
+    np.testing.assert_array_equal(streamed, got)
+    # NaN operands are skipped, not propagated, by the high / low
+    assert not np.isnan(got[3:, 1]).any() and not np.isnan(got[4:, 2]).any()
@@ -0,0 +1,80 @@
+import os
+
+import pandas as pd
+import pytest
+import requests
+
+from core.cassette import Cassette, CassetteMiss
+from mock_dhan_server import MockDhanState, start_in_thread
+from tests.test_mock_server import _archive
+
+
+def test_record_then_replay_without_network(tmp_path):
+    path = str(tmp_path / "day.jsonl.gz")
+    srv, base = start_in_thread(MockDhanState(archives={13: _archive()}))
+    try:
+        with Cassette(path, mode="record") as cas:
+            live = requests.post(f"{base}/marketfeed/ltp", json={"IDX_I": [13]}).json()
+            funds = requests.get(f"{base}/fundlimit").json()
+        assert cas.recorded == 2
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+    with Cassette(path, mode="replay") as cas:
+        assert requests.post(f"{base}/marketfeed/ltp", json={"IDX_I": [13]}).json() == live
+        assert requests.get(f"{base}/fundlimit").json() == funds
+        with pytest.raises(CassetteMiss):
+            requests.get(f"{base}/positions")
+    assert (cas.hits, cas.misses) == (2, 1)
+
+
+def test_loose_replay_tolerates_changed_payload(tmp_path):
+    path = str(tmp_path / "day.jsonl.gz")
+    srv, base = start_in_thread(MockDhanState(archives={13: _archive()}))
+    body = {"securityId": "13", "exchangeSegment": "IDX_I", "instrument": "INDEX", "interval": 1}
+    try:
+        with Cassette(path, mode="record"):
+            recorded = requests.post(f"{base}/charts/intraday", json={**body, "fromDate": "2025-09-12", "toDate": "2025-09-12"}).json()
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+    replay_body = {**body, "fromDate": "2026-01-01", "toDate": "2026-01-01"}
+    with Cassette(path, mode="replay", strict=True):
+        with pytest.raises(CassetteMiss):
+            requests.post(f"{base}/charts/intraday", json=replay_body)
+    with Cassette(path, mode="replay"):
+        assert requests.post(f"{base}/charts/intraday", json=replay_body).json() == recorded
+
+
+def test_replayed_login_opens_no_socket(tmp_path, monkeypatch):
+    import socket
+
+    from Dhan_Tradehull import Tradehull
+
+    path = str(tmp_path / "day.jsonl.gz")
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("Dependencies")
+    srv, base = start_in_thread(MockDhanState(archives={13: _archive()}, options_dir=None))
+    monkeypatch.setenv("DHAN_API_BASE_URL", base)
+    monkeypatch.setenv("DHAN_CASSETTE", path)
+    monkeypatch.delenv("DHAN_INSTRUMENT_URL", raising=False)
+    try:
+        with Cassette(path, mode="record") as cas:
+            recorded = Tradehull("client", "token")
+        assert cas.recorded == 2  # the scrip master and the startup daily candles
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("replay opened a socket")
+
+    monkeypatch.setattr(socket.socket, "connect", no_network)
+    monkeypatch.setattr(socket, "create_connection", no_network)
+    with Cassette(path, mode="replay") as cas:
+        replayed = Tradehull("client", "token")
+    assert (cas.hits, cas.misses) == (2, 0)
+    pd.testing.assert_frame_equal(replayed.instrument_df, recorded.instrument_df)
+    assert replayed.start_date == recorded.start_date
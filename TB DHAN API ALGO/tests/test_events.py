@@ -0,0 +1,63 @@
+import io
+from contextlib import redirect_stdout
+
+import pytest
+
+from core.backtest_engine import run_v25_backtest
+from core.events import DEBUG, INFO, OFF, EventRecorder, get_recorder
+from strategy_v25 import check_entry, generate_entry_signals
+from tests.test_strategy_v25 import _session_frame
+
+
+def test_recorder_levels_buffering_and_file_sink(tmp_path):
+    log = tmp_path / "events.log"
+    rec = EventRecorder(level=INFO, echo=True, path=str(log), buffer_size=3)
+    out = io.StringIO()
+    with redirect_stdout(out):
+        rec.emit(DEBUG, "trail", "dropped", sl=1.0)
+        rec.emit(INFO, "exit", "a", price=1.0)
+        rec.emit(INFO, "exit", "b", price=2.0)
+        assert out.getvalue() == ""  # buffered
+        rec.emit(INFO, "entry_signal", "c", time=7, side="BUY_CE")
+        assert out.getvalue() == "a\nb\nc\n"
+        rec.emit(INFO, "exit", "d", price=3.0)
+        rec.flush()
+    assert out.getvalue() == log.read_text() == "a\nb\nc\nd\n"
+    assert rec.frame("exit")["price"].tolist() == [1.0, 2.0, 3.0]
+    assert list(rec.frame("entry_signal").columns) == ["time", "level", "kind", "side"]
+
+    with pytest.raises(ValueError):
+        EventRecorder(level="LOUD")
+
+
+def test_engine_events_are_columnar_and_skipped_when_disabled():
+    df = _session_frame(days=20, seed=5)
+    full = EventRecorder(level=DEBUG)
+    trades = run_v25_backtest(df, recorder=full)
+    exits = full.frame("exit")
+    assert exits["reason"].tolist() == [t[5] for t in trades]
+    assert exits["price"].tolist() == [t[4] for t in trades]
+    assert set(full.frame()["kind"]) >= {"entry_signal", "tp1", "trail", "exit"}
+
+    info = EventRecorder(level=INFO)
+    assert run_v25_backtest(df, recorder=info) == trades
+    assert info.lines() == full.lines(INFO)
+    assert set(info.frame()["kind"]) == {"entry_signal", "exit"}
+
+    off = EventRecorder(level=OFF)
+    assert run_v25_backtest(df, recorder=off) == trades
+    assert len(off) == 0
+
+
+def test_direct_check_entry_prints_each_signal_when_it_fires():
+    df = _session_frame(days=3, seed=7)
+    bars = [i for i, s in enumerate(generate_entry_signals(df)) if s]
+    assert bars
+    out = io.StringIO()
+    with redirect_stdout(out):
+        for i in bars:
+            before = out.getvalue().count("\n")
+            check_entry(df, i)
+            assert out.getvalue().count("\n") == before + 1  # not held in the default recorder's buffer
+    assert get_recorder()._pending == 0
+    assert all(line.startswith("[ENTRY SIGNAL]") for line in out.getvalue().splitlines())
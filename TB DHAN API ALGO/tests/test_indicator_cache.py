@@ -0,0 +1,92 @@
+import io
+import json
+import multiprocessing as mp
+from contextlib import redirect_stdout
+
+import numpy as np
+
+from core.indicator_cache import IndicatorCache
+from core.indicators import V25_COLUMNS, apply_v25_indicators
+from strategy_v25 import run_backtest
+from tests.test_indicators import _frame
+
+
+def _same(a, b):
+    return all(np.array_equal(a[c].to_numpy(), b[c].to_numpy(), equal_nan=True) for c in V25_COLUMNS)
+
+
+def test_cache_hits_and_extends_appended_bars(tmp_path):
+    df = _frame(600)
+    ref = apply_v25_indicators(df.copy())
+    cache = IndicatorCache(str(tmp_path))
+
+    assert _same(cache.apply_v25(df.iloc[:500].copy()), ref.iloc[:500])
+    assert (cache.hits, cache.extensions, cache.misses) == (0, 0, 3)
+    assert _same(cache.apply_v25(df.iloc[:500].copy()), ref.iloc[:500])
+    assert cache.hits == 3
+
+    # a fresh instance (new process) extends the persisted prefix instead of recomputing
+    reopened = IndicatorCache(str(tmp_path))
+    assert _same(reopened.apply_v25(df.copy()), ref)
+    assert (reopened.extensions, reopened.misses) == (3, 0)
+
+    # different bars with the same length are a miss, not a stale hit
+    changed = df.copy()
+    changed.loc[10, "close"] += 1.0
+    assert _same(reopened.apply_v25(changed.copy()), apply_v25_indicators(changed.copy()))
+    assert reopened.misses == 3
+
+
+def test_miss_takes_state_from_the_compute_pass(tmp_path, monkeypatch):
+    from core import indicators
+
+    df = _frame(600)
+    ref = apply_v25_indicators(df.copy())
+    replays = []
+    for cls in (indicators.StreamingATR, indicators.StreamingMACD):
+        original = cls.from_history.__func__
+
+        def recorded(klass, *args, _original=original):
+            # (class, bars, whether the EMA arrays came precomputed)
+            replays.append((klass.__name__, len(args[0]), len(args) == 7))
+            return _original(klass, *args)
+
+        monkeypatch.setattr(cls, "from_history", classmethod(recorded))
+
+    cache = IndicatorCache(str(tmp_path))
+    assert _same(cache.apply_v25(df.iloc[:500].copy()), ref.iloc[:500])
+    # MACD reuses its EMA arrays; without numba the ATR state waits for the first extension
+    assert replays == [("StreamingMACD", 500, True)]
+    replays.clear()
+    assert _same(cache.apply_v25(df.copy()), ref)
+    assert cache.extensions == 3
+    assert replays == ([] if indicators.HAVE_NUMBA else [("StreamingATR", 500, False)])
+
+
+def test_run_backtest_uses_cache_beside_archive(tmp_path):
+    path = tmp_path / "nifty_5min.csv"
+    _frame(800).to_csv(path, index=False)
+    with redirect_stdout(io.StringIO()):
+        plain = run_backtest(str(path), use_cache=False)
+        first = run_backtest(str(path))
+        second = run_backtest(str(path))
+    assert plain and plain == first == second
+    assert (tmp_path / ".indicator_cache" / "nifty_5min" / "index.json").exists()
+
+
+def _apply_in_process(root, n):
+    IndicatorCache(root).apply_v25(_frame(n))
+
+
+def test_processes_sharing_a_root_keep_every_index_entry(tmp_path):
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_apply_in_process, args=(str(tmp_path), 300 + k)) for k in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+    assert [p.exitcode for p in procs] == [0] * 4
+    entries = json.loads((tmp_path / "index.json").read_text())["entries"]
+    # every process's read-modify-write of index.json ran under the file lock, so none is lost
+    assert sorted(e["bars"] for e in entries["ema:21"]) == [300, 301, 302, 303]
+    assert all(len(v) == 4 for v in entries.values())
@@ -0,0 +1,136 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from core import indicators as ci
+from core.indicators import IndicatorStream, V25Indicators
+from strategy_v25 import ATR, EMA, MACD
+
+
+def _frame(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 25000 + np.cumsum(rng.normal(0, 8, n))
+    high = close + rng.uniform(0, 12, n)
+    low = close - rng.uniform(0, 12, n)
+    idx = pd.date_range("2025-09-01 09:15", periods=n, freq="5min", tz="Asia/Kolkata")
+    return pd.DataFrame({"datetime": idx, "open": close, "high": high, "low": low, "close": close})
+
+
+def _reference(df):
+    macd, signal, hist = MACD(df["close"])
+    return {"ema21": EMA(df["close"], 21), "macd": macd, "macd_signal": signal, "macd_hist": hist, "atr": ATR(df)}
+
+
+def test_streaming_matches_pandas_exactly():
+    df = _frame()
+    ind = V25Indicators()
+    rows = [ind.update(h, l, c) for h, l, c in zip(df["high"], df["low"], df["close"])]
+    got = pd.DataFrame(rows)
+    for name, ref in _reference(df).items():
+        assert np.array_equal(got[name].to_numpy(), ref.to_numpy(), equal_nan=True), name
+
+
+def test_state_round_trip_and_peek_do_not_drift():
+    df = _frame()
+    ind = V25Indicators()
+    for h, l, c in zip(df["high"][:200], df["low"][:200], df["close"][:200]):
+        ind.update(h, l, c)
+    resumed = V25Indicators.from_state(json.loads(json.dumps(ind.to_state())))
+    peeked = resumed.peek(df["high"][200], df["low"][200], df["close"][200])
+    rows = [resumed.update(h, l, c) for h, l, c in zip(df["high"][200:], df["low"][200:], df["close"][200:])]
+    assert peeked == rows[0]
+    ref = _reference(df)
+    for name in ref:
+        assert np.array_equal(pd.DataFrame(rows)[name].to_numpy(), ref[name].to_numpy()[200:]), name
+
+
+def test_indicator_stream_folds_only_new_bars():
+    df = _frame(120)
+    stream = IndicatorStream()
+    for end in (30, 31, 31, 90, 120):
+        partial = df.iloc[:end].copy()
+        if end == 31:
+            partial.loc[30, "high"] += 5.0  # forming bar revised between polls
+        out = stream.sync(partial)
+        ref = _reference(partial)
+        for name in ref:
+            assert np.array_equal(out[name].to_numpy(), ref[name].to_numpy(), equal_nan=True), (end, name)
+
+
+def test_indicator_stream_follows_a_sliding_window():
+    df = _frame(200)
+    ref = _reference(df)
+    stream = IndicatorStream(capacity=50)
+    for lo in range(0, 101):
+        out = stream.sync(df.iloc[lo:lo + 100].copy())
+    assert len(stream.store) == 50 and stream.store.total == 200
+    tail = df.index[-50:]
+    for name in ref:
+        assert np.array_equal(out.loc[tail, name].to_numpy(), ref[name].to_numpy()[-50:], equal_nan=True), name
+        assert np.isnan(out[name].to_numpy()[:-50]).all(), name  # older than the retained history
+        assert np.array_equal(stream.store.window(name), ref[name].to_numpy()[-50:], equal_nan=True), name
+
+
+def test_indicator_stream_push_ignores_stale_bars():
+    stream = IndicatorStream()
+    assert stream.push(300, 1.0, 2.0, 0.5, 1.5)
+    assert stream.push(300, 1.0, 2.5, 0.5, 2.0)  # forming bar revised
+    assert not stream.push(0, 1.0, 2.0, 0.5, 1.5)
+    assert len(stream.store) == 1 and stream.store.last("close") == 2.0
+
+
+def _gappy_frame():
+    df = _frame(150)
+    df.loc[40:43, "close"] = np.nan
+    df.loc[90, "high"] = np.nan
+    return df
+
+
+def test_array_functions_match_pandas_with_gaps():
+    df = _gappy_frame()
+    ref = _reference(df)
+    got = ci.v25_indicator_arrays(df["high"], df["low"], df["close"])
+    for name in ref:
+        assert np.array_equal(got[name], ref[name].to_numpy(), equal_nan=True), name
+
+
+def test_loop_kernels_match_pandas():
+    # the kernels numba compiles; run directly they are plain Python either way
+    df = _gappy_frame()
+    ref = _reference(df)
+    h, l, c = (df[col].to_numpy(dtype=float) for col in ("high", "low", "close"))
+    ema, macd, sig, hist, tr, atr = (np.empty(len(c)) for _ in range(6))
+    ci._ema_kernel(c, ci.ema_alpha(21), ema)
+    ci._macd_kernel(c, ci.ema_alpha(12), ci.ema_alpha(26), ci.ema_alpha(9), macd, sig, hist)
+    ci._atr_kernel(h, l, c, 14, tr, atr)
+    for name, got in (("ema21", ema), ("macd", macd), ("macd_signal", sig), ("macd_hist", hist), ("atr", atr)):
+        assert np.array_equal(got, ref[name].to_numpy(), equal_nan=True), name
+
+
+def test_batch_rows_match_single_instrument_results():
+    nifty, ce = _frame(200, seed=1), _frame(150, seed=2)
+    ce["close"] = ce["close"] / 100.0
+    ce["high"], ce["low"] = ce["close"] + 1.0, ce["close"] - 1.0
+    ce = ce.iloc[50:].reset_index(drop=True)  # starts later than the index
+    batch = ci.compute_batch({"NIFTY": nifty, "CE": ce})
+    assert batch["close"].shape == (2, 200)
+    assert np.isnan(batch["close"][1, :50]).all()
+    for name, df in (("NIFTY", nifty), ("CE", ce)):
+        got = batch.frame(name)
+        assert got["datetime"].tolist() == df["datetime"].tolist()
+        for col, ref in _reference(df).items():
+            assert np.array_equal(got[col].to_numpy(), ref.to_numpy(), equal_nan=True), (name, col)
+
+
+def test_indicator_bank_shares_emas_and_matches_macd():
+    close = _gappy_frame()["close"]
+    grid = [(12, 26, 9), (8, 21, 5), (12, 21, 9), (12, 26, 9)]
+    bank = ci.IndicatorBank(close, spans=[21, 50], macd_grid=grid)
+    assert bank.spans == [8, 12, 21, 26, 50]
+    assert bank.signal_matrix.shape == (3, len(close))
+    for span in bank.spans:
+        assert np.array_equal(bank.ema(span), EMA(close, span).to_numpy(), equal_nan=True)
+    for params in grid:
+        for got, ref in zip(bank.macd(*params), MACD(close, *params)):
+            assert np.array_equal(got, ref.to_numpy(), equal_nan=True), params
@@ -0,0 +1,98 @@
+import logging
+
+import pandas as pd
+import pytest
+
+from core.instrument_loader import InstrumentRegistry, RateLimiter, fetch_batches, split_batches
+
+
+def _master():
+    return pd.DataFrame({
+        "SEM_SMST_SECURITY_ID": [13, 2885, 40001, 40002, 50001, 50002, 60001],
+        "SEM_TRADING_SYMBOL": ["NIFTY", "RELIANCE", "NIFTY-OCT2025-25000-CE", "NIFTY-OCT2025-25000-CE",
+                               "CRUDEOIL-NOV2025-FUT", "CRUDEOIL-DEC2025-FUT", "CRUDEOIL-NOV2025-FUT"],
+        "SEM_CUSTOM_SYMBOL": ["NIFTY", "Reliance", "NIFTY 28 OCT 25000 CALL", "NIFTY 28 OCT 25000 CALL",
+                              "CRUDEOIL NOV FUT", "CRUDEOIL DEC FUT", "CRUDEOIL NOV FUT"],
+        "SEM_EXM_EXCH_ID": ["NSE", "NSE", "NSE", "NSE", "MCX", "MCX", "MCX"],
+        "SEM_INSTRUMENT_NAME": ["INDEX", "EQUITY", "OPTIDX", "OPTIDX", "FUTCOM", "FUTCOM", "FUTCOM"],
+        "SM_SYMBOL_NAME": ["NIFTY", "RELIANCE", "NIFTY", "NIFTY", "CRUDEOIL", "CRUDEOIL", "CRUDEOIL"],
+        "SEM_EXPIRY_DATE": [None, None, "2025-10-28", "2025-10-28", "2025-11-19", "2025-12-17", "2025-11-19"],
+    })
+
+
+def test_resolve_matches_tradehull_routing():
+    reg = InstrumentRegistry(_master(), commodity_names=["CRUDEOIL"])
+    assert reg.resolve("nifty") == ("IDX_I", 13)
+    assert reg.resolve("RELIANCE") == ("NSE_EQ", 2885)
+    # duplicate rows resolve to the last one, like `.iloc[-1]`
+    assert reg.resolve("NIFTY-OCT2025-25000-CE") == ("NSE_FNO", 40002)
+    assert reg.resolve("CRUDEOIL") == ("MCX_COMM", 50001)
+    assert reg.resolve("CRUDEOIL-NOV2025-FUT") == ("MCX_COMM", 60001)
+    assert reg.resolve("UNKNOWN") is None
+
+
+def test_resolve_many_groups_by_segment_and_reports_missing():
+    reg = InstrumentRegistry(_master(), commodity_names=["CRUDEOIL"])
+    by_segment, names, missing = reg.resolve_many(["NIFTY", "RELIANCE", "NIFTY", "NOPE"])
+    assert by_segment == {"IDX_I": [13], "NSE_EQ": [2885]}
+    assert names[("NSE_EQ", 2885)] == "RELIANCE"
+    assert missing == ["NOPE"]
+
+
+def test_split_batches_respects_max_size():
+    batches = split_batches({"NSE_FNO": list(range(2500)), "IDX_I": [13]}, batch_size=1000)
+    assert [len(next(iter(b.values()))) for b in batches] == [1000, 1000, 500, 1]
+    with pytest.raises(ValueError):
+        split_batches({"NSE_EQ": [1]}, batch_size=1001)
+
+
+def test_rate_limiter_spaces_request_starts():
+    now, slept = [0.0], []
+
+    def sleep(dt):
+        slept.append(dt)
+        now[0] += dt
+
+    limiter = RateLimiter(1.0, clock=lambda: now[0], sleep=sleep)
+    for _ in range(3):
+        limiter.wait()
+    assert slept == [1.0, 1.0]
+
+
+def test_fetch_batches_retries_and_keeps_successful_batches():
+    calls = {}
+
+    def fetch(batch):
+        (segment, ids), = batch.items()
+        calls[ids[0]] = calls.get(ids[0], 0) + 1
+        if ids[0] == 1 and calls[1] == 1:
+            raise ConnectionError("reset")          # transient: succeeds on retry
+        if ids[0] == 2:
+            return {"status": "failure", "remarks": "DH-904 rate limit"}
+        return {"status": "success", "data": {"data": {segment: {str(i): {} for i in ids}}}}
+
+    batches = [{"NSE_FNO": [0]}, {"NSE_FNO": [1]}, {"NSE_FNO": [2]}]
+    responses, errors = fetch_batches(fetch, batches, max_workers=3, limiter=RateLimiter(0.0), retries=2)
+    assert [r is not None for r in responses] == [True, True, False]
+    assert errors == [({"NSE_FNO": [2]}, "DH-904 rate limit")]
+    assert calls == {0: 1, 1: 2, 2: 3}
+
+
+def test_market_snapshot_returns_good_batches_with_errors():
+    from Dhan_Tradehull import Tradehull
+
+    class Feed:
+        def quote_data(self, batch):
+            (segment, ids), = batch.items()
+            if segment == "NSE_EQ":
+                return {"status": "failure", "remarks": "down"}
+            return {"status": "success", "data": {"data": {segment: {str(i): {"last_price": 100.0} for i in ids}}}}
+
+        ticker_data = ohlc_data = quote_data
+
+    tsl = object.__new__(Tradehull)
+    tsl.instrument_df, tsl.commodity_step_dict = _master(), {"CRUDEOIL": 1}
+    tsl.Dhan, tsl.logger = Feed(), logging.getLogger("test_snapshot")
+    df = tsl.get_market_snapshot(["NIFTY", "RELIANCE"], min_interval=0.0, retries=0)
+    assert df["name"].tolist() == ["NIFTY"] and df["ltp"].tolist() == [100.0]
+    assert df.attrs["errors"] == [{"names": ["RELIANCE"], "error": "down"}]
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest_engine import INITIAL_SL, SL_HIT
+from core.events import INFO, EventRecorder
+from core.intrabar import run_v25_intrabar, simulate_v25_intrabar, sub_bar_inputs
+from strategy_v25 import run_backtest
+from tests.test_strategy_v25 import _session_frame
+
+
+def _arrays(n=3):
+    # long entry at 100 on bar 0 (SL 90, TP1 115, lock 113); trend filters stay long
+    return {
+        "seconds": np.full(n, 36000.0), "close": np.r_[100.0, np.full(n - 1, 101.0)], "high": np.full(n, 120.0),
+        "low": np.full(n, 85.0), "ema21": np.zeros(n), "atr": np.full(n, 10.0), "macd_hist": np.ones(n),
+        "signal": np.r_[1, np.zeros(n - 1)].astype(np.int8),
+    }
+
+
+def _sub(minutes):
+    """Sub-bars (open, high, low) for bar 1 of three; bars 0 and 2 get one flat sub-bar."""
+    o, h, l = (np.array(v, dtype=np.float64) for v in zip(*minutes))
+    rows = [(100.0, 100.0, 100.0)] + list(zip(o, h, l)) + [(101.0, 101.0, 101.0)]
+    o, h, l = (np.array(v) for v in zip(*rows))
+    bar = np.r_[0, np.ones(len(minutes), dtype=np.int64), 2]
+    return {"bounds": np.array([0, 1, 1 + len(minutes), 2 + len(minutes)]), "open": o, "high": h, "low": l,
+            "run_high": pd.Series(h).groupby(bar).cummax().to_numpy(),
+            "neg_run_low": pd.Series(-l).groupby(bar).cummax().to_numpy()}
+
+
+@pytest.mark.parametrize("minutes, reason, price", [
+    ([(101, 104, 95), (104, 116, 103), (114, 114, 112)], SL_HIT, 113.0),   # TP1 first, then the locked stop
+    ([(101, 104, 95), (104, 116, 114), (110, 112, 108)], SL_HIT, 110.0),   # gap through the locked stop after TP1
+    ([(101, 104, 89), (95, 116, 94)], INITIAL_SL, 90.0),                   # stop first, although TP1 comes later
+    ([(101, 104, 95), (87, 96, 86)], INITIAL_SL, 87.0),                    # gap through the stop fills at the open
+    ([(101, 116, 89)], INITIAL_SL, 90.0),                                  # both in one minute: stop wins
+])
+def test_stops_and_tp1_resolve_in_sub_bar_order(minutes, reason, price):
+    trades = simulate_v25_intrabar(_arrays(), _sub(minutes), start=0)
+    assert trades[0]["exit_idx"] == 1 and trades[0]["reason"] == reason and trades[0]["exit"] == price
+
+
+def test_sub_bar_inputs_maps_minutes_and_fills_missing_bars():
+    df = _session_frame(days=2, seed=4)
+    rows = df.iloc[:40]
+    minute = pd.DataFrame({
+        "datetime": (rows["datetime"].repeat(5) + pd.to_timedelta(np.tile(np.arange(5), len(rows)), unit="min")).to_numpy(),
+        "open": rows["open"].repeat(5).to_numpy(), "high": rows["high"].repeat(5).to_numpy() - np.tile([1, 0, 2, 3, 4], len(rows)),
+        "low": rows["low"].repeat(5).to_numpy(), "close": rows["close"].repeat(5).to_numpy(),
+    }).sample(frac=1.0, random_state=0)
+    sub = sub_bar_inputs(df["datetime"], minute, df["open"], df["high"], df["low"])
+    counts = np.diff(sub["bounds"])
+    assert counts[:40].tolist() == [5] * 40 and counts[40:].tolist() == [1] * (len(df) - 40)
+    assert sub["run_high"][:5].tolist() == [rows["high"].iloc[0] - 1] + [rows["high"].iloc[0]] * 4
+    assert np.all(np.diff(sub["neg_run_low"][:5]) >= 0)
+    assert sub["high"][sub["bounds"][40]] == df["high"].iloc[40]
+
+    trades = run_v25_intrabar(df, minute)
+    assert all(t[3] >= t[0] for t in trades)
+
+
+def test_intrabar_run_records_entries_and_exits(tmp_path):
+    df = _session_frame(days=6, seed=3)
+    minute = df[["datetime", "open", "high", "low", "close"]]  # one sub-bar per bar
+    rec = EventRecorder(level=INFO)
+    trades = run_v25_intrabar(df, minute, recorder=rec)
+    assert trades
+    assert rec.frame("exit")["reason"].tolist() == [t[5] for t in trades]
+    assert rec.frame("exit")["price"].tolist() == [t[4] for t in trades]
+    assert rec.frame("entry_signal")["price"].tolist() == [t[2] for t in trades]
+    assert rec.lines()[0].startswith("[ENTRY SIGNAL]")
+
+    df.to_csv(tmp_path / "bars.csv", index=False)
+    minute.to_csv(tmp_path / "minutes.csv", index=False)
+    with pytest.raises(ValueError):
+        run_backtest(str(tmp_path / "bars.csv"), use_cache=False, workers=2, minute_path=str(tmp_path / "minutes.csv"))
+
+
+def test_restarted_run_helpers_agree():
+    from core.intrabar import _restarted_run_loop
+
+    x = np.random.default_rng(2).normal(size=12)
+    for lo, hi, sign in ((0, 12, 1.0), (3, 9, -1.0), (7, 8, 1.0)):
+        expected = np.maximum.accumulate(sign * x[lo:hi])
+        assert np.array_equal(_restarted_run_loop(x, lo, hi, sign), expected)
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from core.candle_data import epoch_seconds
+from core.indicators import IndicatorStream
+from core.live_session import LiveV25Session
+from strategy_v25 import generate_entry_signals
+from tests.test_strategy_v25 import _session_frame
+
+
+def _replay(df, start=2, tp_points=15.0, sl_atr=1.5):
+    # paper_trader's per-row loop for one position, on a precomputed frame
+    signals = generate_entry_signals(df).to_numpy()
+    trades, entry = [], None
+    for i in range(start, len(df)):
+        dt, close, atr = df["datetime"].iat[i], float(df["close"].iat[i]), float(df["atr"].iat[i])
+        if entry is None:
+            if signals[i] is not None:
+                entry = (signals[i], dt, close)
+            continue
+        side, _, price = entry
+        sign = 1 if side == "BUY_CE" else -1
+        sl_val, tp_val = price - sign * sl_atr * atr, price + sign * tp_points
+        if sign * (close - sl_val) <= 0:
+            trades.append((side, entry[1], dt, sl_val, "SL Hit"))
+        elif sign * (close - tp_val) >= 0:
+            trades.append((side, entry[1], dt, tp_val, "TP Hit"))
+        elif dt.time() >= pd.Timestamp("15:25").time():
+            trades.append((side, entry[1], dt, close, "EOD EXIT"))
+        else:
+            continue
+        entry = None
+    return trades
+
+
+def _trades(session_closed):
+    return [(e["side"], e["entry_time"], t, p, r) for e, t, p, r in session_closed]
+
+
+def test_session_on_pushed_bars_matches_frame_replay():
+    df = _session_frame()
+    stream = IndicatorStream(capacity=500)
+    closed = []
+    session = LiveV25Session(stream, on_exit=lambda *trade: closed.append(trade))
+    starts = epoch_seconds(df["datetime"])
+    for i in range(len(df)):
+        stream.push(int(starts[i]), df["open"].iat[i], df["high"].iat[i], df["low"].iat[i], df["close"].iat[i])
+        session.update()
+    expected = _replay(df)
+    assert expected and _trades(closed) == expected
+
+
+def test_polled_session_waits_for_bar_close_and_skips_history():
+    df = _session_frame()
+    stream = IndicatorStream(capacity=500)
+    closed = []
+    session = LiveV25Session(stream, on_exit=lambda *trade: closed.append(trade))
+    starts = epoch_seconds(df["datetime"])
+    for i in range(100):
+        stream.push(int(starts[i]), df["open"].iat[i], df["high"].iat[i], df["low"].iat[i], df["close"].iat[i])
+    session.skip_history(forming=True)
+    for i in range(100, len(df)):
+        stream.push(int(starts[i]), df["open"].iat[i], df["high"].iat[i], df["low"].iat[i], df["close"].iat[i])
+        session.update(forming=True)  # bar i is still open; bar i - 1 is evaluated now
+    session.update()
+    expected = _replay(df, start=99)  # bar 99 was still forming when history was skipped
+    assert expected and _trades(closed) == expected
+
+
+class _FakeDhan:
+    INDEX = "IDX_I"
+
+    def __init__(self, minutes):
+        self.minutes, self.upto = minutes, 0
+
+    def intraday_minute_data(self, **kwargs):
+        part = self.minutes.iloc[:self.upto]
+        data = {"timestamp": epoch_seconds(part["datetime"]).tolist()}
+        data.update({col: part[col].tolist() for col in ("open", "high", "low", "close", "volume")})
+        return {"status": "success", "data": data}
+
+
+class _FakeTradehull:
+    def __init__(self, minutes):
+        self.Dhan = _FakeDhan(minutes)
+        self.instrument_df = pd.DataFrame(
+            {"SEM_TRADING_SYMBOL": ["NIFTY 50"], "SEM_INSTRUMENT_NAME": ["INDEX"], "SEM_SMST_SECURITY_ID": [13]})
+
+
+def test_index_stream_polls_only_append_new_minutes(monkeypatch):
+    import data_fetcher
+
+    rng = np.random.default_rng(3)
+    n = 375
+    close = 25000 + np.cumsum(rng.normal(0, 3, n))
+    minutes = pd.DataFrame({
+        "datetime": pd.date_range("2025-09-12 09:15", periods=n, freq="1min", tz="Asia/Kolkata"),
+        "open": close - 1, "high": close + 2, "low": close - 2, "close": close, "volume": rng.integers(1, 9, n) * 1.0})
+    fake = _FakeTradehull(minutes)
+    monkeypatch.setattr(data_fetcher, "_TSL", fake)
+    monkeypatch.setattr(data_fetcher, "_BAR_STREAMS", {})
+    for upto in (40, 41, 43, 200, 203, 375):
+        fake.Dhan.upto = upto
+        store = data_fetcher.get_index_bar_store("NIFTY", 5)
+
+    ref = minutes.set_index("datetime").resample("5min", origin="start").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+    assert store.starts().tolist() == epoch_seconds(ref.index.to_series()).tolist()
+    for col in ("open", "high", "low", "close", "volume"):
+        assert np.array_equal(store.window(col), ref[col].to_numpy()), col
+    fresh = IndicatorStream()
+    fresh.sync(ref.reset_index())
+    for col in ("ema21", "macd_hist", "atr"):
+        assert np.array_equal(store.window(col), fresh.store.window(col), equal_nan=True), col
+
+
+def test_session_trades_at_bar_close_from_the_tick_feed():
+    from core.candle_data import BarAggregator
+    from core.market_feed import SocketTickSource, StreamingBarFeed, serve_ticks, ticks_from_bars
+
+    df = _session_frame()
+    stream = IndicatorStream(capacity=500)
+    stream.sync(df.iloc[:100].copy())  # REST warm-up; bar 99 is still forming
+    closed = []
+    session = LiveV25Session(stream, on_exit=lambda *trade: closed.append(trade))
+    session.skip_history(forming=True)
+    server, port = serve_ticks(list(ticks_from_bars(df.iloc[99:], 13)))
+    agg = BarAggregator((300,), on_bar_close=session.on_bar_close)
+    StreamingBarFeed(SocketTickSource("127.0.0.1", port), agg, flush_interval=0).run()
+    expected = _replay(df, start=99)
+    assert expected and _trades(closed) == expected
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from core.backtest_engine import EOD_EXIT, SL_HIT, TRADE_DTYPE, simulate_v25, v25_inputs
+from core.metrics import bar_pnl, closed_trade_stats, reason_breakdown, report, summary_metrics, trade_columns
+from tests.test_strategy_v25 import _session_frame
+
+
+def _trades(rows):
+    return np.array([(e, x, s, ep, xp, r, 0.0) for e, x, s, ep, xp, r in rows], dtype=TRADE_DTYPE)
+
+
+def test_excursions_and_bar_pnl_match_a_per_trade_loop():
+    df = _session_frame(days=10, seed=11)
+    arrays = v25_inputs(df)
+    trades, _ = simulate_v25(arrays)
+    assert len(trades)
+    cols = trade_columns(trades, arrays["high"], arrays["low"])
+    close = arrays["close"]
+    per_bar = np.zeros(len(close))
+    for k, t in enumerate(trades):
+        e, x, side = t["entry_idx"], t["exit_idx"], t["side"]
+        top, bottom = arrays["high"][e:x + 1].max(), arrays["low"][e:x + 1].min()
+        assert cols["mfe"][k] == pytest.approx(top - t["entry"] if side == 1 else t["entry"] - bottom)
+        assert cols["mae"][k] == pytest.approx(t["entry"] - bottom if side == 1 else top - t["entry"])
+        marks = np.r_[t["entry"], close[e:x], t["exit"]]
+        per_bar[e:x + 1] += side * np.diff(marks)
+    assert bar_pnl(trades, close) == pytest.approx(per_bar)
+    assert per_bar.sum() == pytest.approx(cols["pnl"].sum())
+
+
+def test_same_bar_trade_and_reason_breakdown():
+    close = np.array([100.0, 101.0, 99.0, 103.0])
+    trades = _trades([(1, 1, 1, 100.5, 99.5, SL_HIT), (2, 3, -1, 99.0, 101.0, EOD_EXIT)])
+    assert bar_pnl(trades, close).tolist() == pytest.approx([0.0, -1.0, 0.0, -2.0])
+    by_reason = reason_breakdown(trades)
+    assert by_reason["SL Hit"] == {"trades": 1, "net_points": -1.0, "avg_points": -1.0, "win_rate": 0.0}
+    assert sum(r["trades"] for r in by_reason.values()) == len(trades)
+
+
+def test_closed_trade_stats():
+    stats = closed_trade_stats([4.0, -2.0, 6.0, -3.0])
+    assert stats["win_rate"] == 0.5 and stats["net_points"] == 5.0
+    assert stats["expectancy"] == pytest.approx(0.5 * 5.0 - 0.5 * 2.5)
+    assert stats["profit_factor"] == pytest.approx(2.0)
+    assert stats["max_drawdown"] == 3.0
+    assert closed_trade_stats([])["trades"] == 0
+
+
+def test_sharpe_uses_daily_mark_to_market_pnl():
+    # two bars a day for three days, long over each day's two bars
+    seconds = np.tile([33300, 55500], 3)
+    close = np.array([100.0, 102.0, 100.0, 99.0, 100.0, 104.0])
+    trades = _trades([(0, 1, 1, 100.0, 102.0, EOD_EXIT), (2, 3, 1, 100.0, 99.0, EOD_EXIT),
+                      (4, 5, 1, 100.0, 104.0, EOD_EXIT)])
+    stats = summary_metrics(trades, close, seconds, periods_per_year=4)
+    daily = np.array([2.0, -1.0, 4.0])
+    assert stats["sharpe"] == pytest.approx(daily.mean() / daily.std(ddof=1) * 2)
+    assert stats["sortino"] == pytest.approx(daily.mean() / np.sqrt(1 / 3) * 2)
+    assert stats["time_in_market"] == pytest.approx(0.5)
+    assert stats["mtm_max_drawdown"] == 1.0
+
+
+def test_report_frames():
+    df = _session_frame(days=5, seed=2)
+    arrays = v25_inputs(df)
+    trades, _ = simulate_v25(arrays)
+    rep = report(trades, arrays, df["datetime"])
+    assert len(rep.trades) == len(trades) and {"mae", "mfe", "entry_time"} <= set(rep.trades.columns)
+    assert rep.by_reason["trades"].sum() == len(trades)
+    assert rep.equity.iloc[-1] == pytest.approx(rep.summary["net_points"])
@@ -0,0 +1,96 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from mock_dhan_server import MockDhanState, start_in_thread
+
+
+def _archive():
+    idx = pd.date_range("2025-09-11 09:15", "2025-09-12 15:25", freq="5min", tz="Asia/Kolkata")
+    idx = idx[(idx.time >= pd.Timestamp("09:15").time()) & (idx.time <= pd.Timestamp("15:25").time())]
+    close = 25000 + np.arange(len(idx), dtype=float)
+    return pd.DataFrame({"open": close - 1, "high": close + 2, "low": close - 3, "close": close, "volume": 0}, index=idx)
+
+
+@pytest.fixture
+def server():
+    srv, base = start_in_thread(MockDhanState(archives={13: _archive()}))
+    yield srv, base
+    srv.shutdown()
+
+
+def test_intraday_resamples_and_falls_back_to_session_day(server):
+    srv, base = server
+    r = requests.post(f"{base}/charts/intraday", json={
+        "securityId": "13", "exchangeSegment": "IDX_I", "instrument": "INDEX",
+        "fromDate": "2030-01-01", "toDate": "2030-01-01", "interval": 15})
+    js = r.json()
+    assert r.status_code == 200
+    assert len(js["close"]) == 25  # 75 five-minute bars of 2025-09-12 -> 25 fifteen-minute bars
+    assert pd.to_datetime(js["timestamp"][0], unit="s", utc=True).tz_convert("Asia/Kolkata").strftime("%H:%M") == "09:15"
+
+
+def test_quote_orders_positions_and_funds(server):
+    srv, base = server
+    quote = requests.post(f"{base}/marketfeed/quote", json={"IDX_I": [13]}).json()
+    q = quote["data"]["IDX_I"]["13"]
+    assert q["last_price"] == 25000 + 149 and len(q["depth"]["buy"]) == 5
+    oid = requests.post(f"{base}/orders", json={"securityId": "13", "transactionType": "BUY", "quantity": 75}).json()["orderId"]
+    assert requests.get(f"{base}/orders/{oid}").json()["orderStatus"] == "TRADED"
+    assert requests.get(f"{base}/positions").json()[0]["netQty"] == 75
+    assert requests.get(f"{base}/fundlimit").json()["availabelBalance"] > 0
+
+
+def test_rate_limit_injection():
+    srv, base = start_in_thread(MockDhanState(archives={13: _archive()}, rate_limit_rate=1.0, retry_after=0.5))
+    try:
+        r = requests.post(f"{base}/marketfeed/ltp", json={"IDX_I": [13]})
+        assert r.status_code == 429
+        assert r.headers["Retry-After"] == "0.5"
+        assert r.json()["errorCode"] == "DH-904"
+    finally:
+        srv.shutdown()
+
+
+def test_scrip_master_lists_indices_and_collected_options(tmp_path, monkeypatch):
+    import Dhan_Tradehull
+
+    idx = pd.date_range("2025-09-12 03:45", periods=75, freq="5min")  # data_collector writes naive UTC
+    pd.DataFrame({"datetime": idx, "open": 100.0, "high": 102.0, "low": 99.0, "close": np.arange(75.0) + 100,
+                  "volume": 10}).to_csv(tmp_path / "NIFTY-Sep2025-25000-CE_2025-09-16.csv", index=False)
+    srv, base = start_in_thread(MockDhanState(archives={13: _archive()}, options_dir=str(tmp_path)))
+    try:
+        monkeypatch.delenv("DHAN_INSTRUMENT_URL", raising=False)
+        monkeypatch.setenv("DHAN_API_BASE_URL", base)
+        r = requests.get(Dhan_Tradehull.instrument_master_url())
+        assert r.status_code == 200 and r.headers["Content-Type"] == "text/csv"
+        master = pd.read_csv(io.StringIO(r.text))
+        index = master[master["SEM_INSTRUMENT_NAME"] == "INDEX"].set_index("SEM_TRADING_SYMBOL")
+        assert index.loc["NIFTY 50", "SEM_SMST_SECURITY_ID"] == 13
+        option = master[master["SEM_INSTRUMENT_NAME"] == "OPTIDX"].iloc[0]
+        assert option["SEM_TRADING_SYMBOL"] == "NIFTY-SEP2025-25000-CE"
+        assert (option["SEM_STRIKE_PRICE"], option["SEM_OPTION_TYPE"]) == (25000.0, "CE")
+        assert option["SEM_EXPIRY_DATE"].startswith("2025-09-16")
+
+        js = requests.post(f"{base}/charts/intraday", json={
+            "securityId": str(option["SEM_SMST_SECURITY_ID"]), "exchangeSegment": "NSE_FNO", "instrument": "OPTIDX",
+            "fromDate": "2025-09-12", "toDate": "2025-09-12", "interval": 5}).json()
+        assert js["close"] == list(np.arange(75.0) + 100)
+        assert pd.to_datetime(js["timestamp"][0], unit="s", utc=True).tz_convert("Asia/Kolkata").strftime("%H:%M") == "09:15"
+    finally:
+        srv.shutdown()
+
+
+def test_instrument_url_override(monkeypatch):
+    import Dhan_Tradehull
+
+    monkeypatch.delenv("DHAN_INSTRUMENT_URL", raising=False)
+    monkeypatch.delenv("DHAN_API_BASE_URL", raising=False)
+    assert Dhan_Tradehull.instrument_master_url() == Dhan_Tradehull.INSTRUMENT_MASTER_URL
+    monkeypatch.setenv("DHAN_API_BASE_URL", "http://127.0.0.1:8765/v2/")
+    assert Dhan_Tradehull.instrument_master_url() == "http://127.0.0.1:8765/v2/instruments/scrip-master.csv"
+    monkeypatch.setenv("DHAN_INSTRUMENT_URL", "http://127.0.0.1:9000/master.csv")
+    assert Dhan_Tradehull.instrument_master_url() == "http://127.0.0.1:9000/master.csv"
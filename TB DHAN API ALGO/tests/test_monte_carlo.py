@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.monte_carlo import load_trade_pnl, path_stats, resample, run_monte_carlo
+
+
+def test_path_stats_matches_a_plain_equity_walk():
+    paths = np.array([[5.0, -3.0, -4.0, 6.0], [-2.0, -2.0, 10.0, -1.0]])
+    stats = path_stats(paths.copy(), ruin_level=-3.5)
+    assert stats["final"].tolist() == [4.0, 5.0]
+    assert stats["max_drawdown"].tolist() == [7.0, 4.0]  # from +5 down to -2; from the 0 start down to -4
+    assert stats["ruined"].tolist() == [False, True]
+
+
+def test_permute_keeps_trades_and_blocks_are_worker_independent(tmp_path):
+    pnl = np.random.default_rng(0).normal(50, 400, 300).round(2)
+    shuffled = resample(pnl, 5, "permute", rng=np.random.default_rng(1))
+    assert all(np.array_equal(np.sort(row), np.sort(pnl)) for row in shuffled)
+
+    serial = run_monte_carlo(pnl, 5000, capital=5000, seed=9, workers=1, block_paths=700)
+    parallel = run_monte_carlo(pnl, 5000, capital=5000, seed=9, workers=2, block_paths=700)
+    assert len(serial.final) == 5000
+    assert np.array_equal(serial.final, parallel.final) and np.array_equal(serial.ruined, parallel.ruined)
+    assert 0 < serial.risk_of_ruin < 1
+    assert serial.summary().loc["p50", "final_pnl"] == pytest.approx(np.median(serial.final))
+
+    permuted = run_monte_carlo(pnl, 100, "permute", seed=2)
+    assert np.allclose(permuted.final, pnl.sum())
+
+    log = tmp_path / "PaperTrade.csv"
+    pd.DataFrame({"PnL_Points": pnl / 75, "PnL_INR": pnl}).to_csv(log, index=False)
+    assert np.array_equal(load_trade_pnl(str(log)), pnl)
+    with pytest.raises(ValueError):
+        load_trade_pnl(str(log), "PnL")
@@ -0,0 +1,93 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest_engine import simulate_v25, v25_inputs
+from core.option_backtest import (
+    PREMIUM_SL,
+    OptionCandleStore,
+    atm_contracts,
+    option_catalog,
+    run_option_backtest,
+)
+from tests.test_strategy_v25 import _session_frame
+
+EXPIRIES = ("2025-09-04", "2025-09-30")
+STRIKES = (24900, 25000, 25100)
+
+
+def _write_options(df, folder):
+    """Linear premiums (200 +/- moneyness) saved like data_collector: naive UTC times."""
+    stamps = df["datetime"].dt.tz_convert("UTC").dt.tz_localize(None)
+    for expiry in EXPIRIES:
+        for strike in STRIKES:
+            for kind, sign in (("CE", 1), ("PE", -1)):
+                prem = {k: 200 + sign * (df[k] - strike) for k in ("open", "close", "high", "low")}
+                if sign < 0:
+                    prem["high"], prem["low"] = prem["low"], prem["high"]
+                out = pd.DataFrame({"datetime": stamps, **prem, "volume": 0})
+                out.to_csv(folder / f"NIFTY-Sep2025-{strike}-{kind}_{expiry}.csv", index=False)
+
+
+def test_catalog_and_atm_mapping(tmp_path):
+    _write_options(_session_frame(days=1), tmp_path)
+    (tmp_path / "notes.txt").write_text("x")
+    catalog = option_catalog(str(tmp_path))
+    assert len(catalog) == 12 and set(catalog["option_type"]) == {"CE", "PE"}
+    days = np.array(["2025-09-02", "2025-09-05", "2025-10-01"], dtype="datetime64[D]")
+    rows = atm_contracts(catalog, days, np.array([25030.0, 24880.0, 25000.0]), np.array([1, -1, 1]))
+    assert rows[2] == -1
+    picked = catalog.iloc[rows[:2]]
+    assert picked["strike"].tolist() == [25000, 24900]  # 25050 is not collected; ties go to the lower strike
+    assert picked["expiry"].dt.strftime("%Y-%m-%d").tolist() == list(EXPIRIES)
+    assert picked["option_type"].tolist() == ["CE", "PE"]
+
+
+def test_premium_pnl_tracks_the_index_for_linear_options(tmp_path):
+    df = _session_frame(days=8, seed=5)
+    _write_options(df, tmp_path)
+    index_trades, _ = simulate_v25(v25_inputs(df))
+    # linear premiums price any strike alike, so lift the ATM distance limit here
+    result = run_option_backtest(df, str(tmp_path), lot_size=75, max_strike_distance=np.inf)
+    assert len(result) == len(index_trades)
+    # premiums fill at the option close of the exit bar, not at the index stop level
+    points = index_trades["side"] * (df["close"].to_numpy()[index_trades["exit_idx"]] - index_trades["entry"])
+    assert result["PnL_Points"].to_numpy() == pytest.approx(np.round(points, 2), abs=0.011)
+    assert result["PnL_INR"].to_numpy() == pytest.approx(result["PnL_Points"].to_numpy() * 75, abs=1)
+    assert (result["ExitTime"] >= result["EntryTime"]).all()
+
+    # a 1% premium stop cuts every trade that dips that far before its index exit
+    stopped = run_option_backtest(df, str(tmp_path), lot_size=75, premium_sl=0.01, max_strike_distance=np.inf)
+    cut = stopped["Reason"] == PREMIUM_SL
+    assert cut.any()
+    assert (stopped.loc[cut, "ExitPrice"] <= stopped.loc[cut, "EntryPrice"] * 0.99 + 1e-9).all()
+
+
+def test_trades_far_from_collected_strikes_are_skipped(tmp_path, capsys):
+    df = _session_frame(days=8, seed=5)
+    _write_options(df, tmp_path)
+    index_trades, _ = simulate_v25(v25_inputs(df))
+    result = run_option_backtest(df, str(tmp_path), lot_size=75)
+    atm = np.round(index_trades["entry"] / 50) * 50
+    near = (atm >= STRIKES[0] - 50) & (atm <= STRIKES[-1] + 50)
+    assert 0 < len(result) == near.sum() < len(index_trades)
+    assert (np.abs(result["Strike"] - np.round(result["EntrySpot"] / 50) * 50) <= 50).all()
+    assert f"{(~near).sum()} of {len(index_trades)} trades have no collected strike within 50 of ATM" in capsys.readouterr().out
+
+
+def test_candle_store_caches_per_contract(tmp_path):
+    df = _session_frame(days=1)
+    _write_options(df, tmp_path)
+    path = str(tmp_path / f"NIFTY-Sep2025-25000-CE_{EXPIRIES[0]}.csv")
+    first = OptionCandleStore().candles(path)
+    cached = tmp_path / ".premium_cache" / f"NIFTY-Sep2025-25000-CE_{EXPIRIES[0]}.npz"
+    assert cached.exists()
+    again = OptionCandleStore().candles(path)
+    np.testing.assert_array_equal(first["close"], again["close"])
+    assert again["ns"][0] == df["datetime"].iloc[0].value
+
+    pd.read_csv(path).iloc[:10].to_csv(path, index=False)
+    os.utime(path, ns=(0, 10**9))
+    assert len(OptionCandleStore().candles(path)["close"]) == 10
@@ -0,0 +1,29 @@
+from core.backtest_engine import day_bounds, flat_cuts, run_v25_backtest, v25_inputs
+from core.events import DEBUG, EventRecorder
+from core.parallel_backtest import run_v25_by_day, split_points
+from tests.test_strategy_v25 import _session_frame
+
+
+def test_split_points_only_cut_where_the_previous_day_reached_eod():
+    df = _session_frame(days=6, seed=3)
+    # day 3 closes early at 15:10, so a position can carry into day 4
+    short_day = df["datetime"].dt.day == df["datetime"].dt.day.unique()[2]
+    df = df[~(short_day & (df["datetime"].dt.hour * 60 + df["datetime"].dt.minute > 15 * 60 + 10))].reset_index(drop=True)
+    bounds = day_bounds(df["datetime"])
+    seconds = v25_inputs(df)["seconds"]
+    cuts = flat_cuts(seconds, bounds)
+    assert bounds[3] not in cuts and len(cuts) == len(bounds) - 3
+    edges = split_points(seconds, bounds, 10)
+    assert edges[0] == 0 and edges[-1] == len(df) and set(edges[1:-1]) <= set(cuts.tolist())
+
+
+def test_day_parallel_run_matches_continuous_run():
+    df = _session_frame(days=20, seed=5)
+    expected_events = EventRecorder(level=DEBUG)
+    expected = run_v25_backtest(df, recorder=expected_events)
+    assert len(expected_events)
+    for workers in (1, 3):
+        events = EventRecorder(level=DEBUG)
+        assert run_v25_by_day(df, workers=workers, recorder=events) == expected
+        assert events.lines() == expected_events.lines()
+    assert run_v25_by_day(df, workers=2) == expected
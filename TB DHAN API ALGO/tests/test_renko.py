@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from bench_renko import legacy_renko_bricks, synthetic_minutes
+from core.renko import RenkoBuilder, renko_frame
+
+
+@pytest.mark.parametrize("box", [7, 12.5])
+def test_array_engine_matches_legacy_builder(box):
+    df = synthetic_minutes(0.02, seed=5)
+    expected = legacy_renko_bricks(df, box)
+    got = renko_frame(df, box)
+    assert len(expected) > 50
+    assert got.equals(expected)
+
+
+def test_incremental_updates_resume_from_saved_state():
+    df = synthetic_minutes(0.02, seed=9)
+    o, c = df["open"].to_numpy(), df["close"].to_numpy()
+    full = RenkoBuilder(7).update(o, c)
+
+    builder = RenkoBuilder(7)
+    pieces = []
+    for lo in range(0, len(df), 333):
+        pieces.append(builder.update(o[lo:lo + 333], c[lo:lo + 333]))
+        builder = RenkoBuilder.from_state(builder.to_state())  # e.g. process restart between polls
+    for field in full:
+        assert np.array_equal(np.concatenate([p[field] for p in pieces]), full[field]), field
@@ -0,0 +1,43 @@
+import multiprocessing as mp
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core import shared_data
+from core.shared_data import SharedArrays, attach, publish_frame, release, release_all
+from tests.test_strategy_v25 import _session_frame
+
+
+def _column_sum(args):
+    name, column = args
+    return float(attach(name).arrays[column].sum())
+
+
+def test_frame_round_trip_and_worker_attach_by_name():
+    df = _session_frame(days=3, seed=1)
+    with publish_frame(df) as data:
+        back = SharedArrays.attach(data.name)
+        pd.testing.assert_frame_equal(back.frame(), df)
+        assert not back.arrays["close"].flags.writeable
+        back.close()
+        ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        with ctx.Pool(2) as pool:
+            sums = pool.map(_column_sum, [(data.name, "close"), (data.name, "high")])
+        assert sums == pytest.approx([df["close"].sum(), df["high"].sum()])
+    with pytest.raises(FileNotFoundError):
+        SharedArrays.attach(data.name)
+
+
+def test_release_unlinks_owned_blocks():
+    first = SharedArrays.publish({"a": np.arange(5.0), "b": np.arange(5, dtype=np.int8)})
+    second = SharedArrays.publish({"a": np.ones(3)})
+    assert {first.name, second.name} <= set(shared_data._OWNED)
+    release(first.name)
+    release_all()
+    assert not shared_data._OWNED
+    for name in (first.name, second.name):
+        with pytest.raises(FileNotFoundError):
+            SharedArrays.attach(name)
+    with pytest.raises(ValueError):
+        SharedArrays.publish({"a": np.ones(3), "b": np.ones(4)})
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from core.backtest_engine import simulate_v25, v25_inputs
+from core.strategy_engine import BarView, Strategy, StrategyEngine, V25Strategy, spec_columns
+from tests.test_strategy_v25 import _session_frame
+
+
+class _EmaCross(Strategy):
+    """Toy strategy sharing the V25 cache: records the bars where ema9 crosses ema21."""
+
+    indicators = (("ema", 21), ("ema", 9))
+
+    def reset(self):
+        super().reset()
+        self.crosses = []
+
+    def on_bar(self, bar: BarView):
+        if bar.i > 0 and (bar["ema9"] > bar["ema21"]) != (bar.prev("ema9") > bar.prev("ema21")):
+            self.crosses.append(bar.i)
+        return None
+
+
+def _variants():
+    # "loose" shares the default entry check through bar.memo, "strict" has its own
+    return [V25Strategy(), V25Strategy("loose", tp_points=25, sl_atr=1.5),
+            V25Strategy("strict", macd_gap=1.5, min_atr_ratio=0.0004, tp_points=10)]
+
+
+def test_engine_matches_simulate_v25_per_variant():
+    df = _session_frame(days=20, seed=5)
+    engine = StrategyEngine(_variants())
+    got = engine.run(df[["datetime", "open", "high", "low", "close"]])
+    for s in engine.strategies:
+        p = s.params
+        expected, _ = simulate_v25(v25_inputs(df, macd_gap=p["macd_gap"], min_atr_ratio=p["min_atr_ratio"]),
+                                   **{k: p[k] for k in ("sl_atr", "tp_points", "lock_points", "trail_min", "trail_atr")})
+        assert len(expected)
+        np.testing.assert_array_equal(got[s.name], expected)
+    # different entry parameters must not reuse the default variant's memoized entry codes
+    assert got["strict"]["entry_idx"].tolist() != got["v25"]["entry_idx"].tolist()
+
+
+def test_live_bars_reproduce_the_backtest():
+    df = _session_frame(days=8, seed=3)[["datetime", "open", "high", "low", "close"]]
+    engine = StrategyEngine(_variants())
+    backtest = engine.run(df)
+    engine.reset()
+    events = []
+    for row in df.itertuples(index=False):
+        events.extend(engine.on_bar(row.datetime, row.open, row.high, row.low, row.close))
+    for s in engine.strategies:
+        np.testing.assert_allclose(s.trade_array()["exit"], backtest[s.name]["exit"])
+        assert s.trade_array()["exit_idx"].tolist() == backtest[s.name]["exit_idx"].tolist()
+    entries = [e for name, e in events if name == "v25" and e in ("BUY_CE", "SELL_PE")]
+    assert len(entries) == len(backtest["v25"])
+
+
+def test_indicator_specs_are_shared_and_validated():
+    toy = _EmaCross("cross")
+    engine = StrategyEngine([V25Strategy(), toy])
+    assert engine.specs == [("ema", 21), ("macd", 12, 26, 9), ("atr", 14), ("ema", 9)]
+    engine.run(_session_frame(days=3, seed=2))
+    assert toy.crosses
+
+    assert spec_columns(("macd", 8, 21, 5)) == ("macd_8_21_5", "macd_signal_8_21_5", "macd_hist_8_21_5")
+    with pytest.raises(ValueError):
+        StrategyEngine([V25Strategy(), V25Strategy()])
+    with pytest.raises(ValueError):
+        StrategyEngine([type("Bad", (_EmaCross,), {"indicators": (("rsi", 14),)})()])
+    with pytest.raises(TypeError):
+        Strategy()  # on_bar is abstract
+    with pytest.raises(ValueError):
+        V25Strategy(tp=20)
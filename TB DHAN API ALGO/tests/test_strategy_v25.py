@@ -0,0 +1,63 @@
+import io
+from contextlib import redirect_stdout
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest_engine import EOD_EXIT, INITIAL_SL, TRADE_DTYPE, simulate_v25, v25_inputs
+from core.events import INFO, EventRecorder, recording
+from core.indicators import apply_v25_indicators
+from strategy_v25 import backtest, backtest_loop, check_entry, generate_entry_signals
+
+
+def _session_frame(days=6, seed=11):
+    rng = np.random.default_rng(seed)
+    stamps = []
+    for d in pd.bdate_range("2025-09-01", periods=days):
+        stamps.extend(pd.date_range(d + pd.Timedelta(hours=9, minutes=15), periods=75, freq="5min", tz="Asia/Kolkata"))
+    n = len(stamps)
+    close = 25000 + np.cumsum(rng.normal(0, 12, n))
+    df = pd.DataFrame({"datetime": stamps, "open": close - rng.normal(0, 4, n), "close": close})
+    df["high"] = df[["open", "close"]].max(axis=1) + rng.uniform(0, 10, n)
+    df["low"] = df[["open", "close"]].min(axis=1) - rng.uniform(0, 10, n)
+    return apply_v25_indicators(df)
+
+
+def test_generate_entry_signals_matches_check_entry():
+    df = _session_frame()
+    df.loc[df.index[::7], "datetime"] += pd.Timedelta(seconds=20)  # off-grid bars near the window edges
+    with recording(EventRecorder(level=INFO)) as events:
+        expected = [check_entry(df, i) for i in range(len(df))]
+    got = generate_entry_signals(df)
+    assert got.tolist() == expected
+    assert {"BUY_CE", "SELL_PE"} <= set(expected)
+    assert events.frame("entry_signal")["side"].tolist() == [s for s in expected if s]
+
+
+def test_array_backtest_matches_original_loop():
+    df = _session_frame(days=20, seed=5)
+    legacy_out, engine_out = io.StringIO(), io.StringIO()
+    with redirect_stdout(legacy_out):
+        expected = backtest_loop(df)
+    with redirect_stdout(engine_out):
+        trades = backtest(df)
+    assert expected
+    assert trades == expected
+    assert engine_out.getvalue() == legacy_out.getvalue()
+
+
+def test_simulate_v25_structured_trades_and_exit_overrides():
+    arrays = v25_inputs(_session_frame(days=20, seed=5))
+    trades, events = simulate_v25(arrays)
+    assert trades.dtype == TRADE_DTYPE and events is None
+    assert len(trades) and (trades["exit_idx"] >= trades["entry_idx"]).all()
+    assert (trades["entry_idx"][1:] > trades["exit_idx"][:-1]).all()
+
+    # TP1 out of reach: the stop never moves, so only the initial SL or EOD can close a trade
+    wide, _ = simulate_v25(arrays, tp_points=1e9)
+    assert set(wide["reason"].tolist()) <= {INITIAL_SL, EOD_EXIT}
+    assert (wide["sl"] == wide["exit"])[wide["reason"] == INITIAL_SL].all()
+
+    with pytest.raises(ValueError):
+        simulate_v25(arrays, tp=20)
@@ -0,0 +1,33 @@
+import pandas as pd
+import pytest
+
+from core.backtest_engine import V25_PARAMS, simulate_v25, v25_inputs
+from core.sweep import PARAM_ORDER, expand_grid, run_sweep, summarize
+from tests.test_strategy_v25 import _session_frame
+
+GRID = {"macd_gap": [0.1, 0.2], "tp_points": [12, 15], "trail_atr": [0.2, 0.3]}
+
+
+def test_expand_grid_orders_entry_params_first_and_fills_defaults():
+    configs = expand_grid({"tp_points": [10, 20], "macd_gap": [0.1, 0.3]})
+    assert [(c["macd_gap"], c["tp_points"]) for c in configs] == [(0.1, 10), (0.1, 20), (0.3, 10), (0.3, 20)]
+    assert all(c["lock_points"] == V25_PARAMS["lock_points"] for c in configs)
+    assert list(configs[0]) == list(PARAM_ORDER)
+    with pytest.raises(ValueError):
+        expand_grid({"tp": [10]})
+
+
+def test_parallel_sweep_matches_serial_and_streams_csv(tmp_path):
+    df = _session_frame(days=20, seed=5)
+    out = tmp_path / "sweep.csv"
+    serial = run_sweep(df, GRID, workers=1, chunk_size=3)
+    parallel = run_sweep(df, GRID, workers=2, chunk_size=3, out_path=str(out))
+    pd.testing.assert_frame_equal(serial, parallel)
+    streamed = pd.read_csv(out).sort_values("config").reset_index(drop=True)
+    pd.testing.assert_frame_equal(streamed, parallel, check_dtype=False)
+
+    # the all-default row is the plain V25 backtest
+    row = serial[(serial[list(V25_PARAMS)] == pd.Series(V25_PARAMS)).all(axis=1)].iloc[0]
+    arrays = v25_inputs(df)
+    expected = summarize(simulate_v25(arrays)[0], arrays)
+    assert row[list(expected)].to_dict() == pytest.approx(expected, nan_ok=True)
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.backtest_engine import simulate_v25, v25_inputs
+from core.walk_forward import day_bounds, day_windows, walk_forward
+from tests.test_strategy_v25 import _session_frame
+
+
+def test_day_windows_roll_by_test_span():
+    bounds = np.arange(0, 75 * 11, 75)  # 10 days of 75 bars
+    windows = day_windows(bounds, train_days=4, test_days=3)
+    assert [(w.train_lo, w.test_lo, w.test_hi) for w in windows] == [(0, 300, 525), (225, 525, 750)]
+    # the last test window is cut short at the end of the data
+    assert [(w.test_lo, w.test_hi) for w in day_windows(bounds, 9, 3)] == [(675, 750)]
+    with pytest.raises(ValueError):
+        day_windows(bounds, 4, 3, step_days=2)
+
+
+def test_walk_forward_stitches_out_of_sample_trades():
+    df = _session_frame(days=20, seed=5)
+    assert len(day_bounds(df["datetime"])) == 21
+
+    # a single-config grid trades the full backtest, day windows or not
+    plain = walk_forward(df, {}, train_days=5, test_days=4, workers=1, min_trades=1)
+    full, _ = simulate_v25(v25_inputs(df))
+    first_test = 5 * 75
+    assert np.array_equal(plain.trades, full[full["entry_idx"] >= first_test])
+    assert plain.equity.iloc[-1] == pytest.approx(plain.windows["oos_net_points"].sum())
+
+    grid = {"tp_points": [10, 15, 20], "trail_atr": [0.2, 0.3]}
+    serial = walk_forward(df, grid, train_days=5, test_days=4, workers=1, chunk_size=2, min_trades=1)
+    parallel = walk_forward(df, grid, train_days=5, test_days=4, workers=2, chunk_size=2, min_trades=1)
+    pd.testing.assert_frame_equal(serial.windows, parallel.windows)
+    assert np.array_equal(serial.trades, parallel.trades)
+    assert len(serial.in_sample) == 6 * len(serial.windows)
+    for _, row in serial.windows.iterrows():
+        best = serial.in_sample[serial.in_sample["window"] == row["window"]]["net_points"].max()
+        assert row["is_net_points"] == best
+
+
+def test_out_of_sample_windows_share_entry_codes(monkeypatch):
+    import core.sweep
+
+    calls = []
+    original = core.sweep.v25_signals
+    monkeypatch.setattr(core.sweep, "v25_signals", lambda *a, **kw: calls.append(kw) or original(*a, **kw))
+    df = _session_frame(days=20, seed=5)
+    result = walk_forward(df, {"tp_points": [10, 15]}, train_days=5, test_days=4, workers=1, min_trades=1)
+    assert len(result.windows) == 4
+    # one entry config: computed once for the in-sample sweep and once for every out-of-sample window
+    assert len(calls) == 2
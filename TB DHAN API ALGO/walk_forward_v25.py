@@ -0,0 +1,63 @@
+# walk_forward_v25.py
+#Trader Baddu:D
+"""
+Walk-forward validation of Strategy V25 over a candle archive.
+
+    python walk_forward_v25.py [--data path.csv] [--train-days 60] [--test-days 20]
+                               [--objective net_points] [--workers 8] [--out wf]
+                               [--tp-points 10,15,20] [--sl-atr 1.0,1.5] ...
+
+Grid options are the same as sweep_v25.py. Indicators come from the
+archive's IndicatorCache, so repeated runs skip the indicator pass. Writes
+<out>_windows.csv (chosen params and in/out-of-sample metrics per window)
+and <out>_equity.csv (stitched out-of-sample equity curve).
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from core.backtest_engine import V25_PARAMS
+from core.indicator_cache import IndicatorCache
+from core.walk_forward import walk_forward
+from sweep_v25 import DEFAULT_DATA, _values
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--train-days", type=int, default=60)
+    parser.add_argument("--test-days", type=int, default=20)
+    parser.add_argument("--step-days", type=int, default=None, help="default: --test-days")
+    parser.add_argument("--objective", default="net_points")
+    parser.add_argument("--min-trades", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=None, help="default: all cores")
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--out", default="v25_walk_forward")
+    for name, default in V25_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=_values, default=None, help=f"default: {default}")
+    args = parser.parse_args()
+
+    grid = {name: getattr(args, name) for name in V25_PARAMS if getattr(args, name) is not None}
+    df = pd.read_csv(args.data)
+    df["datetime"] = pd.to_datetime(df["datetime"])
+    IndicatorCache.for_archive(args.data).apply_v25(df)
+
+    t0 = time.perf_counter()
+    result = walk_forward(df, grid, train_days=args.train_days, test_days=args.test_days,
+                          step_days=args.step_days, objective=args.objective, min_trades=args.min_trades,
+                          workers=args.workers, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - t0
+    result.windows.to_csv(f"{args.out}_windows.csv", index=False)
+    result.equity.to_csv(f"{args.out}_equity.csv")
+
+    cols = ["window", "test_start", "test_end", *grid, f"is_{args.objective}", "oos_trades", "oos_net_points"]
+    print(result.windows[[c for c in cols if c in result.windows]].to_string(index=False))
+    final = result.equity.iloc[-1] if len(result.equity) else 0.0
+    print(f"[INFO] {len(result.windows)} windows in {elapsed:.2f}s | out-of-sample trades={len(result.trades)} "
+          f"net={final:.2f} pts | results in {os.path.abspath(args.out)}_*.csv")
+
+
+if __name__ == "__main__":
+    main()